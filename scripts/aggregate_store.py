@@ -0,0 +1,253 @@
+import argparse
+import json
+import os
+import time
+import numpy as np
+import pandas as pd
+
+from dataset_service import open_dataset
+from halo_cme_detection import weights
+from swis_store import SwisDataset, ColumnStoreWriter, FILL_THRESHOLD, dataset_path, to_ns
+
+# Base paths
+project_root = os.path.dirname(os.path.dirname(__file__))
+aggregates_path = os.path.join(project_root, 'data', 'aggregates')
+
+FORMAT_VERSION = 1
+DAY_NS = 86400 * 10**9
+# Pyramid levels, finest first; each width divides the next and a day
+LEVELS = {'1min': 60 * 10**9, '10min': 600 * 10**9, '1h': 3600 * 10**9}
+# Stored per bucket and parameter; std is derived from m2 (sum of squared deviations from the mean)
+STATS = ('count', 'mean', 'm2', 'min', 'max')
+
+
+def _runs(ids):
+    """Start offsets of the runs of equal values in a sorted id array."""
+    return np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+
+
+def bucket_stats(times, columns, width):
+    """Per-bucket count/mean/m2/min/max of each raw column, fill values and NaN excluded.
+
+    ``times`` are sorted int64 ns; returns the start time of every bucket
+    holding at least one row and {name: {stat: array}}.
+    """
+    ids = times // width
+    starts = _runs(ids)
+    sizes = np.diff(np.r_[starts, len(ids)])
+    stats = {}
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for name, values in columns.items():
+            values = np.asarray(values, dtype=np.float64)
+            valid = np.isfinite(values) & (np.abs(values) < FILL_THRESHOLD)
+            values = np.where(valid, values, np.nan)
+            count = np.add.reduceat(valid.astype(np.int64), starts)
+            low = np.fmin.reduceat(values, starts)
+            # Summing offsets from the bucket minimum, then deviations from the mean, keeps m2 accurate for
+            # large values (and exactly 0 for constant buckets)
+            mean = low + np.add.reduceat(np.where(valid, values - np.repeat(low, sizes), 0.0), starts) / count
+            deviation = np.where(valid, values - np.repeat(mean, sizes), 0.0)
+            stats[name] = {'count': count, 'mean': mean, 'm2': np.add.reduceat(deviation ** 2, starts),
+                           'min': low, 'max': np.fmax.reduceat(values, starts)}
+    return ids[starts] * width, stats
+
+
+def merge_stats(bucket_times, stats, width):
+    """Combine finer buckets into buckets of ``width`` (Chan et al.'s pairwise update for mean and m2)."""
+    ids = bucket_times // width
+    starts = _runs(ids)
+    sizes = np.diff(np.r_[starts, len(ids)])
+    merged = {}
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for name, parts in stats.items():
+            count = np.add.reduceat(parts['count'], starts)
+            filled = parts['count'] > 0
+            low = np.fmin.reduceat(parts['min'], starts)
+            offsets = parts['count'] * (parts['mean'] - np.repeat(low, sizes))
+            mean = low + np.add.reduceat(np.where(filled, offsets, 0.0), starts) / count
+            spread = np.where(filled, parts['count'] * (parts['mean'] - np.repeat(mean, sizes)) ** 2, 0.0)
+            m2 = np.add.reduceat(np.where(filled, parts['m2'], 0.0) + spread, starts)
+            merged[name] = {'count': count, 'mean': mean, 'm2': m2,
+                            'min': low, 'max': np.fmax.reduceat(parts['max'], starts)}
+    return ids[starts] * width, merged
+
+
+def flatten(stats):
+    return {f'{name}.{stat}': parts[stat] for name, parts in stats.items() for stat in STATS}
+
+
+class AggregateStore:
+    """Pyramid of 1-minute, 10-minute and hourly aggregates of the SWIS parameters.
+
+    Each level is a column store under ``data/aggregates/<level>`` with one
+    row per bucket holding data (``Time`` is the bucket start) and, per
+    parameter, ``<param>.count``, ``.mean``, ``.m2``, ``.min`` and ``.max``
+    over its valid samples. ``update`` re-aggregates only the days whose
+    rows in the dataset changed, comparing the per-day digests the dataset
+    recorded as it was written (``SwisDataset.day_digests``) with those in
+    ``manifest.json``, and builds 1-minute buckets from the raw rows and the
+    coarser levels from those. ``query`` answers from the finest level (or
+    the raw rows) that fits in ``max_points``.
+    """
+
+    def __init__(self, path=aggregates_path, dataset=None):
+        self.path = path
+        self._dataset = dataset
+        self.manifest_path = os.path.join(path, 'manifest.json')
+        self.manifest = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                self.manifest = json.load(f)
+        self._levels = {}
+
+    @property
+    def dataset(self):
+        if self._dataset is None:
+            self._dataset = open_dataset()
+        return self._dataset
+
+    @property
+    def params(self):
+        return self.manifest.get('params', [])
+
+    def level(self, name):
+        if name not in self._levels:
+            self._levels[name] = SwisDataset(os.path.join(self.path, name))
+        return self._levels[name]
+
+    def _complete(self):
+        return all(os.path.exists(os.path.join(self.path, name, 'meta.json')) for name in LEVELS)
+
+    def day_levels(self, day, params):
+        """{level: (bucket times, flattened stats)} of one day's rows."""
+        i0, i1 = self.dataset.index.locate(pd.Timestamp(day, unit='ns'), pd.Timestamp(day + DAY_NS - 1, unit='ns'))
+        times = self.dataset._array('Time')[i0:i1]
+        levels = {}
+        for name, width in LEVELS.items():
+            if not levels:
+                bucket_times, stats = bucket_stats(times, {param: self.dataset._array(param)[i0:i1]
+                                                           for param in params}, width)
+            else:
+                bucket_times, stats = merge_stats(bucket_times, stats, width)
+            levels[name] = (bucket_times, flatten(stats))
+        return levels
+
+    def update(self, force=False):
+        """Bring the pyramid in line with the dataset; returns the number of days re-aggregated."""
+        params = [param for param in weights if param in self.dataset.columns]
+        digests = self.dataset.day_digests(params)
+        rebuild = (force or not self._complete() or self.manifest.get('version') != FORMAT_VERSION
+                   or self.manifest.get('params') != params)
+        stored = {} if rebuild else {int(day): digest for day, digest in self.manifest['days'].items()}
+        dirty = {day for day in set(digests) | set(stored) if digests.get(day) != stored.get(day)}
+        if not dirty:
+            return 0
+
+        # Walk the days in order: unchanged runs are copied from the stored levels, changed days re-aggregated
+        days = sorted(set(digests) | set(stored))
+        columns = list(flatten({param: dict.fromkeys(STATS) for param in params}))
+        dtypes = {column: np.int64 if column.endswith('.count') else np.float64 for column in columns}
+        writers = {name: ColumnStoreWriter(os.path.join(self.path, name), dtypes, mask_fills=False)
+                   for name in LEVELS}
+        try:
+            for writer in writers.values():
+                # Fix the column set even if no rows end up being written
+                writer.append(np.empty(0, dtype=np.int64), {column: np.empty(0) for column in columns})
+            clean_start = None
+            for position, day in enumerate(days + [None]):
+                if day is not None and day not in dirty:
+                    clean_start = day if clean_start is None else clean_start
+                    continue
+                if clean_start is not None:
+                    for name, writer in writers.items():
+                        i0, i1 = self.level(name).locate(pd.Timestamp(clean_start, unit='ns'),
+                                                         pd.Timestamp(days[position - 1] + DAY_NS - 1, unit='ns'))
+                        self.level(name).copy_rows(writer, i0, i1)
+                    clean_start = None
+                if day is not None and day in digests:
+                    for name, (bucket_times, values) in self.day_levels(day, params).items():
+                        writers[name].append(bucket_times, values)
+        except Exception:
+            for writer in writers.values():
+                writer.abort()
+            raise
+        self._levels = {}
+        for writer in writers.values():
+            writer.close()
+
+        self.manifest = {'version': FORMAT_VERSION, 'params': params,
+                         'days': {str(day): digest for day, digest in sorted(digests.items())}}
+        with open(self.manifest_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+        return len(dirty)
+
+    def query(self, param, t0=None, t1=None, max_points=2000):
+        """Aggregates of ``param`` over [t0, t1] at the finest resolution with at most ``max_points`` rows.
+
+        Returns a DataFrame of ``Time``, ``mean``, ``min``, ``max``, ``std``
+        (sample standard deviation) and ``count``, with the resolution used
+        ('raw' or a level name) in ``attrs['resolution']``. Raw rows are
+        returned as buckets of one sample. When even the hourly level holds
+        more than ``max_points`` buckets, the hourly buckets are returned.
+        """
+        if param not in self.params:
+            raise KeyError(f"Parameter '{param}' not in the aggregate store")
+        i0, i1 = self.dataset.locate(t0, t1)
+        if i1 - i0 <= max_points:
+            values = self.dataset._array(param)[i0:i1].astype(np.float64)
+            valid = np.isfinite(values) & (np.abs(values) < FILL_THRESHOLD)
+            values = np.where(valid, values, np.nan)
+            frame = pd.DataFrame({'Time': self.dataset.times(t0, t1), 'mean': values, 'min': values, 'max': values,
+                                  'std': np.full(len(values), np.nan), 'count': valid.astype(np.int64)})
+            frame.attrs['resolution'] = 'raw'
+            return frame
+        for name in LEVELS:
+            level = self.level(name)
+            start = None if t0 is None else pd.Timestamp(to_ns(t0) - to_ns(t0) % LEVELS[name], unit='ns')
+            i0, i1 = level.locate(start, t1)
+            if i1 - i0 <= max_points or name == list(LEVELS)[-1]:
+                break
+        count = level._array(f'{param}.count')[i0:i1]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.sqrt(level._array(f'{param}.m2')[i0:i1] / (count - 1))
+        frame = pd.DataFrame({'Time': level.times(start, t1),
+                              'mean': level._array(f'{param}.mean')[i0:i1],
+                              'min': level._array(f'{param}.min')[i0:i1],
+                              'max': level._array(f'{param}.max')[i0:i1],
+                              'std': np.where(count > 1, std, np.nan), 'count': count})
+        frame.attrs['resolution'] = name
+        return frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build or update the 1-minute/10-minute/hourly aggregate pyramid of '
+                                                 'the SWIS parameters, or query it.')
+    parser.add_argument('--rebuild', action='store_true', help='Re-aggregate every day instead of only changed days.')
+    parser.add_argument('--query', metavar='PARAM', help='Print the aggregates of one parameter instead of updating.')
+    parser.add_argument('--start', help='Query start time (default: first sample).')
+    parser.add_argument('--end', help='Query end time (default: last sample).')
+    parser.add_argument('--max-points', type=int, default=2000, help='Most rows the query may return.')
+    args = parser.parse_args()
+
+    store = AggregateStore()
+    if args.query:
+        started = time.perf_counter()
+        frame = store.query(args.query, args.start, args.end, args.max_points)
+        elapsed = time.perf_counter() - started
+        print(frame.to_string(index=False, max_rows=20))
+        print(f"\n⚡ {len(frame)} {frame.attrs['resolution']} row(s) of {args.query} in {elapsed * 1000:.1f} ms")
+        return
+
+    started = time.perf_counter()
+    days = store.update(force=args.rebuild)
+    elapsed = time.perf_counter() - started
+    if days:
+        rows = ', '.join(f"{name}: {len(store.level(name))}" for name in LEVELS)
+        print(f"✅ Re-aggregated {days} day(s) of {len(store.params)} parameter(s) in {elapsed:.2f}s ({rows} buckets) "
+              f"→ {aggregates_path}")
+    else:
+        print(f"✅ Aggregates are up to date with {dataset_path}.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+import os
+import json
+import hashlib
+import pandas as pd
+import numpy as np
+from swis_store import TimeIndex, frame_day_digests
+
+# Base paths
+project_root = os.path.dirname(os.path.dirname(__file__))
+baseline_dir = os.path.join(project_root, 'data', 'baseline')
+
+RESOLUTIONS = {'daily': 'D', 'hourly': 'h'}
+
+
+def day_keys(digests):
+    """Day digests keyed by int-ns day start, re-keyed by YYYY-MM-DD as the manifest stores them."""
+    return {pd.Timestamp(day, unit='ns').strftime('%Y-%m-%d'): digest for day, digest in digests.items()}
+
+
+def dataset_signatures(dataset, params):
+    """Map each day (YYYY-MM-DD) of the dataset to the digest of its rows of ``params``."""
+    return day_keys(dataset.day_digests([param for param in params if param in dataset.columns]))
+
+
+def dataset_settings(dataset):
+    """How the dataset's rows were produced: data_preparation's merge settings and the fill masking."""
+    sources_path = os.path.join(dataset.path, 'sources.json')
+    merge = None
+    if os.path.exists(sources_path):
+        with open(sources_path) as f:
+            merge = json.load(f).get('settings')
+    return {'merge': merge, 'fills_masked': dataset.meta.get('fills_masked')}
+
+
+def interval_mask(times, intervals):
+    """Boolean mask of samples falling inside any (start, end) interval, inclusive."""
+    index = TimeIndex(times)
+    mask = np.zeros(len(times), dtype=bool)
+    for start, end in intervals:
+        index.slice(mask, start, end)[:] = True
+    return mask
+
+
+class BaselineStore:
+    """Quiet-time baseline (mean/std per parameter per day or hour) persisted on disk.
+
+    ``update`` only recomputes buckets whose day's rows changed (their digest
+    differs from the one stored in the manifest) or that were never stored,
+    and ``lookup`` returns baseline arrays aligned sample-for-sample with a
+    time index through a dense bucket offset table.
+    """
+
+    def __init__(self, path=baseline_dir, resolution='daily', exclude_intervals=None):
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Unknown baseline resolution '{resolution}', expected one of {list(RESOLUTIONS)}")
+        self.path = path
+        self.resolution = resolution
+        self.unit = RESOLUTIONS[resolution]
+        self.exclude_intervals = sorted((pd.Timestamp(s), pd.Timestamp(e)) for s, e in (exclude_intervals or []))
+        self.table_path = os.path.join(path, f'baseline_{resolution}.csv')
+        self.manifest_path = os.path.join(path, f'baseline_{resolution}_manifest.json')
+        self.table = pd.DataFrame()
+        self.manifest = {}
+        self._dense = {}
+        self.load()
+
+    def _exclusion_key(self):
+        text = ';'.join(f'{s.isoformat()}/{e.isoformat()}' for s, e in self.exclude_intervals)
+        return hashlib.sha1(text.encode()).hexdigest()
+
+    def load(self):
+        if os.path.exists(self.table_path) and os.path.exists(self.manifest_path):
+            self.table = pd.read_csv(self.table_path, index_col='Bucket', float_precision='round_trip')
+            self.table.index = pd.to_datetime(self.table.index).as_unit('ns')
+            with open(self.manifest_path) as f:
+                self.manifest = json.load(f)
+        self._dense = {}
+
+    def save(self):
+        os.makedirs(self.path, exist_ok=True)
+        self.table.to_csv(self.table_path, index_label='Bucket')
+        with open(self.manifest_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+
+    def update(self, swis_data, params, signatures=None, force=False, dataset_settings=None):
+        """Refresh stale buckets from ``swis_data`` and persist; returns the refreshed buckets.
+
+        ``signatures`` maps days (YYYY-MM-DD) to digests of their rows
+        (``dataset_signatures``); by default they are hashed from ``swis_data``.
+        A change of ``dataset_settings`` (``dataset_settings()``) or of the
+        parameters or exclusions rebuilds every bucket.
+        """
+        params = [param for param in params if param in swis_data.columns]
+        if signatures is None:
+            signatures = day_keys(frame_day_digests(swis_data, params))
+        times = swis_data['Time'].to_numpy().astype('datetime64[ns]')
+        keys = times.astype(f'datetime64[{self.unit}]')
+        days = keys.astype('datetime64[D]').astype(str)
+
+        settings = {'params': params, 'exclusion': self._exclusion_key(), 'dataset': dataset_settings}
+        if force or self.manifest.get('settings') != settings:
+            self.table = pd.DataFrame()
+            self.manifest = {'settings': settings, 'days': {}}
+
+        stored = self.manifest['days']
+        dirty_days = {day for day in np.unique(days) if stored.get(day) != signatures.get(day)}
+        if not dirty_days:
+            return []
+
+        selected = np.isin(days, list(dirty_days))
+        values = swis_data.loc[selected, params]
+        if self.exclude_intervals:
+            values.loc[interval_mask(times, self.exclude_intervals)[selected], :] = np.nan
+        stats = values.groupby(keys[selected]).agg(['mean', 'std'])
+        stats.columns = [f'{param}_{stat}' for param, stat in stats.columns]
+        stats.index = pd.DatetimeIndex(stats.index).as_unit('ns')
+
+        if not self.table.empty:
+            stale = self.table.index.strftime('%Y-%m-%d').isin(list(dirty_days))
+            self.table = pd.concat([self.table[~stale], stats]).sort_index()
+        else:
+            self.table = stats.sort_index()
+        for day in dirty_days:
+            stored[day] = signatures.get(day)
+        self.manifest['days'] = stored
+        self._dense = {}
+        self.save()
+        return list(stats.index)
+
+    def _dense_table(self, param):
+        if param not in self._dense:
+            buckets = self.table.index.values.astype(f'datetime64[{self.unit}]').astype(np.int64)
+            first = buckets.min() if len(buckets) else 0
+            size = buckets.max() - first + 1 if len(buckets) else 0
+            mean = np.full(size, np.nan)
+            std = np.full(size, np.nan)
+            mean[buckets - first] = self.table[f'{param}_mean'].to_numpy()
+            std[buckets - first] = self.table[f'{param}_std'].to_numpy()
+            self._dense[param] = (first, mean, std)
+        return self._dense[param]
+
+    def lookup(self, times, param):
+        """Baseline mean/std arrays aligned with ``times`` (NaN where no bucket is stored)."""
+        first, mean, std = self._dense_table(param)
+        if not len(mean):
+            return np.full(len(times), np.nan), np.full(len(times), np.nan)
+        offsets = np.asarray(times).astype('datetime64[ns]').astype(f'datetime64[{self.unit}]').astype(np.int64) - first
+        inside = (offsets >= 0) & (offsets < len(mean))
+        offsets = np.where(inside, offsets, 0)
+        return np.where(inside, mean[offsets], np.nan), np.where(inside, std[offsets], np.nan)
@@ -0,0 +1,164 @@
+import argparse
+import glob
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Define base paths relative to the script location
+scripts_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(scripts_dir)
+results_path = os.path.join(project_root, 'data', 'benchmarks', 'pipeline.json')
+
+# (stage, script and arguments, what its rows/s is measured against); the render_plots kinds are
+# forced so that figures drawn by an earlier stage are redrawn and timed
+STAGES = [
+    ('ingest', ['cdf_to_csv.py', '--workers', '1'], 'raw'),
+    ('catalog_extract', ['extract_halo_cme.py'], 'catalog'),
+    ('catalog_windows', ['catalog_preparation.py'], 'catalog'),
+    ('data_preparation', ['data_preparation.py'], 'raw'),
+    ('detection', ['halo_cme_detection.py'], 'dataset'),
+    ('evaluation', ['evaluation.py'], 'catalog'),
+    ('plot_scores', ['plot_scores.py', '--force'], 'dataset'),
+    ('plot_events', ['generate_cme_event_plots.py', '--force'], 'dataset'),
+    ('plot_timeline', ['timeline_plot.py', '--force'], 'dataset'),
+    ('plot_params_overlay', ['plot_params_overlay.py', '--force'], 'dataset'),
+    ('plot_before_after', ['composite_score_before_after.py', '--force'], 'dataset'),
+    ('plot_visualize_scores', ['visualize_scores.py', '--force'], 'dataset'),
+    ('plot_catalog_overlay', ['visualize_with_catalog_overlay.py', '--force'], 'dataset'),
+    ('plot_heatmap', ['composite_score_heatmap.py'], 'dataset'),
+    ('plot_strength', ['strength_distribution.py'], 'dataset'),
+]
+
+
+def make_workspace(path):
+    """A throwaway project tree: a copy of scripts/ (so every project_root resolves inside it) and empty data/."""
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.makedirs(os.path.join(path, 'data'))
+    os.makedirs(os.path.join(path, 'scripts'))
+    for script in glob.glob(os.path.join(scripts_dir, '*.py')):
+        shutil.copy2(script, os.path.join(path, 'scripts'))
+    return path
+
+
+def run_stage(workspace, name, command, log_dir):
+    """Run one script to completion in the workspace; wall/CPU time and peak RSS of its process tree."""
+    env = dict(os.environ, MPLBACKEND='Agg', PYTHONHASHSEED='0')
+    with open(os.path.join(log_dir, f'{name}.log'), 'w') as log:
+        started = time.perf_counter()
+        process = subprocess.Popen([sys.executable] + command, cwd=os.path.join(workspace, 'scripts'),
+                                   stdout=log, stderr=subprocess.STDOUT, env=env)
+        _, status, usage = os.wait4(process.pid, 0)
+        wall = time.perf_counter() - started
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return {
+        'stage': name,
+        'returncode': process.returncode,
+        'wall_s': round(wall, 4),
+        'cpu_s': round(usage.ru_utime + usage.ru_stime, 4),
+        'peak_rss_mb': round(usage.ru_maxrss / 1024, 1),
+    }
+
+
+def dataset_rows(workspace):
+    meta_path = os.path.join(workspace, 'data', 'final_dataset', 'meta.json')
+    if not os.path.exists(meta_path):
+        return 0
+    with open(meta_path) as f:
+        return json.load(f)['rows']
+
+
+def catalog_rows(workspace):
+    catalog_path = os.path.join(workspace, 'data', 'cactus', 'halo_cmes.csv')
+    if not os.path.exists(catalog_path):
+        return 0
+    with open(catalog_path) as f:
+        return max(sum(1 for _ in f) - 1, 0)
+
+
+def benchmark_scale(workspace, days, seed, cmes_per_week):
+    make_workspace(workspace)
+    log_dir = os.path.join(workspace, 'logs')
+    os.makedirs(log_dir)
+    summary_path = os.path.join(workspace, 'synthetic.json')
+    generation = run_stage(workspace, 'generate', ['synthetic_swis.py', '--days', str(days), '--seed', str(seed),
+                                                   '--cmes-per-week', str(cmes_per_week),
+                                                   '--summary', summary_path], log_dir)
+    if generation['returncode'] != 0:
+        raise RuntimeError(f"Synthetic data generation failed; see {log_dir}/generate.log")
+    with open(summary_path) as f:
+        summary = json.load(f)
+
+    stages = []
+    for name, command, rows_of in STAGES:
+        result = run_stage(workspace, name, command, log_dir)
+        rows = {'raw': summary['total_rows'], 'catalog': catalog_rows(workspace), 'dataset': dataset_rows(workspace)}[rows_of]
+        result['rows'] = rows
+        result['rows_per_s'] = round(rows / result['wall_s'], 1) if result['wall_s'] else None
+        stages.append(result)
+        status = '✅' if result['returncode'] == 0 else f"⚠️ exit {result['returncode']}"
+        print(f"   {name:<21} {result['wall_s']:>9.2f}s {result['cpu_s']:>9.2f}s cpu {result['peak_rss_mb']:>8.1f} MB "
+              f"{result['rows_per_s'] or 0:>12,.0f} rows/s  {status}")
+    return {
+        'days': days,
+        'raw_rows': summary['total_rows'],
+        'dataset_rows': dataset_rows(workspace),
+        'halo_cmes': summary['halo_cmes'],
+        'generate': generation,
+        'stages': stages,
+        'total_wall_s': round(sum(stage['wall_s'] for stage in stages), 4),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=project_root, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time every pipeline stage on synthetic SWIS data of growing size.')
+    parser.add_argument('--days', type=int, nargs='+', default=[4, 30],
+                        help='Dataset sizes to benchmark, in days (e.g. 4 30 365).')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--cmes-per-week', type=float, default=2.0)
+    parser.add_argument('--workdir', help='Where to build the per-scale workspaces (default: a temporary directory).')
+    parser.add_argument('--keep', action='store_true', help='Keep the workspaces (data, plots and logs) afterwards.')
+    parser.add_argument('--output', default=results_path, help='JSON results path.')
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='swis_benchmark_')
+    report = {
+        'commit': git_commit(),
+        'started': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'seed': args.seed,
+        'scales': [],
+    }
+    try:
+        for days in args.days:
+            print(f"\n⏱️ Benchmarking {days} day(s) of synthetic SWIS data...")
+            report['scales'].append(benchmark_scale(os.path.join(workdir, f'{days}d'), days, args.seed,
+                                                    args.cmes_per_week))
+    finally:
+        if not args.keep and not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Benchmark results saved to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+import argparse
+import json
+import os
+import time
+import pandas as pd
+
+from halo_cme_detection import params, WINDOW_PADDING, load_global_baseline, TimelineScores, WindowScorer
+from parallel_scoring import ParallelScoring
+from swis_store import SwisDataset
+
+project_root = os.path.dirname(os.path.dirname(__file__))
+catalog_path = os.path.join(project_root, 'data', 'cactus', 'halo_cmes.csv')
+
+
+def catalog_windows(count=None, span=None):
+    """The catalog's padded CME windows, or ``count`` windows of the same mean length spread over ``span``."""
+    catalog = pd.read_csv(catalog_path, parse_dates=['Expected_Start', 'Expected_End'])
+    windows = [(row['CME_Number'], row['Expected_Start'] - WINDOW_PADDING, row['Expected_End'] + WINDOW_PADDING)
+               for _, row in catalog.iterrows()]
+    if not count:
+        return windows
+    length = sum((end - start for _, start, end in windows), pd.Timedelta(0)) / len(windows)
+    starts = pd.date_range(span[0] - length / 2, span[1] - length / 2, periods=count)
+    return [(i + 1, start, start + length) for i, start in enumerate(starts)]
+
+
+def run_serial(swis_data, global_baseline, scoring, windows):
+    started = time.perf_counter()
+    timeline = TimelineScores(swis_data, global_baseline) if scoring == 'global' else None
+    scored = time.perf_counter()
+    scorer = WindowScorer(global_baseline, swis_data, timeline)
+    results = [scorer.detect(*window, write_scores=False) for window in windows]
+    return scored - started, time.perf_counter() - scored, results
+
+
+def run_parallel(swis_data, global_baseline, scoring, windows, workers):
+    started = time.perf_counter()
+    with ParallelScoring(global_baseline, workers, swis_data, scoring) as pool:
+        scored = time.perf_counter()
+        results = list(pool.detect(windows, write_scores=False))
+        finished = time.perf_counter()
+    return scored - started, finished - scored, results
+
+
+def same_results(a, b):
+    return all((x is None and y is None) or (x is not None and y is not None and x['threshold'] == y['threshold']
+                                             and x['events'] == y['events']) for x, y in zip(a, b))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure how halo CME scoring scales with the number of worker processes.')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--scoring', choices=['global', 'window'], default='global')
+    parser.add_argument('--windows', type=int,
+                        help='Score this many evenly spaced windows instead of the catalog windows.')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per worker count; the fastest is reported.')
+    parser.add_argument('--output', help='Also write the results as JSON to this path.')
+    args = parser.parse_args()
+
+    dataset = SwisDataset()
+    swis_data = dataset.to_frame([param for param in params if param in dataset.columns])
+    global_baseline = load_global_baseline(swis_data, dataset=dataset)
+    windows = catalog_windows(args.windows, dataset.time_span)
+    print(f"\n⏱️ Scoring {len(swis_data):,} rows and {len(windows)} window(s) ({args.scoring} scoring, "
+          f"{os.cpu_count()} CPU(s) available)\n")
+
+    reference = None
+    rows = []
+    for workers in args.workers:
+        runs = []
+        for _ in range(args.repeat):
+            if workers == 1:
+                runs.append(run_serial(swis_data, global_baseline, args.scoring, windows))
+            else:
+                runs.append(run_parallel(swis_data, global_baseline, args.scoring, windows, workers))
+        timeline_s, windows_s, results = min(runs, key=lambda run: run[0] + run[1])
+        if reference is None:
+            reference = results
+        total_s = timeline_s + windows_s
+        rows.append({'workers': workers, 'timeline_s': round(timeline_s, 4), 'windows_s': round(windows_s, 4),
+                     'total_s': round(total_s, 4), 'identical': same_results(reference, results)})
+
+    baseline_total = rows[0]['total_s']
+    print(f"{'workers':>8} {'timeline s':>11} {'windows s':>10} {'total s':>9} {'speedup':>8} {'identical':>10}")
+    for row in rows:
+        row['speedup'] = round(baseline_total / row['total_s'], 2) if row['total_s'] else None
+        print(f"{row['workers']:>8} {row['timeline_s']:>11.3f} {row['windows_s']:>10.3f} {row['total_s']:>9.3f} "
+              f"{row['speedup']:>8.2f} {str(row['identical']):>10}")
+
+    if args.output:
+        report = {'rows': len(swis_data), 'windows': len(windows), 'scoring': args.scoring,
+                  'cpus': os.cpu_count(), 'results': rows}
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✅ Saved benchmark results to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
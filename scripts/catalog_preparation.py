@@ -1,8 +1,10 @@
+import os
 import pandas as pd
 from datetime import timedelta
 
 # Load the halo CME catalog
-catalog_path = '../data/cactus/halo_cmes.csv'
+project_root = os.path.dirname(os.path.dirname(__file__))
+catalog_path = os.path.join(project_root, 'data', 'cactus', 'halo_cmes.csv')
 catalog = pd.read_csv(catalog_path)
 
 # Prepare new columns for Expected Arrival Window
@@ -27,5 +29,5 @@ def compute_expected_window(row):
 catalog[['Estimated_Arrival', 'Expected_Start', 'Expected_End']] = catalog.apply(compute_expected_window, axis=1)
 
 # Save updated catalog
-catalog.to_csv('../data/cactus/halo_cmes.csv', index=False)
+catalog.to_csv(catalog_path, index=False)
 print("\n✅ Catalog updated with arrival windows and saved.")
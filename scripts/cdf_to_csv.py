@@ -1,12 +1,21 @@
 import os
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 import cdflib
 import pandas as pd
 import numpy as np
+from swis_store import write_columns
+from run_profile import RunProfile, add_profile_argument
 
 # Define base paths relative to the script location
 project_root = os.path.dirname(os.path.dirname(__file__))
 base_raw_path = os.path.join(project_root, 'data', 'swis_raw')
 base_csv_path = os.path.join(project_root, 'data', 'swis_csv')
+base_store_path = os.path.join(project_root, 'data', 'swis_store')
+profile_path = os.path.join(project_root, 'data', 'cdf_to_csv_profile.json')
 
 # Folders to process
 folders = ['blk', 'th1', 'th2']
@@ -23,53 +32,243 @@ science_vars = [
     'spacecraft_xpos', 'spacecraft_ypos', 'spacecraft_zpos'
 ]
 
-def convert_cdf_to_csv(cdf_path, csv_path):
+# CDF epoch origins relative to the Unix epoch
+CDF_EPOCH_UNIX_MS = 62167219200000.0  # CDF_EPOCH: ms since 0000-01-01
+CDF_EPOCH16_UNIX_S = 62167219200.0  # CDF_EPOCH16: (s since 0000-01-01, ps)
+TT2000_UNIX_NS = 946727935816000000  # TT2000 0 = 2000-01-01T11:58:55.816 UTC
+TT2000_BASE_LEAP = 32  # TAI-UTC at J2000
+
+# TAI-UTC (s) from each UTC date on, for TT2000 -> UTC
+LEAP_SECONDS = [
+    ('1972-01-01', 10), ('1972-07-01', 11), ('1973-01-01', 12), ('1974-01-01', 13),
+    ('1975-01-01', 14), ('1976-01-01', 15), ('1977-01-01', 16), ('1978-01-01', 17),
+    ('1979-01-01', 18), ('1980-01-01', 19), ('1981-07-01', 20), ('1982-07-01', 21),
+    ('1983-07-01', 22), ('1985-07-01', 23), ('1988-01-01', 24), ('1990-01-01', 25),
+    ('1991-01-01', 26), ('1992-07-01', 27), ('1993-07-01', 28), ('1994-07-01', 29),
+    ('1996-01-01', 30), ('1997-07-01', 31), ('1999-01-01', 32), ('2006-01-01', 33),
+    ('2009-01-01', 34), ('2012-07-01', 35), ('2015-07-01', 36), ('2017-01-01', 37),
+]
+_leap_offsets = np.array([leap for _, leap in LEAP_SECONDS], dtype=np.int64)
+_leap_starts_tt2000 = (np.array([day for day, _ in LEAP_SECONDS], dtype='datetime64[ns]').astype(np.int64)
+                       - TT2000_UNIX_NS + (_leap_offsets - TT2000_BASE_LEAP) * 1_000_000_000)
+
+def epoch_to_ns(raw_time, data_type):
+    """Decode CDF_EPOCH / CDF_EPOCH16 / CDF_TIME_TT2000 values to Unix int64 nanoseconds.
+
+    Pure array arithmetic (a leap-second lookup via searchsorted for TT2000),
+    replacing the per-value datetime objects built by cdfepoch.to_datetime.
+    """
+    raw_time = np.ravel(raw_time)
+    if data_type == 'CDF_EPOCH':
+        ms = raw_time - CDF_EPOCH_UNIX_MS
+        whole = np.floor(ms)
+        return whole.astype(np.int64) * 1_000_000 + np.round((ms - whole) * 1e6).astype(np.int64)
+    if data_type == 'CDF_EPOCH16':
+        seconds = (raw_time.real - CDF_EPOCH16_UNIX_S).astype(np.int64)
+        return seconds * 1_000_000_000 + raw_time.imag.astype(np.int64) // 1000
+    if data_type == 'CDF_TIME_TT2000':
+        tt2000 = raw_time.astype(np.int64)
+        leap = _leap_offsets[np.clip(np.searchsorted(_leap_starts_tt2000, tt2000, side='right') - 1, 0, None)]
+        return tt2000 + TT2000_UNIX_NS - (leap - TT2000_BASE_LEAP) * 1_000_000_000
+    raise ValueError(f"Unsupported CDF time type: {data_type}")
+
+def read_cdf_columns(cdf_path):
+    """Read the time axis (int64 ns) and 1-D science variables of one CDF.
+
+    Variable arrays are returned as read (flattened views, no copies) and
+    trimmed to a common length; returns None when the file is unusable.
+    """
     try:
         cdf_file = cdflib.CDF(cdf_path)
-        raw_time = cdf_file.varget('epoch_for_cdf_mod')
-        time_data = np.array(cdflib.cdfepoch.to_datetime(raw_time)).flatten()
+        time_type = cdf_file.varinq('epoch_for_cdf_mod').Data_Type_Description
+        time_data = epoch_to_ns(cdf_file.varget('epoch_for_cdf_mod'), time_type)
     except Exception as e:
         print(f"⚠️ Failed to read time from {cdf_path}: {e}")
-        return
+        return None
 
-    data = {'Time': time_data}
+    data = {}
     zvars = cdf_file.cdf_info().zVariables
 
     for var in science_vars:
         if var in zvars:
-            arr = np.array(cdf_file.varget(var)).flatten()
+            arr = np.ravel(cdf_file.varget(var))
             if arr.ndim == 1:
                 min_len = min(len(arr), len(time_data))
                 if len(arr) != len(time_data):
                     print(f"⚠️ Truncating {var} to match time length in {os.path.basename(cdf_path)}")
                 data[var] = arr[:min_len]
-                data['Time'] = time_data[:min_len]
+                time_data = time_data[:min_len]
             else:
                 print(f"⚠️ Skipping {var} in {os.path.basename(cdf_path)} (not 1D)")
         else:
             print(f"⚠️ Variable {var} not found in {os.path.basename(cdf_path)}")
 
-    if len(data) <= 1:
+    if not data:
         print(f"❌ No usable variables found in {cdf_path}. Skipping.")
-        return
+        return None
+    return time_data, data
+
+def convert_cdf_to_store(cdf_path, store_path):
+    """Ingest one CDF straight into a column store, without a CSV round trip.
+
+    Values are kept exactly as in the CDF (fill values included) so that
+    data_preparation.py derives the same columns as from the CSVs.
+    """
+    columns = read_cdf_columns(cdf_path)
+    if columns is None:
+        return None
+    time_data, data = columns
+    write_columns(store_path, time_data, data, mask_fills=False)
+    print(f"✅ Saved: {store_path}")
+    return {'variables': list(data), 'rows': len(time_data)}
+
+def convert_cdf_to_csv(cdf_path, csv_path):
+    columns = read_cdf_columns(cdf_path)
+    if columns is None:
+        return None
+    time_data, data = columns
 
-    df = pd.DataFrame(data)
+    df = pd.DataFrame({'Time': time_data.view('datetime64[ns]'), **data})
     os.makedirs(os.path.dirname(csv_path), exist_ok=True)
     df.to_csv(csv_path, index=False)
     print(f"✅ Saved: {csv_path}")
+    return {'variables': list(data), 'rows': len(df)}
 
-# Process folders
-for folder in folders:
-    print(f"\n📁 Processing folder: {folder}")
-    raw_dir = os.path.join(base_raw_path, folder)
-    csv_dir = os.path.join(base_csv_path, folder)
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def output_marker(output_path):
+    """File whose size/mtime stands for an output: the CSV itself, or a store's meta.json."""
+    return output_path if output_path.endswith('.csv') else os.path.join(output_path, 'meta.json')
+
+def load_manifest(manifest_path):
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            return json.load(f)
+    return {}
+
+def save_manifest(manifest, manifest_path):
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+def is_current(entry, cdf_path, output_path):
+    """True when the output was produced from this exact CDF and has not been touched since.
+
+    Size and mtime are checked first; a CDF whose mtime changed but whose
+    size did not (e.g. re-downloaded) is hashed before being reconverted.
+    """
+    marker = output_marker(output_path)
+    if not entry or not os.path.exists(marker):
+        return False
+    output_stat = os.stat(marker)
+    if [output_stat.st_size, output_stat.st_mtime_ns] != [entry['output_size'], entry['output_mtime_ns']]:
+        return False
+    cdf_stat = os.stat(cdf_path)
+    if cdf_stat.st_size != entry['source_size']:
+        return False
+    if cdf_stat.st_mtime_ns == entry['source_mtime_ns']:
+        return True
+    if file_hash(cdf_path) == entry['source_sha256']:
+        entry['source_mtime_ns'] = cdf_stat.st_mtime_ns
+        return True
+    return False
+
+def convert_job(cdf_path, output_path):
+    """Worker entry point: convert one file and describe the result for the manifest."""
+    if output_path.endswith('.csv'):
+        result = convert_cdf_to_csv(cdf_path, output_path)
+    else:
+        result = convert_cdf_to_store(cdf_path, output_path)
+    if result is None:
+        return None
+    cdf_stat = os.stat(cdf_path)
+    output_stat = os.stat(output_marker(output_path))
+    result.update({
+        'source': os.path.relpath(cdf_path, base_raw_path),
+        'source_size': cdf_stat.st_size,
+        'source_mtime_ns': cdf_stat.st_mtime_ns,
+        'source_sha256': file_hash(cdf_path),
+        'output_size': output_stat.st_size,
+        'output_mtime_ns': output_stat.st_mtime_ns,
+    })
+    return result
+
+def find_jobs(output_base, extension):
+    jobs = []
+    for folder in folders:
+        raw_dir = os.path.join(base_raw_path, folder)
+        output_dir = os.path.join(output_base, folder)
+        if not os.path.isdir(raw_dir):
+            print(f"⚠️ Raw folder not found: {raw_dir}")
+            continue
+        os.makedirs(output_dir, exist_ok=True)
+        for file in sorted(os.listdir(raw_dir)):
+            if file.endswith('.cdf'):
+                jobs.append((os.path.join(raw_dir, file), os.path.join(output_dir, file.replace('.cdf', extension))))
+    return jobs
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert SWIS L2 CDF files to CSV or column stores.')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help='Number of conversion processes (1 converts in this process).')
+    parser.add_argument('--force', action='store_true', help='Reconvert files even when their output is up to date.')
+    parser.add_argument('--format', choices=['csv', 'store'], default='csv',
+                        help=f"'csv' writes {base_csv_path}; 'store' ingests straight into per-file column stores "
+                             f"under {base_store_path} for data_preparation.py --source store.")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    profile = RunProfile('cdf_to_csv', profile_path, args.profile)
+
+    output_base = base_csv_path if args.format == 'csv' else base_store_path
+    manifest_path = os.path.join(output_base, 'conversion_manifest.json')
+    with profile.stage('scan') as record:
+        manifest = load_manifest(manifest_path)
+        jobs = find_jobs(output_base, '.csv' if args.format == 'csv' else '')
+        pending = []
+        for cdf_path, output_path in jobs:
+            key = os.path.relpath(output_path, output_base)
+            if not args.force and is_current(manifest.get(key), cdf_path, output_path):
+                continue
+            pending.append((key, cdf_path, output_path))
+        record['rows'] = len(jobs)
+    print(f"\n📁 {len(jobs)} CDF file(s) found, {len(jobs) - len(pending)} up to date, {len(pending)} to convert.")
+
+    started = time.perf_counter()
+    with profile.stage('convert', workers=args.workers) as record:
+        if args.workers > 1 and len(pending) > 1:
+            with ProcessPoolExecutor(max_workers=args.workers) as pool:
+                futures = [(key, pool.submit(convert_job, cdf_path, output_path)) for key, cdf_path, output_path in pending]
+                results = [(key, future.result()) for key, future in futures]
+        else:
+            results = [(key, convert_job(cdf_path, output_path)) for key, cdf_path, output_path in pending]
+        record['rows'] = sum(result['rows'] for _, result in results if result is not None)
+    elapsed = time.perf_counter() - started
 
-    os.makedirs(csv_dir, exist_ok=True)
+    converted = 0
+    rows = 0
+    with profile.stage('manifest') as record:
+        for key, result in results:
+            if result is None:
+                manifest.pop(key, None)
+                continue
+            manifest[key] = result
+            converted += 1
+            rows += result['rows']
+        save_manifest(manifest, manifest_path)
+        record['rows'] = len(manifest)
 
-    for file in os.listdir(raw_dir):
-        if file.endswith('.cdf'):
-            cdf_path = os.path.join(raw_dir, file)
-            csv_path = os.path.join(csv_dir, file.replace('.cdf', '.csv'))
-            convert_cdf_to_csv(cdf_path, csv_path)
+    print(f"\n🎉 All CDF files processed and converted to {'CSV' if args.format == 'csv' else 'column stores'}.")
+    if elapsed > 0 and converted:
+        print(f"⏱️ Converted {converted} file(s), {rows} row(s) in {elapsed:.2f}s "
+              f"({converted / elapsed:.2f} files/s, {rows / elapsed:,.0f} rows/s, {args.workers} worker(s)).")
+    print(f"🧾 Run profile saved to {profile.save()}")
 
-print("\n🎉 All CDF files processed and converted to CSV.")
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,5 @@
-import pandas as pd
+from swis_store import SwisDataset
 
-df = pd.read_csv('../data/final_dataset.csv')
-print("\n📊 Columns in final_dataset.csv:\n")
-print(df.columns.tolist())
+df = SwisDataset()
+print("\n📊 Columns in the final dataset:\n")
+print(df.columns)
@@ -3,36 +3,50 @@ import matplotlib.pyplot as plt
 import numpy as np
 import os
 import matplotlib.dates as mdates
+from decimate import bucket_max, time_ns
+from dataset_service import open_dataset
 
 # Paths
-PARAMS_PATH = 'data/final_dataset.csv'
-DETECTED_PATH = 'data/detected_halo_cmes.csv'
-PLOT_DIR = 'plots/heatmaps'
+project_root = os.path.dirname(os.path.dirname(__file__))
+DETECTED_PATH = os.path.join(project_root, 'data', 'detected_halo_cmes.csv')
+PLOT_DIR = os.path.join(project_root, 'plots', 'heatmaps')
 os.makedirs(PLOT_DIR, exist_ok=True)
+# Time bins across the plot: about one per pixel column of the saved figure
+TIME_BINS = 4000
 
-# Read parameter time series
-param_df = pd.read_csv(PARAMS_PATH, parse_dates=['Time'])
-# Replace -1e+31 with np.nan for all parameters (missing data)
-param_df.replace(-1e+31, np.nan, inplace=True)
+# Open parameter time series (fill values are already NaN)
+param_store = open_dataset()
 
 # Read detected events
 cme_df = pd.read_csv(DETECTED_PATH, parse_dates=['Detected_Start', 'Detected_End'])
 
 # Get all unique CME numbers and sort
 cme_numbers = sorted(cme_df['CME_Number'].unique())
+if not cme_numbers:
+    print(f"⚠️ No detected events in {DETECTED_PATH}; no heatmap to draw.")
+    raise SystemExit(0)
 
-# Build a time grid (all unique times in the parameter file)
-time_grid = param_df['Time']
+# Binned time grid over the dataset
+first, last = param_store.time_span
+edges = np.linspace(first.value, last.value + 1, TIME_BINS + 1).astype(np.int64)
+time_grid = pd.to_datetime(edges[[0, -1]])
+times = param_store.times()
+composite_flux = param_store.column('composite_flux')
 
-# Build a 2D array: rows = CME numbers, columns = time, values = composite score (NaN if not in CME window)
-heatmap = np.full((len(cme_numbers), len(time_grid)), np.nan)
-
-for i, cme_num in enumerate(cme_numbers):
-    events = cme_df[cme_df['CME_Number'] == cme_num]
-    for _, row in events.iterrows():
-        mask = (time_grid >= row['Detected_Start']) & (time_grid <= row['Detected_End'])
-        # Fill with composite score for this time window
-        heatmap[i, mask] = param_df.loc[mask, 'composite_flux']
+# 2D array: rows = CME numbers, columns = time bins, values = peak composite score (NaN outside detected events)
+heatmap = np.full((len(cme_numbers), TIME_BINS), np.nan)
+rows = np.searchsorted(cme_numbers, cme_df['CME_Number'].to_numpy())
+# Samples [i0, i1) of each event, and the bins [b0, b1) they fall in
+t = time_ns(times)
+i0 = np.searchsorted(t, time_ns(cme_df['Detected_Start']))
+i1 = np.searchsorted(t, time_ns(cme_df['Detected_End']), side='right')
+for row, start, stop in zip(rows, i0, i1):
+    if start == stop:
+        continue
+    b0 = np.searchsorted(edges, t[start], side='right') - 1
+    b1 = np.searchsorted(edges, t[stop - 1], side='right')
+    peaks = bucket_max(times[start:stop], composite_flux[start:stop], edges[b0:b1 + 1])
+    heatmap[row, b0:b1] = np.fmax(heatmap[row, b0:b1], peaks)
 
 fig, ax = plt.subplots(figsize=(18, 0.7*len(cme_numbers)+4))
 # Use a perceptually uniform colormap and mask NaNs for better contrast
@@ -40,7 +54,7 @@ masked_heatmap = np.ma.masked_invalid(heatmap)
 cmap = plt.get_cmap('plasma')
 cmap.set_bad(color='#f7fafd')  # Light background for missing data
 cax = ax.imshow(masked_heatmap, aspect='auto', cmap=cmap, interpolation='nearest',
-                extent=[mdates.date2num(time_grid.iloc[0]), mdates.date2num(time_grid.iloc[-1]),
+                extent=[mdates.date2num(time_grid[0]), mdates.date2num(time_grid[-1]),
                         cme_numbers[-1]+1, cme_numbers[0]])
 
 # Format x-axis as dates
@@ -61,7 +75,7 @@ cbar.ax.tick_params(labelsize=11)
 # Add gridlines for y (CME number) and subtle x (time)
 for y in np.arange(len(cme_numbers)+1):
     ax.axhline(y, color='#cccccc', lw=0.5, alpha=0.5, zorder=2)
-for x in np.linspace(mdates.date2num(time_grid.iloc[0]), mdates.date2num(time_grid.iloc[-1]), 10):
+for x in np.linspace(mdates.date2num(time_grid[0]), mdates.date2num(time_grid[-1]), 10):
     ax.axvline(x, color='#e0e0e0', lw=0.5, alpha=0.4, zorder=2)
 
 # Add annotation for colorbar meaning
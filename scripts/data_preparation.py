@@ -1,92 +1,432 @@
 import os
+import json
+import argparse
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from swis_store import SwisDataset, ColumnStoreWriter, write_dataset, replace_rows, dataset_path
+from run_profile import RunProfile, add_profile_argument
 
 # Base paths
 project_root = os.path.dirname(os.path.dirname(__file__))
 csv_base_path = os.path.join(project_root, 'data', 'swis_csv')
+store_base_path = os.path.join(project_root, 'data', 'swis_store')
 output_path = os.path.join(project_root, 'data', 'final_dataset.csv')
+profile_path = os.path.join(project_root, 'data', 'data_preparation_profile.json')
+# Kept inside the dataset directory so that any other rewrite of the store drops it
+sources_path = os.path.join(dataset_path, 'sources.json')
 
-# Read all CSVs from blk, th1, th2 folders
-def read_csvs_from_folder(folder):
-    full_path = os.path.join(csv_base_path, folder)
-    all_data = []
-    for file in os.listdir(full_path):
-        if file.endswith('.csv'):
-            df = pd.read_csv(os.path.join(full_path, file), parse_dates=['Time'])
-            all_data.append(df)
-    if not all_data:
+folders = ['blk', 'th1', 'th2']
+DAY_NS = 86_400_000_000_000
+# Farthest a TH1/TH2 sample may lie from a BLK sample and still be attached to it (two 5 s cadences)
+ALIGN_TOLERANCE = pd.Timedelta(seconds=10)
+# Validity masks are stored as one byte per row
+DTYPES = {'th1_valid': np.uint8, 'th2_valid': np.uint8}
+FLUX_COLUMNS = {
+    'th1': ['integrated_flux_s9_mod', 'integrated_flux_s10_mod', 'integrated_flux_s11_mod'],
+    'th2': ['integrated_flux_s15_mod', 'integrated_flux_s16_mod', 'integrated_flux_s17_mod'],
+}
+
+# List the per-file sources of one folder: {'folder/file': path}
+def list_sources(folder, source):
+    base_path = csv_base_path if source == 'csv' else store_base_path
+    full_path = os.path.join(base_path, folder)
+    if not os.path.isdir(full_path):
+        return {}
+    sources = {}
+    for name in sorted(os.listdir(full_path)):
+        path = os.path.join(full_path, name)
+        if source == 'csv' and name.endswith('.csv'):
+            sources[f'{folder}/{name}'] = path
+        elif source == 'store' and os.path.exists(os.path.join(path, 'meta.json')):
+            sources[f'{folder}/{name}'] = path
+    return sources
+
+# Size and mtime of a CSV, or of a column store's meta.json
+def signature(path):
+    stat = os.stat(path if path.endswith('.csv') else os.path.join(path, 'meta.json'))
+    return [stat.st_size, stat.st_mtime_ns]
+
+def read_source(path):
+    if path.endswith('.csv'):
+        return pd.read_csv(path, parse_dates=['Time'])
+    # Per-file stores hold the CDF values as read, fill values included
+    return SwisDataset(path).to_frame()
+
+# Concatenate per-file frames in file order and sort by time; the stable sort
+# keeps duplicate timestamps in a reproducible order
+def concat_sorted(frames):
+    if not frames:
         return pd.DataFrame()
-    full_df = pd.concat(all_data, ignore_index=True)
-    full_df.sort_values(by='Time', inplace=True)
+    full_df = pd.concat(frames, ignore_index=True)
+    full_df.sort_values(by='Time', inplace=True, kind='stable')
     full_df.reset_index(drop=True, inplace=True)
     return full_df
 
-print("Reading blk files...")
-blk_df = read_csvs_from_folder('blk')
-
-print("Reading th1 files...")
-th1_df = read_csvs_from_folder('th1')
-flux_th1_cols = ['integrated_flux_s9_mod', 'integrated_flux_s10_mod', 'integrated_flux_s11_mod']
-flux_th1_cols = [col for col in flux_th1_cols if col in th1_df.columns]
-print("TH1 flux columns detected:", flux_th1_cols)
-
-print("Reading th2 files...")
-th2_df = read_csvs_from_folder('th2')
-flux_th2_cols = ['integrated_flux_s15_mod', 'integrated_flux_s16_mod', 'integrated_flux_s17_mod']
-flux_th2_cols = [col for col in flux_th2_cols if col in th2_df.columns]
-print("TH2 flux columns detected:", flux_th2_cols)
-
-# Merge th1 and th2 fluxes
-if not th1_df.empty and flux_th1_cols:
-    th1_df['composite_flux_th1'] = th1_df[flux_th1_cols].sum(axis=1)
-else:
-    th1_df['composite_flux_th1'] = 0
-
-if not th2_df.empty and flux_th2_cols:
-    th2_df['composite_flux_th2'] = th2_df[flux_th2_cols].sum(axis=1)
-else:
-    th2_df['composite_flux_th2'] = 0
-
-# Merge all composite flux
-th1_flux = th1_df[['Time', 'composite_flux_th1']] if 'composite_flux_th1' in th1_df else pd.DataFrame()
-th2_flux = th2_df[['Time', 'composite_flux_th2']] if 'composite_flux_th2' in th2_df else pd.DataFrame()
-
-# Merge blk with fluxes
-full_df = blk_df.copy()
-
-if not th1_flux.empty:
-    full_df = pd.merge_asof(full_df.sort_values('Time'), th1_flux.sort_values('Time'), on='Time', direction='nearest')
-
-if not th2_flux.empty:
-    full_df = pd.merge_asof(full_df.sort_values('Time'), th2_flux.sort_values('Time'), on='Time', direction='nearest')
-
-# Calculate total composite flux
-full_df['composite_flux'] = (
-    full_df.get('composite_flux_th1', 0).fillna(0) +
-    full_df.get('composite_flux_th2', 0).fillna(0)
-)
-
-# Alpha-Proton density ratio
-if 'alpha_density' in full_df.columns and 'proton_density' in full_df.columns:
-    with np.errstate(divide='ignore', invalid='ignore'):
-        ratio = full_df['alpha_density'] / full_df['proton_density']
-        ratio.replace([np.inf, -np.inf], np.nan, inplace=True)
-        full_df['alpha_proton_ratio'] = ratio.fillna(0)
-else:
-    full_df['alpha_proton_ratio'] = 0
-
-# Velocity magnitude
-if all(col in full_df.columns for col in ['proton_xvelocity', 'proton_yvelocity', 'proton_zvelocity']):
-    full_df['velocity_magnitude'] = np.sqrt(
-        full_df['proton_xvelocity']**2 +
-        full_df['proton_yvelocity']**2 +
-        full_df['proton_zvelocity']**2
-    )
-else:
-    full_df['velocity_magnitude'] = 0
-
-# Save final dataset
-full_df.to_csv(output_path, index=False)
-print(f"\n✅ Final dataset saved at: {output_path}")
+def align_nearest(grid, times, tolerance):
+    """Row of the sample in sorted ``times`` nearest to each sorted ``grid`` time (both int64 ns).
+
+    Picks the same row as ``merge_asof(direction='nearest')``: ties go to the
+    earlier sample and duplicate times to the last of them. ``valid`` is
+    False where that sample is more than ``tolerance`` ns away (or there is
+    none), and ``index`` is 0 there. Two binary searches of the sorted grid,
+    so nothing is copied or re-sorted.
+    """
+    if not len(times):
+        return np.zeros(len(grid), dtype=np.intp), np.zeros(len(grid), dtype=bool)
+    after = np.searchsorted(times, grid, side='left')
+    before = np.searchsorted(times, grid, side='right') - 1
+    before_gap = np.where(before >= 0, grid - times[np.maximum(before, 0)], np.iinfo(np.int64).max)
+    after_gap = np.where(after < len(times), times[np.minimum(after, len(times) - 1)] - grid, np.iinfo(np.int64).max)
+    index = np.where(after_gap < before_gap, after, before)
+    valid = np.minimum(before_gap, after_gap) <= tolerance
+    return np.where(valid, index, 0), valid
+
+def merge_folders(blk_df, th1_df, th2_df, flux_th1_cols, flux_th2_cols):
+    """BLK rows with the TH1/TH2 composite flux of the nearest sample within ALIGN_TOLERANCE.
+
+    ``thN_valid`` marks the rows that have such a TH sample; elsewhere the
+    TH flux is NaN, and so is ``composite_flux`` when neither stream has one.
+    """
+    if not blk_df['Time'].is_monotonic_increasing:
+        blk_df = blk_df.sort_values('Time', kind='stable', ignore_index=True)
+    grid = blk_df['Time'].to_numpy().astype('datetime64[ns]').astype(np.int64)
+    tolerance = pd.Timedelta(ALIGN_TOLERANCE).value
+    aligned = {}
+    composite = np.zeros(len(grid))
+    for folder, th_df, flux_cols in (('th1', th1_df, flux_th1_cols), ('th2', th2_df, flux_th2_cols)):
+        if 'Time' not in th_df:
+            th_df = pd.DataFrame({'Time': pd.Series(dtype='datetime64[ns]')})
+        elif not th_df['Time'].is_monotonic_increasing:
+            th_df = th_df.sort_values('Time', kind='stable', ignore_index=True)
+        # Sum of the stream's flux channels per sample (0 when it has none)
+        flux = th_df[flux_cols].sum(axis=1).to_numpy(dtype=float) if flux_cols else np.zeros(len(th_df))
+        times = th_df['Time'].to_numpy().astype('datetime64[ns]').astype(np.int64)
+        index, valid = align_nearest(grid, times, tolerance)
+        values = np.where(valid, flux[index] if len(flux) else np.nan, np.nan)
+        aligned[f'composite_flux_{folder}'] = values
+        aligned[f'{folder}_valid'] = valid
+        composite += np.where(np.isnan(values), 0.0, values)
+
+    # Total composite flux, NaN where neither stream has a sample in reach
+    aligned['composite_flux'] = np.where(aligned['th1_valid'] | aligned['th2_valid'], composite, np.nan)
+    full_df = blk_df.assign(**{name: aligned[name] for name in
+                               ['composite_flux_th1', 'composite_flux_th2', 'th1_valid', 'th2_valid', 'composite_flux']})
+
+    # Alpha-Proton density ratio
+    if 'alpha_density' in full_df.columns and 'proton_density' in full_df.columns:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = full_df['alpha_density'] / full_df['proton_density']
+            ratio.replace([np.inf, -np.inf], np.nan, inplace=True)
+            full_df['alpha_proton_ratio'] = ratio.fillna(0)
+    else:
+        full_df['alpha_proton_ratio'] = 0
+
+    # Velocity magnitude
+    if all(col in full_df.columns for col in ['proton_xvelocity', 'proton_yvelocity', 'proton_zvelocity']):
+        full_df['velocity_magnitude'] = np.sqrt(
+            full_df['proton_xvelocity']**2 +
+            full_df['proton_yvelocity']**2 +
+            full_df['proton_zvelocity']**2
+        )
+    else:
+        full_df['velocity_magnitude'] = 0
+    return full_df
+
+# Manifest entry of one source file: signature, time range and columns
+def describe_source(path, df):
+    times = df['Time'].to_numpy().astype('datetime64[ns]').astype(np.int64)
+    return {
+        'signature': signature(path),
+        'time_min': int(times.min()) if len(times) else None,
+        'time_max': int(times.max()) if len(times) else None,
+        'columns': [col for col in df.columns if col != 'Time'],
+    }
+
+# Same entry from the CSV header and Time column (or the store's meta.json) only
+def scan_source(path):
+    if path.endswith('.csv'):
+        columns = list(pd.read_csv(path, nrows=0).columns)
+        times = pd.read_csv(path, usecols=['Time'], parse_dates=['Time'])['Time']
+        times = times.to_numpy().astype('datetime64[ns]').astype(np.int64)
+    else:
+        dataset = SwisDataset(path)
+        columns = dataset.columns
+        times = dataset.index.values
+    return {
+        'signature': signature(path),
+        'time_min': int(times.min()) if len(times) else None,
+        'time_max': int(times.max()) if len(times) else None,
+        'columns': [col for col in columns if col != 'Time'],
+    }
+
+def folder_columns(entries):
+    """Union of the columns of a folder's files, in order of first appearance (as pd.concat)."""
+    columns = []
+    for entry in entries.values():
+        columns += [col for col in entry['columns'] if col not in columns]
+    return columns
+
+def settings_for(source, entries):
+    return {
+        'source': source,
+        'align_tolerance_ns': pd.Timedelta(ALIGN_TOLERANCE).value,
+        'columns': {folder: folder_columns({key: entry for key, entry in entries.items() if key.startswith(f'{folder}/')})
+                    for folder in folders},
+    }
+
+def full_rebuild(source, sources, chunk_days=None):
+    if chunk_days:
+        return chunked_rebuild(source, sources, chunk_days)
+    entries = {}
+    frames = {}
+    for folder in folders:
+        print(f"Reading {folder} files...")
+        frames[folder] = []
+        for key, path in sources[folder].items():
+            df = read_source(path)
+            entries[key] = describe_source(path, df)
+            frames[folder].append(df)
+        frames[folder] = concat_sorted(frames[folder])
+
+    flux_th1_cols = [col for col in FLUX_COLUMNS['th1'] if col in frames['th1'].columns]
+    print("TH1 flux columns detected:", flux_th1_cols)
+    flux_th2_cols = [col for col in FLUX_COLUMNS['th2'] if col in frames['th2'].columns]
+    print("TH2 flux columns detected:", flux_th2_cols)
+
+    full_df = merge_folders(frames['blk'], frames['th1'], frames['th2'], flux_th1_cols, flux_th2_cols)
+    write_dataset(full_df, dataset_path, DTYPES)
+    return full_df, {'settings': settings_for(source, entries), 'files': entries}
+
+class FolderReader:
+    """Reads just the files of one folder that overlap a time range, caching each file once."""
+
+    def __init__(self, folder, sources, entries, cache=None):
+        self.folder = folder
+        self.sources = sources
+        self.entries = entries
+        self.cache = dict(cache or {})
+
+    def _frame(self, key):
+        if key not in self.cache:
+            self.cache[key] = read_source(self.sources[key])
+        return self.cache[key]
+
+    def _overlapping(self, lo, hi):
+        return [key for key, entry in self.entries.items()
+                if entry['time_min'] is not None and entry['time_min'] <= hi and entry['time_max'] >= lo]
+
+    def neighbours(self, lo, hi):
+        """Time of the last sample before ``lo`` and first after ``hi`` (None if there is none)."""
+        before = [entry['time_max'] for entry in self.entries.values() if entry['time_max'] is not None and entry['time_max'] < lo]
+        after = [entry['time_min'] for entry in self.entries.values() if entry['time_min'] is not None and entry['time_min'] > hi]
+        for key in self._overlapping(lo, hi):
+            times = self._frame(key)['Time'].to_numpy().astype('datetime64[ns]').astype(np.int64)
+            before += [int(times[times < lo].max())] if np.any(times < lo) else []
+            after += [int(times[times > hi].min())] if np.any(times > hi) else []
+        return (max(before) if before else None), (min(after) if after else None)
+
+    def read(self, lo, hi):
+        """Rows with lo <= Time <= hi, concatenated and sorted exactly like a full read."""
+        frames = []
+        for key in sorted(self._overlapping(lo, hi)):
+            df = self._frame(key)
+            times = df['Time'].to_numpy().astype('datetime64[ns]').astype(np.int64)
+            frames.append(df[(times >= lo) & (times <= hi)])
+        # Spans are read in time order, so files ending before this one are done with
+        self.cache = {key: df for key, df in self.cache.items()
+                      if self.entries[key]['time_max'] is not None and self.entries[key]['time_max'] >= lo}
+        return concat_sorted(frames)
+
+def folder_readers(sources, entries, fresh=None):
+    fresh = fresh or {}
+    return {folder: FolderReader(folder, sources[folder],
+                                 {key: entry for key, entry in entries.items() if key.startswith(f'{folder}/')},
+                                 {key: df for key, df in fresh.items() if key.startswith(f'{folder}/')})
+            for folder in folders}
+
+def merge_span(readers, settings, lo, hi):
+    """Merged rows of the BLK samples with lo <= Time <= hi, equal to those rows of a full merge."""
+    blk_df = readers['blk'].read(lo, hi).reindex(columns=['Time'] + settings['columns']['blk'])
+    if blk_df.empty:
+        return blk_df
+    th_frames = {}
+    for folder in ('th1', 'th2'):
+        # The span's rows need their TH neighbours on either side
+        before, after = readers[folder].neighbours(lo, hi)
+        th_frames[folder] = readers[folder].read(lo if before is None else before, hi if after is None else after)
+        th_frames[folder] = th_frames[folder].reindex(columns=['Time'] + settings['columns'][folder])
+    flux_th1_cols = [col for col in FLUX_COLUMNS['th1'] if col in settings['columns']['th1']]
+    flux_th2_cols = [col for col in FLUX_COLUMNS['th2'] if col in settings['columns']['th2']]
+    return merge_folders(blk_df, th_frames['th1'], th_frames['th2'], flux_th1_cols, flux_th2_cols)
+
+def span_chunks(lo, hi, chunk_days=None):
+    """Split [lo, hi] (int ns) at every ``chunk_days`` midnight boundary; one piece without chunking."""
+    if not chunk_days:
+        yield lo, hi
+        return
+    edge = lo - lo % DAY_NS
+    while edge <= hi:
+        yield max(lo, edge), min(hi, edge + chunk_days * DAY_NS - 1)
+        edge += chunk_days * DAY_NS
+
+def blk_range(entries):
+    times = [(entry['time_min'], entry['time_max']) for key, entry in entries.items()
+             if key.startswith('blk/') and entry['time_min'] is not None]
+    if not times:
+        return None, None
+    return min(lo for lo, _ in times), max(hi for _, hi in times)
+
+def chunked_rebuild(source, sources, chunk_days):
+    """Full merge written chunk by chunk, holding only one chunk's files in memory."""
+    entries = {key: scan_source(path) for folder in folders for key, path in sources[folder].items()}
+    settings = settings_for(source, entries)
+    print("TH1 flux columns detected:", [col for col in FLUX_COLUMNS['th1'] if col in settings['columns']['th1']])
+    print("TH2 flux columns detected:", [col for col in FLUX_COLUMNS['th2'] if col in settings['columns']['th2']])
+
+    readers = folder_readers(sources, entries)
+    writer = ColumnStoreWriter(dataset_path, DTYPES)
+    lo, hi = blk_range(entries)
+    chunks = 0
+    try:
+        for chunk_lo, chunk_hi in ([] if lo is None else span_chunks(lo, hi, chunk_days)):
+            chunk_df = merge_span(readers, settings, chunk_lo, chunk_hi)
+            if not chunk_df.empty:
+                writer.append_frame(chunk_df)
+                chunks += 1
+    except Exception:
+        writer.abort()
+        raise
+    writer.close()
+    print(f"🧩 Merged {chunks} chunk(s) of {chunk_days} day(s).")
+    return None, {'settings': settings, 'files': entries}
+
+def incremental_update(source, sources, manifest, chunk_days=None):
+    """Re-merge only the span whose rows can change, and splice it into the stored dataset.
+
+    Returns ``(rows, changed, removed, manifest, span)``, ``span`` being the
+    replaced (start, end) in int ns (None for an open end) or None when no
+    rows changed; or None when the change cannot be applied incrementally
+    (e.g. the set of columns changed) and a full rebuild is needed. With
+    ``chunk_days`` the span is merged and written a chunk at a time.
+    """
+    entries = {}
+    fresh = {}
+    dirty = {folder: [] for folder in folders}
+    for folder in folders:
+        for key, path in sources[folder].items():
+            old = manifest['files'].get(key)
+            if old is not None and old['signature'] == signature(path):
+                entries[key] = old
+                continue
+            fresh[key] = read_source(path)
+            entries[key] = describe_source(path, fresh[key])
+            dirty[folder] += [entries[key]] + ([old] if old is not None else [])
+        dirty[folder] += [old for key, old in manifest['files'].items()
+                          if key.startswith(f'{folder}/') and key not in sources[folder]]
+
+    settings = settings_for(source, entries)
+    if settings != manifest['settings']:
+        return None
+    changed = sum(1 for key in entries if entries[key] is not manifest['files'].get(key))
+    removed = sum(1 for key in manifest['files'] if key not in entries)
+    ranges = {folder: [(entry['time_min'], entry['time_max']) for entry in dirty[folder] if entry['time_min'] is not None]
+              for folder in folders}
+    if not any(ranges.values()):
+        return 0, changed, removed, {'settings': settings, 'files': entries}, None
+
+    readers = folder_readers(sources, entries, fresh)
+
+    # BLK rows in a changed BLK span are replaced. Rows whose nearest TH1/TH2
+    # sample can change lie between the unchanged samples either side of the
+    # changed TH span.
+    lo_bound, hi_bound = [], []
+    if ranges['blk']:
+        lo_bound.append(min(lo for lo, _ in ranges['blk']))
+        hi_bound.append(max(hi for _, hi in ranges['blk']))
+    for folder in ('th1', 'th2'):
+        if ranges[folder]:
+            before, after = readers[folder].neighbours(min(lo for lo, _ in ranges[folder]), max(hi for _, hi in ranges[folder]))
+            lo_bound.append(before)
+            hi_bound.append(after)
+    start = None if None in lo_bound else min(lo_bound)
+    end = None if None in hi_bound else max(hi_bound)
+
+    # Only BLK samples produce rows, so the span is merged within the BLK time range
+    blk_lo, blk_hi = blk_range(entries)
+    merged = []
+    def span_frames():
+        if blk_lo is None:
+            return
+        lo = blk_lo if start is None else max(start, blk_lo)
+        hi = blk_hi if end is None else min(end, blk_hi)
+        for chunk_lo, chunk_hi in (span_chunks(lo, hi, chunk_days) if lo <= hi else []):
+            chunk_df = merge_span(readers, settings, chunk_lo, chunk_hi)
+            merged.append(len(chunk_df))
+            yield chunk_df
+
+    span_start = None if start is None else pd.Timestamp(start, unit='ns')
+    span_end = None if end is None else pd.Timestamp(end, unit='ns')
+    replace_rows(dataset_path, span_frames(), span_start, span_end)
+    return sum(merged), changed, removed, {'settings': settings, 'files': entries}, (start, end)
+
+def load_sources_manifest():
+    if os.path.exists(sources_path):
+        with open(sources_path) as f:
+            return json.load(f)
+    return None
+
+def save_sources_manifest(manifest):
+    with open(sources_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+def main():
+    parser = argparse.ArgumentParser(description='Merge SWIS BLK/TH1/TH2 CSVs into the final dataset.')
+    parser.add_argument('--csv', action='store_true', help=f'Also export the merged dataset as {output_path} (implies --rebuild).')
+    parser.add_argument('--source', choices=['csv', 'store'], default='csv',
+                        help=f"Read the per-file CSVs ({csv_base_path}) or the column stores written by "
+                             f"cdf_to_csv.py --format store ({store_base_path}).")
+    parser.add_argument('--rebuild', action='store_true',
+                        help='Re-merge every file instead of only the span touched by new, changed or removed files.')
+    parser.add_argument('--chunk-days', type=int, default=0,
+                        help='Merge and write the timeline this many days at a time so memory is bounded by one chunk '
+                             '(0 merges everything in memory; ignored with --csv). The output is identical either way.')
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    chunk_days = 0 if args.csv else args.chunk_days
+    profile = RunProfile('data_preparation', profile_path, args.profile)
+
+    with profile.stage('scan') as record:
+        sources = {folder: list_sources(folder, args.source) for folder in folders}
+        manifest = load_sources_manifest()
+        record['rows'] = sum(len(folder_sources) for folder_sources in sources.values())
+    result = None
+    if not args.rebuild and not args.csv and manifest is not None:
+        with profile.stage('incremental_update', chunk_days=chunk_days) as record:
+            result = incremental_update(args.source, sources, manifest, chunk_days)
+            record['rows'] = result[0] if result is not None else 0
+        if result is None:
+            print("⚠️ Source columns or merge settings changed; rebuilding the full dataset.")
+
+    if result is None:
+        with profile.stage('full_rebuild', chunk_days=chunk_days) as record:
+            full_df, manifest = full_rebuild(args.source, sources, chunk_days)
+            save_sources_manifest(manifest)
+            record['rows'] = len(SwisDataset())
+        print(f"\n✅ Final dataset saved at: {dataset_path}")
+        if args.csv:
+            with profile.stage('csv_export', rows=len(full_df)):
+                full_df.to_csv(output_path, index=False)
+            print(f"✅ CSV export saved at: {output_path}")
+    else:
+        rows, changed, removed, manifest, _ = result
+        save_sources_manifest(manifest)
+        if changed or removed:
+            print(f"🔁 {changed} new/changed and {removed} removed file(s): re-merged {rows} row(s).")
+            print(f"\n✅ Final dataset updated at: {dataset_path}")
+        else:
+            print(f"✅ Final dataset at {dataset_path} is up to date.")
+    print(f"🧾 Run profile saved to {profile.save()}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,220 @@
+import argparse
+import json
+import mmap
+import os
+import socket
+import socketserver
+import threading
+import time
+from multiprocessing import shared_memory
+import _posixshmem
+import numpy as np
+
+from swis_store import SwisDataset, dataset_path
+
+# Base paths
+project_root = os.path.dirname(os.path.dirname(__file__))
+socket_path = os.path.join(project_root, 'data', 'dataset.sock')
+
+# Column blocks in the shared segment start on cache-line boundaries
+ALIGN = 64
+
+
+def _meta_stamp(path):
+    """Identity of the store's meta.json; a rewritten store (swapped in by rename) gets a new one."""
+    stat = os.stat(os.path.join(path, 'meta.json'))
+    return [stat.st_ino, stat.st_mtime_ns]
+
+
+class SharedSnapshot:
+    """One generation of the dataset copied into a single shared memory segment.
+
+    The columns (``Time`` as int64 ns, then each stored column) are laid out
+    back to back; ``layout`` records each one's offset, dtype and length so
+    clients can map them as numpy views of the same pages.
+    """
+
+    def __init__(self, path, generation):
+        dataset = SwisDataset(path)
+        self.path = os.path.realpath(path)
+        self.stamp = _meta_stamp(path)
+        self.meta = dataset.meta
+        names = dataset.columns
+        self.layout = {}
+        size = 0
+        for name in names:
+            array = dataset._array(name)
+            self.layout[name] = {'offset': size, 'dtype': array.dtype.str, 'rows': len(array)}
+            size += -(-array.nbytes // ALIGN) * ALIGN
+        self.segment = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for name in names:
+            block = self.layout[name]
+            view = np.ndarray(block['rows'], dtype=block['dtype'], buffer=self.segment.buf, offset=block['offset'])
+            view[:] = dataset._array(name)
+            del view
+        self.generation = generation
+
+    def describe(self):
+        return {'generation': self.generation, 'path': self.path, 'segment': self.segment.name,
+                'meta': self.meta, 'layout': self.layout}
+
+    def release(self):
+        # Clients that still map the segment keep their pages; unlinking only removes its name
+        self.segment.close()
+        self.segment.unlink()
+
+
+class DatasetService(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Long-lived holder of the SWIS dataset, answering JSON-line requests on a Unix socket.
+
+    ``describe`` returns the current snapshot's segment and layout, first
+    reloading it when ``data_preparation.py`` has rewritten the store since;
+    ``shutdown`` stops the service. The previous snapshot's segment is
+    unlinked on reload, so clients opened before it keep reading the
+    generation they attached to.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path=dataset_path, address=socket_path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.snapshot = SharedSnapshot(path, 1)
+        if os.path.exists(address):
+            os.remove(address)
+        super().__init__(address, ServiceHandler)
+
+    def current(self):
+        with self.lock:
+            try:
+                stamp = _meta_stamp(self.path)
+            except FileNotFoundError:
+                # The store is being swapped in; keep serving the current generation
+                stamp = self.snapshot.stamp
+            if stamp != self.snapshot.stamp:
+                previous = self.snapshot
+                self.snapshot = SharedSnapshot(self.path, previous.generation + 1)
+                previous.release()
+                print(f"🔁 Reloaded {self.path} (generation {self.snapshot.generation}, {len(SwisDataset(self.path)):,} rows)")
+            return self.snapshot
+
+    def server_close(self):
+        super().server_close()
+        self.snapshot.release()
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+
+class ServiceHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        for line in self.rfile:
+            request = json.loads(line)
+            if request.get('op') == 'describe':
+                reply = self.server.current().describe()
+            elif request.get('op') == 'shutdown':
+                reply = {'ok': True}
+                threading.Thread(target=self.server.shutdown).start()
+            else:
+                reply = {'error': f"unknown op {request.get('op')!r}"}
+            self.wfile.write((json.dumps(reply) + '\n').encode())
+            self.wfile.flush()
+
+
+def request(op, address=socket_path, timeout=30):
+    """Send one request to the service and return its reply."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(address)
+        sock.sendall((json.dumps({'op': op}) + '\n').encode())
+        reply = b''
+        while not reply.endswith(b'\n'):
+            chunk = sock.recv(1 << 16)
+            if not chunk:
+                break
+            reply += chunk
+    reply = json.loads(reply)
+    if 'error' in reply:
+        raise RuntimeError(reply['error'])
+    return reply
+
+
+class SharedDataset(SwisDataset):
+    """``SwisDataset`` over a service snapshot: every column is a view into the shared segment."""
+
+    def __init__(self, description):
+        self.meta = description['meta']
+        self.path = description['path']
+        self.generation = description['generation']
+        self._index = None
+        # Map the segment read-only and without a SharedMemory handle: the service owns (and unlinks) it, and
+        # the mapping lives exactly as long as the arrays viewing it
+        fd = _posixshmem.shm_open('/' + description['segment'].lstrip('/'), os.O_RDONLY, mode=0o600)
+        try:
+            self.segment = mmap.mmap(fd, os.fstat(fd).st_size, prot=mmap.PROT_READ)
+        finally:
+            os.close(fd)
+        self._arrays = {name: np.frombuffer(self.segment, dtype=block['dtype'], count=block['rows'],
+                                            offset=block['offset'])
+                        for name, block in description['layout'].items()}
+
+    def _array(self, name):
+        if name not in self._arrays:
+            raise KeyError(f"Column '{name}' not in SWIS dataset")
+        return self._arrays[name]
+
+
+def open_dataset(path=dataset_path, address=socket_path):
+    """The dataset at ``path``: shared views from the running service, or a local ``SwisDataset`` without one."""
+    for _ in range(3):
+        if not os.path.exists(address):
+            break
+        try:
+            description = request('describe', address)
+        except (OSError, ValueError):
+            break
+        if description['path'] != os.path.realpath(path):
+            break
+        try:
+            return SharedDataset(description)
+        except FileNotFoundError:
+            # Reloaded (and the old segment unlinked) between the reply and the attach; ask again
+            continue
+    return SwisDataset(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the SWIS dataset from shared memory so analysis and plotting '
+                                                 'scripts map it instead of each loading their own copy.')
+    parser.add_argument('--stop', action='store_true', help='Stop the running service.')
+    parser.add_argument('--status', action='store_true', help='Report the running service and time a client open.')
+    args = parser.parse_args()
+
+    if args.stop:
+        request('shutdown')
+        print(f"🛑 Stopped the dataset service on {socket_path}")
+        return
+    if args.status:
+        started = time.perf_counter()
+        dataset = open_dataset()
+        opened = time.perf_counter() - started
+        if not isinstance(dataset, SharedDataset):
+            print(f"⚠️ No dataset service on {socket_path}; scripts read {dataset_path} directly.")
+            return
+        print(f"✅ Serving {dataset.path} (generation {dataset.generation}, {len(dataset):,} rows, "
+              f"{len(dataset.segment) / (1 << 20):.1f} MB); client open took {opened * 1000:.1f} ms")
+        return
+
+    with DatasetService() as service:
+        snapshot = service.snapshot
+        print(f"📡 Serving {snapshot.path} ({len(SwisDataset(snapshot.path)):,} rows, "
+              f"{snapshot.segment.size / (1 << 20):.1f} MB shared) on {socket_path}")
+        try:
+            service.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    print("🛑 Dataset service stopped.")
+
+
+if __name__ == '__main__':
+    main()
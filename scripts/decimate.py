@@ -0,0 +1,78 @@
+import numpy as np
+
+
+def time_ns(times):
+    """Timestamps (datetime64 array, Series or DatetimeIndex) as int64 nanoseconds."""
+    return np.asarray(times).astype('datetime64[ns]').view('i8')
+
+
+def bucket_ids(times, buckets, start=None, end=None):
+    """Index of the equal-width time bucket (``buckets`` of them over [start, end]) each sample falls in."""
+    t = time_ns(times)
+    start = t[0] if start is None else start
+    end = t[-1] if end is None else end
+    span = max(int(end) - int(start), 1)
+    # In float64: (t - start) * buckets overflows int64 once the span passes ~35 days at 3000 buckets
+    ids = np.floor((t - int(start)) / span * buckets).astype(np.int64)
+    return np.clip(ids, 0, buckets - 1)
+
+
+def minmax_indices(times, values, buckets):
+    """Indices of the first, minimum, maximum and last sample in each of ``buckets`` equal time spans.
+
+    Drawn as a line at a width of ``buckets`` pixels these samples cover the
+    same pixels as the full series (the M4 reduction), so peaks survive while
+    at most 4 points per pixel column are kept. Minima and maxima skip NaN;
+    first and last samples are kept as they are, so gaps still break the line.
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    if n <= 4 * buckets:
+        return np.arange(n)
+    ids = bucket_ids(times, buckets)
+    # Samples are time-sorted, so each bucket is one contiguous run
+    starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+    lasts = np.r_[starts[1:], n] - 1
+    # Sorting by (bucket, value) puts each bucket's smallest (or largest) non-NaN value at its run start
+    lowest = np.lexsort((values, ids))[starts]
+    highest = np.lexsort((-values, ids))[starts]
+    return np.unique(np.concatenate([starts, lasts, lowest, highest]))
+
+
+def decimate(times, values, buckets):
+    """``times`` and ``values`` reduced to at most 4 samples per bucket by ``minmax_indices``."""
+    keep = minmax_indices(times, values, buckets)
+    return np.asarray(times)[keep], np.asarray(values)[keep]
+
+
+def bucket_max(times, values, edges):
+    """Largest non-NaN value in each bin between consecutive ``edges`` (int64 ns); NaN for bins with none."""
+    t = time_ns(times)
+    values = np.asarray(values, dtype=float)
+    inside = slice(np.searchsorted(t, edges[0]), np.searchsorted(t, edges[-1], side='right'))
+    t, values = t[inside], values[inside]
+    result = np.full(len(edges) - 1, np.nan)
+    if not len(t):
+        return result
+    ids = np.minimum(np.searchsorted(edges, t, side='right') - 1, len(result) - 1)
+    starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+    result[ids[starts]] = np.fmax.reduceat(values, starts)
+    return result
+
+
+def check_long_span(days=73, cadence_s=5, buckets=3080):
+    """Decimate ``days`` of synthetic ``cadence_s`` data with one spike; the spike and bucket range must survive."""
+    rng = np.random.default_rng(0)
+    times = np.datetime64('2025-01-01', 'ns') + np.arange(days * 86400 // cadence_s) * np.timedelta64(cadence_s, 's')
+    values = rng.normal(0.0, 1.0, len(times))
+    spike = len(values) * 2 // 3
+    values[spike] = 100.0
+    ids = bucket_ids(times, buckets)
+    assert ids.min() == 0 and ids.max() == buckets - 1 and np.all(np.diff(ids) >= 0), "bucket ids out of range"
+    kept_times, kept = decimate(times, values, buckets)
+    assert spike in minmax_indices(times, values, buckets) and kept.max() == 100.0, "spike lost in decimation"
+    print(f"✅ {len(values)} samples over {days} days → {len(kept)} points in {buckets} buckets; spike kept.")
+
+
+if __name__ == '__main__':
+    check_long_span()
@@ -0,0 +1,176 @@
+import argparse
+import os
+import numpy as np
+import pandas as pd
+
+project_root = os.path.dirname(os.path.dirname(__file__))
+catalog_path = os.path.join(project_root, 'data', 'cactus', 'halo_cmes.csv')
+detected_path = os.path.join(project_root, 'data', 'detected_halo_cmes.csv')
+metrics_path = os.path.join(project_root, 'data', 'evaluation_metrics.txt')
+matches_path = os.path.join(project_root, 'data', 'evaluation_matches.csv')
+
+HOUR_NS = 3_600_000_000_000
+
+
+def as_ns(times):
+    return np.asarray(times).astype('datetime64[ns]').view(np.int64)
+
+
+class IntervalIndex:
+    """Closed intervals [start, end] (int64 ns) indexed for O(log n) overlap queries.
+
+    Intervals are sorted by start with a running maximum of their ends, so
+    "does anything overlap [a, b]" is one ``searchsorted``; sorted ends give
+    overlap counts, and the union of the intervals (disjoint, with cumulative
+    lengths) gives covered time and the first covered instant of any span.
+    All queries are vectorized over arrays of spans.
+    """
+
+    def __init__(self, starts, ends):
+        starts = np.asarray(starts, dtype=np.int64)
+        ends = np.asarray(ends, dtype=np.int64)
+        order = np.argsort(starts, kind='stable')
+        self.starts = starts[order]
+        self.max_ends = np.maximum.accumulate(ends[order])
+        self.sorted_ends = np.sort(ends)
+
+        # Union: a new component opens wherever a start exceeds every earlier end
+        opens = np.flatnonzero(np.concatenate([[True], self.starts[1:] > self.max_ends[:-1]])[:len(starts)])
+        self.union_starts = self.starts[opens]
+        self.union_ends = self.max_ends[np.append(opens[1:] - 1, len(starts) - 1)[:len(opens)]]
+        self.union_covered = np.concatenate([[0], np.cumsum(self.union_ends - self.union_starts)])
+
+    def __len__(self):
+        return len(self.starts)
+
+    def overlaps_any(self, starts, ends):
+        """Whether each span [starts[i], ends[i]] overlaps at least one interval."""
+        k = np.searchsorted(self.starts, ends, side='right')
+        if not len(self):
+            return np.zeros(len(starts), dtype=bool)
+        return (k > 0) & (self.max_ends[np.maximum(k - 1, 0)] >= starts)
+
+    def count_overlaps(self, starts, ends):
+        """Number of intervals overlapping each span: started by its end, minus those ended before its start."""
+        return (np.searchsorted(self.starts, ends, side='right')
+                - np.searchsorted(self.sorted_ends, starts, side='left'))
+
+    def _covered_until(self, times):
+        """Union length covered before each instant."""
+        if not len(self.union_starts):
+            return np.zeros(len(times), dtype=np.int64)
+        i = np.searchsorted(self.union_starts, times, side='right')
+        last = np.maximum(i - 1, 0)
+        partial = np.clip(times - self.union_starts[last], 0, self.union_ends[last] - self.union_starts[last])
+        return np.where(i > 0, self.union_covered[last] + partial, 0)
+
+    def coverage(self, starts, ends):
+        """Time (ns) of each span [starts[i], ends[i]] covered by the union of the intervals."""
+        return self._covered_until(ends) - self._covered_until(starts)
+
+    def first_covered(self, starts, ends):
+        """First instant of each span covered by an interval, or -1 when none is."""
+        if not len(self.union_starts):
+            return np.full(len(starts), -1, dtype=np.int64)
+        i = np.minimum(np.searchsorted(self.union_ends, starts, side='left'), len(self.union_ends) - 1)
+        first = np.maximum(self.union_starts[i], starts)
+        hit = (self.union_ends[i] >= starts) & (first <= ends)
+        return np.where(hit, first, -1)
+
+
+def evaluate(detected_start, detected_end, expected_start, expected_end, arrival=None,
+             tolerance_before=0, tolerance_after=0, min_coverage=0.0):
+    """Match detected intervals against catalog expected windows.
+
+    Expected windows are widened by ``tolerance_before``/``tolerance_after``
+    (ns). A catalog CME is a true positive when detections cover at least
+    ``min_coverage`` of its widened window (any overlap when 0), else a false
+    negative; a detection overlapping no widened window is a false positive.
+    Repeated detections (the same interval found from several CME windows)
+    are counted once. Returns the summary metrics and per-CME match arrays:
+    overlapping detections, first detected instant, its offset from
+    ``arrival`` (defaults to the window start) and the covered fraction.
+    """
+    detections = np.unique(np.column_stack([as_ns(detected_start), as_ns(detected_end)]), axis=0)
+    window_start = as_ns(expected_start) - tolerance_before
+    window_end = as_ns(expected_end) + tolerance_after
+    detected = IntervalIndex(detections[:, 0], detections[:, 1])
+    windows = IntervalIndex(window_start, window_end)
+
+    counts = detected.count_overlaps(window_start, window_end)
+    covered = np.maximum(window_end - window_start, 1)
+    overlap_fraction = detected.coverage(window_start, window_end) / covered
+    first = detected.first_covered(window_start, window_end)
+    matched = (counts > 0) & (overlap_fraction >= min_coverage)
+    reference = as_ns(arrival) if arrival is not None else window_start
+    offset_h = np.where(first >= 0, (first - reference) / HOUR_NS, np.nan)
+
+    tp = int(matched.sum())
+    fn = len(matched) - tp
+    fp = int((~windows.overlaps_any(detections[:, 0], detections[:, 1])).sum())
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    metrics = {
+        'Precision': precision, 'Recall': recall, 'F1': f1, 'TP': tp, 'FP': fp, 'FN': fn,
+        'Detections': len(detections),
+        'Mean_Onset_Offset_h': float(np.mean(offset_h[matched])) if tp else float('nan'),
+        'Mean_Overlap_Fraction': float(np.mean(overlap_fraction[matched])) if tp else float('nan'),
+    }
+    matches = {
+        'Matched': matched,
+        'Detections': counts,
+        'First_Detected': np.where(first >= 0, first, np.iinfo(np.int64).min).view('datetime64[ns]'),
+        'Onset_Offset_h': offset_h,
+        'Overlap_Fraction': overlap_fraction,
+    }
+    return metrics, matches
+
+
+def write_metrics(metrics, path=metrics_path):
+    with open(path, 'w') as f:
+        f.write(f"Precision: {metrics['Precision']:.2f}\n")
+        f.write(f"Recall: {metrics['Recall']:.2f}\n")
+        f.write(f"F1 Score: {metrics['F1']:.2f}\n")
+        f.write(f"True Positives: {metrics['TP']}\n")
+        f.write(f"False Positives: {metrics['FP']}\n")
+        f.write(f"False Negatives: {metrics['FN']}\n")
+        f.write(f"Mean Onset Offset (h): {metrics['Mean_Onset_Offset_h']:.2f}\n")
+        f.write(f"Mean Overlap Fraction: {metrics['Mean_Overlap_Fraction']:.2f}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Evaluate detected halo CMEs against the CACTus expected windows.')
+    parser.add_argument('--detected', default=detected_path)
+    parser.add_argument('--catalog', default=catalog_path)
+    parser.add_argument('--tolerance-before', type=float, default=0.0,
+                        help='Hours to widen each expected window by before Expected_Start.')
+    parser.add_argument('--tolerance-after', type=float, default=0.0,
+                        help='Hours to widen each expected window by after Expected_End.')
+    parser.add_argument('--min-coverage', type=float, default=0.0,
+                        help='Fraction of the expected window detections must cover to count as a match (0: any overlap).')
+    args = parser.parse_args()
+
+    catalog = pd.read_csv(args.catalog, parse_dates=['Expected_Start', 'Expected_End', 'Estimated_Arrival'])
+    if os.path.exists(args.detected):
+        detected = pd.read_csv(args.detected, parse_dates=['Detected_Start', 'Detected_End'])
+    else:
+        print(f"⚠️ No detections found at {args.detected}; evaluating an empty result.")
+        detected = pd.DataFrame({'Detected_Start': pd.to_datetime([]), 'Detected_End': pd.to_datetime([])})
+
+    metrics, matches = evaluate(detected['Detected_Start'], detected['Detected_End'],
+                                catalog['Expected_Start'], catalog['Expected_End'], catalog['Estimated_Arrival'],
+                                int(args.tolerance_before * HOUR_NS), int(args.tolerance_after * HOUR_NS),
+                                args.min_coverage)
+    write_metrics(metrics)
+    report = catalog[['CME_Number', 'Estimated_Arrival', 'Expected_Start', 'Expected_End']].assign(**matches)
+    report.to_csv(matches_path, index=False)
+
+    print(f"\n📈 {len(catalog)} catalog CME(s), {metrics['Detections']} distinct detection(s)")
+    print(f"✅ Precision {metrics['Precision']:.2f}, Recall {metrics['Recall']:.2f}, F1 {metrics['F1']:.2f} "
+          f"(TP {metrics['TP']}, FP {metrics['FP']}, FN {metrics['FN']})")
+    print(f"📄 Metrics saved to {metrics_path}, per-CME matches to {matches_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,6 @@
-import pandas as pd
+from swis_store import SwisDataset
 
-final_dataset_path = '../data/final_dataset.csv'
-df = pd.read_csv(final_dataset_path)
+df = SwisDataset()
 
 print("\n✅ Columns available in the final dataset:\n")
 print(df.columns)
@@ -1,14 +1,17 @@
 # Updated Detection Script (halo_cme_detection.py) with Enhanced Sensitivity, Merging, Filtering, Categorization, Adaptive Weighting, Quiet-Time Baseline, FN Diagnostics, and Cluster Support
 
+import argparse
 import pandas as pd
 import numpy as np
 from datetime import timedelta
 import os
 from scipy.signal import find_peaks
-
-# Load dataset
-swis_data = pd.read_csv('data/final_dataset.csv', parse_dates=['Time'])
-catalog = pd.read_csv('data/cactus/halo_cmes.csv', parse_dates=['Launch_Time', 'Expected_Start', 'Expected_End'])
+from baseline_store import BaselineStore, dataset_settings, dataset_signatures
+from dataset_service import open_dataset
+from swis_store import TimeIndex
+from run_profile import RunProfile, add_profile_argument, measure
+from score_store import ScoreStore, ScoreStoreWriter, score_store_path
+from rolling_stats import RollingEngine
 
 # Set parameters
 MIN_DURATION = timedelta(minutes=30)
@@ -19,9 +22,16 @@ NOISE_SCORE_MIN = 10.0
 MERGE_GAP = timedelta(minutes=10)
 PEAK_PROMINENCE = 5
 MIN_PEAKS_FOR_CLUSTER = 2
+WINDOW_PADDING = timedelta(hours=48)
+DAY = pd.Timedelta(days=1)
 
-debug_dir = '../data/debug_scores'
-os.makedirs(debug_dir, exist_ok=True)
+project_root = os.path.dirname(os.path.dirname(__file__))
+DETECTED_PATH = os.path.join(project_root, 'data', 'detected_halo_cmes.csv')
+CATALOG_PATH = os.path.join(project_root, 'data', 'cactus', 'halo_cmes.csv')
+FALSE_NEGATIVES_PATH = os.path.join(project_root, 'data', 'false_negatives.csv')
+PROFILE_PATH = os.path.join(os.path.dirname(DETECTED_PATH), 'halo_cme_detection_profile.json')
+DETECTED_COLUMNS = ['CME_Number', 'Detected_Start', 'Detected_End', 'Avg_Score', 'Strength', 'Event_Type']
+FALSE_NEGATIVE_COLUMNS = ['CME_Number', 'Expected_Start', 'Expected_End', 'Window_Start', 'Window_End']
 
 # Adaptive Weights for Composite Score
 weights = {
@@ -38,151 +48,647 @@ weights = {
 
 params = list(weights.keys())
 
-# --- Quiet-Time Global Baseline ---
-swis_data['Date'] = swis_data['Time'].dt.date
-global_baseline = {}
-for param in params:
-    if param in swis_data.columns:
-        daily_stats = swis_data.groupby('Date')[param].agg(['mean', 'std']).reset_index()
-        global_baseline[param] = daily_stats.rename(columns={'mean': 'daily_mean', 'std': 'daily_std'})
-
-print("\n🚀 Starting Halo CME Detection...\n")
-detected_events = []
-false_negatives = []
-
-for _, row in catalog.iterrows():
-    print(f"🔍 Processing CME {row['CME_Number']}...")
-
-    cme_start = row['Expected_Start']
-    cme_end = row['Expected_End']
-    window_start = cme_start - timedelta(hours=48)
-    window_end = cme_end + timedelta(hours=48)
-
-    data_window = swis_data[(swis_data['Time'] >= window_start) & (swis_data['Time'] <= window_end)].copy()
-    if data_window.empty:
-        print("⚠️ No SWIS data found in this window.")
-        continue
-
-    composite_score = pd.Series(0, index=data_window.index)
 
+def load_global_baseline(swis_data, resolution='daily', exclude_detected=False, rebuild=False, dataset=None):
+    """Quiet-time global baseline from the on-disk store, refreshing only changed days.
+
+    ``swis_data`` is the SWIS frame, or an iterable of frames cut at midnight
+    boundaries (``SwisDataset.chunks``) so the timeline is never held whole,
+    taken from ``dataset`` (the final dataset by default). A day is stale
+    when the digest of its rows in the dataset, or the dataset's merge
+    settings, changed since its buckets were stored.
+    """
+    exclude_intervals = []
+    if exclude_detected and os.path.exists(DETECTED_PATH):
+        previous = pd.read_csv(DETECTED_PATH, parse_dates=['Detected_Start', 'Detected_End'])
+        exclude_intervals = list(zip(previous['Detected_Start'], previous['Detected_End']))
+    global_baseline = BaselineStore(resolution=resolution, exclude_intervals=exclude_intervals)
+    dataset = open_dataset() if dataset is None else dataset
+    signatures = dataset_signatures(dataset, params)
+    settings = dataset_settings(dataset)
+    refreshed = []
+    for i, frame in enumerate([swis_data] if isinstance(swis_data, pd.DataFrame) else swis_data):
+        refreshed += global_baseline.update(frame, params, signatures, force=rebuild and i == 0,
+                                            dataset_settings=settings)
+    print(f"📦 Quiet-time baseline ({resolution}): refreshed {len(refreshed)} bucket(s), "
+          f"excluding {len(exclude_intervals)} detected interval(s).")
+    return global_baseline
+
+
+def rolling_mean_std(values, window=ROLLING_WINDOW):
+    """Trailing rolling mean and std (ddof=1) over ``window`` samples, skipping NaNs.
+
+    Equivalent to ``rolling(window, min_periods=1).mean()/.std()``, except that
+    every output is summed from the same inputs in the same order no matter
+    where the series starts. A window cut out of a longer series therefore
+    gets bit-identical statistics once it is ``window - 1`` samples in.
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+    lags = range(min(window, n))
+
+    total = np.zeros(n)
+    count = np.zeros(n)
+    for lag in lags:
+        total[lag:] += filled[:n - lag]
+        count[lag:] += valid[:n - lag]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / count
+
+    squares = np.zeros(n)
+    for lag in lags:
+        deviation = filled[:n - lag] - mean[lag:]
+        squares[lag:] += np.where(valid[:n - lag], deviation * deviation, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        std = np.where(count > 1, np.sqrt(squares / (count - 1)), np.nan)
+    return mean, std
+
+
+def local_z_scores(values, window=ROLLING_WINDOW):
+    """Positive rolling z-score of each sample against its trailing window."""
+    values = np.asarray(values, dtype=float)
+    mean, std = rolling_mean_std(values, window)
+    std[std == 0] = 1e-6
+    return np.clip((values - mean) / std, 0, None)
+
+
+def multi_scale_local_z(values, scales):
+    """{scale: positive rolling z-score} for several trailing window lengths, from one ``RollingEngine``."""
+    values = np.asarray(values, dtype=float)
+    engine = RollingEngine(values)
+    local_z = {}
+    for scale in scales:
+        stats = engine.stats(scale)
+        std = stats['std']
+        std[std == 0] = 1e-6
+        local_z[scale] = np.clip((values - stats['mean']) / std, 0, None)
+    return local_z
+
+
+def scale_key(param, scale):
+    """Pseudo-parameter holding one parameter's combined z-scores at one rolling-window length."""
+    return f'{param}@{scale}'
+
+
+def scale_weights(scales, param_weights=weights):
+    """Multi-scale weights: each parameter's weight split evenly over its scales."""
+    return {scale_key(param, scale): weight / len(scales) for param, weight in param_weights.items() for scale in scales}
+
+
+def global_z_scores(times, values, param, global_baseline):
+    """Positive z-score of each sample against its day's (or hour's) global baseline."""
+    daily_mean, daily_std = global_baseline.lookup(times, param)
+    daily_std[daily_std == 0] = 1e-6
+    return np.clip((np.asarray(values, dtype=float) - daily_mean) / daily_std, 0, None)
+
+
+def adaptive_thresholds(combined_z, percentile=PERCENTILE_THRESHOLD, floor=COMPOSITE_THRESHOLD_MIN):
+    """Per-parameter threshold: the window's combined-z percentile, floored at COMPOSITE_THRESHOLD_MIN.
+
+    A parameter without any valid z-score in the window (composite_flux across
+    a TH1/TH2 gap) gets the floor; it adds nothing to the composite either way.
+    """
+    thresholds = {}
+    for param, z in combined_z.items():
+        valid = z[~np.isnan(z)]
+        thresholds[param] = max(floor, np.percentile(valid, percentile)) if len(valid) else floor
+    return thresholds
+
+
+def composite_from_z(combined_z, length, thresholds=None, param_weights=None):
+    """Weighted, adaptively thresholded composite score from per-parameter combined z-scores."""
+    if thresholds is None:
+        thresholds = adaptive_thresholds(combined_z)
+    if param_weights is None:
+        param_weights = weights
+    composite_score = np.zeros(length)
+    for param, z in combined_z.items():
+        score_contrib = param_weights[param] * (z > thresholds[param]) * z
+        composite_score += np.where(np.isnan(score_contrib), 0.0, score_contrib)
+    return composite_score
+
+
+def window_combined_z(data_window, global_baseline):
+    """Per-parameter combined (half local, half global) z-scores of one window."""
+    combined_z = {}
     for param in params:
         if param not in data_window.columns:
             print(f"⚠️ Parameter {param} not found in data.")
             continue
 
-        data_window[f'{param}_mean'] = data_window[param].rolling(window=ROLLING_WINDOW, min_periods=1).mean()
-        data_window[f'{param}_std'] = data_window[param].rolling(window=ROLLING_WINDOW, min_periods=1).std()
-        data_window[f'{param}_std'] = data_window[f'{param}_std'].replace(0, 1e-6)
-
-        local_z = (data_window[param] - data_window[f'{param}_mean']) / data_window[f'{param}_std']
-        local_z = local_z.clip(lower=0)
-
-        data_window['Date'] = data_window['Time'].dt.date
-        merged = pd.merge(data_window[['Time', 'Date', param]], global_baseline[param], on='Date', how='left')
-        merged['daily_std'] = merged['daily_std'].replace(0, 1e-6)
-        global_z = ((merged[param] - merged['daily_mean']) / merged['daily_std']).clip(lower=0)
-
-        combined_z = 0.5 * local_z + 0.5 * global_z
-        adaptive_threshold = max(COMPOSITE_THRESHOLD_MIN, np.percentile(combined_z.dropna(), PERCENTILE_THRESHOLD))
-        score_contrib = weights[param] * (combined_z > adaptive_threshold) * combined_z
-
-        composite_score += score_contrib.fillna(0)
-
-    data_window['Composite_Score'] = composite_score
-    data_window[['Time', 'Composite_Score']].to_csv(os.path.join(debug_dir, f"CME_{row['CME_Number']}_scores.csv"), index=False)
-
-    threshold = np.percentile(composite_score.dropna(), PERCENTILE_THRESHOLD)
-    print(f"\n📊 Composite Score Summary for CME {row['CME_Number']}")
-    print(data_window['Composite_Score'].describe())
-    print(f"🎯 {PERCENTILE_THRESHOLD}th Percentile Threshold: {threshold:.2f}")
-
-    data_window['High_Score'] = data_window['Composite_Score'] > threshold
-    data_window['Group'] = (data_window['High_Score'] != data_window['High_Score'].shift()).cumsum()
-
-    candidate_events = []
-    for _, group_df in data_window.groupby('Group'):
-        if not group_df['High_Score'].iloc[0]:
-            continue
-
-        start_time = group_df['Time'].iloc[0]
-        end_time = group_df['Time'].iloc[-1]
-        avg_score = group_df['Composite_Score'].mean()
-
-        if avg_score >= NOISE_SCORE_MIN:
-            candidate_events.append((start_time, end_time, avg_score))
-
-    merged_events = []
-    for event in sorted(candidate_events):
-        if not merged_events:
-            merged_events.append(list(event))
+        values = data_window[param].to_numpy(dtype=float)
+        local_z = local_z_scores(values)
+        global_z = global_z_scores(data_window['Time'].to_numpy(), values, param, global_baseline)
+        combined_z[param] = 0.5 * local_z + 0.5 * global_z
+    return combined_z
+
+
+def scores_from_z(combined_z, length, param_weights=None):
+    """(combined z-scores, adaptive thresholds, composite score) of a window."""
+    thresholds = adaptive_thresholds(combined_z)
+    return combined_z, thresholds, composite_from_z(combined_z, length, thresholds, param_weights)
+
+
+def scale_composites(combined_z, length, thresholds, scales, param_weights):
+    """Each scale's part of a multi-scale composite score: the composite over that scale's pseudo-parameters."""
+    return {scale: composite_from_z({key: z for key, z in combined_z.items() if key.endswith(f'@{scale}')},
+                                    length, thresholds, param_weights)
+            for scale in scales}
+
+
+def score_window(data_window, global_baseline):
+    """Per-window path: score a single CME window from scratch."""
+    return scores_from_z(window_combined_z(data_window, global_baseline), len(data_window))
+
+
+def timeline_z_scores(times, values, param, global_baseline, window=ROLLING_WINDOW):
+    """Global and combined z-scores of one parameter over the full timeline."""
+    global_z = global_z_scores(times, values, param, global_baseline)
+    return global_z, 0.5 * local_z_scores(values, window) + 0.5 * global_z
+
+
+class TimelineScores:
+    """Global path: z-scores computed once over the full timeline, viewed per CME window.
+
+    Rolling statistics are start-independent (see ``rolling_mean_std``), so a
+    window only needs its first ``window - 1`` samples re-scored from
+    the window start; everything else is sliced from the timeline arrays.
+    Windows that cover the same samples share a single composite score.
+
+    With ``scales`` (window lengths) every parameter is scored once per
+    scale, as pseudo-parameters ``param@scale`` sharing the parameter's
+    global z-score and weighted by ``scale_weights``; the local z-scores of
+    all scales come from one ``RollingEngine`` pass over the timeline.
+    """
+
+    def __init__(self, swis_data, global_baseline, window=ROLLING_WINDOW, scales=None):
+        self.window = window
+        self.scales = scales
+        self.param_weights = scale_weights(scales) if scales else weights
+        times = swis_data['Time'].to_numpy()
+        self.values = {}
+        self.global_z = {}
+        self.combined_z = {}
+        self.windows = {}
+        for param in params:
+            if param not in swis_data.columns:
+                print(f"⚠️ Parameter {param} not found in data.")
+                continue
+            values = swis_data[param].to_numpy(dtype=float)
+            if not scales:
+                self.values[param] = values
+                self.global_z[param], self.combined_z[param] = timeline_z_scores(times, values, param, global_baseline,
+                                                                                window)
+                self.windows[param] = window
+                continue
+            global_z = global_z_scores(times, values, param, global_baseline)
+            for scale, local_z in multi_scale_local_z(values, scales).items():
+                key = scale_key(param, scale)
+                self.values[key], self.global_z[key] = values, global_z
+                self.combined_z[key] = 0.5 * local_z + 0.5 * global_z
+                self.windows[key] = scale
+        self._cache = {}
+
+    @classmethod
+    def from_arrays(cls, values, global_z, combined_z, window=ROLLING_WINDOW):
+        """Timeline over precomputed per-parameter arrays (e.g. filled in by worker processes)."""
+        timeline = cls.__new__(cls)
+        timeline.window = window
+        timeline.scales = None
+        timeline.param_weights = weights
+        timeline.values = {param: values[param] for param in params if param in combined_z}
+        timeline.global_z = {param: global_z[param] for param in timeline.values}
+        timeline.combined_z = {param: combined_z[param] for param in timeline.values}
+        timeline.windows = {param: window for param in timeline.values}
+        timeline._cache = {}
+        return timeline
+
+    def window_z(self, param, start, stop):
+        window = self.windows[param]
+        combined = self.combined_z[param][start:stop].copy()
+        head = min(window - 1, stop - start)
+        head_values = self.values[param][start:start + head]
+        if self.scales:
+            head_local = multi_scale_local_z(head_values, [window])[window]
+        else:
+            head_local = local_z_scores(head_values, window)
+        combined[:head] = 0.5 * head_local + 0.5 * self.global_z[param][start:start + head]
+        return combined
+
+    def scores(self, start, stop):
+        """(combined z-scores, adaptive thresholds, composite score) of rows [start, stop), as ``scores_from_z``."""
+        key = (start, stop)
+        if key not in self._cache:
+            combined_z = {param: self.window_z(param, start, stop) for param in self.combined_z}
+            self._cache[key] = scores_from_z(combined_z, stop - start, self.param_weights)
+        return self._cache[key]
+
+    def composite(self, start, stop):
+        return self.scores(start, stop)[2]
+
+
+def event_ranges(times, scores, threshold, noise_min=NOISE_SCORE_MIN, merge_gap=MERGE_GAP):
+    """Merged high-score events of a window as inclusive row-index ranges.
+
+    Runs of scores above ``threshold`` are found with ``np.diff`` on the
+    boolean mask and averaged with one ``np.add.reduceat``; runs averaging
+    below NOISE_SCORE_MIN are dropped and the rest merged across gaps of at
+    most MERGE_GAP in a single vectorized pass. Returns ``(first, last,
+    score)`` arrays, ``score`` being the highest run average in each event.
+    """
+    scores = np.asarray(scores, dtype=float)
+    high = scores > threshold
+    edges = np.diff(high.astype(np.int8), prepend=0, append=0)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1) - 1
+    if not len(starts):
+        return starts, ends, np.empty(0)
+
+    # Sum each run [start, end]; the odd reduceat segments are the gaps between runs
+    bounds = np.column_stack([starts, ends + 1]).ravel()
+    run_sums = np.add.reduceat(np.append(scores, 0.0), bounds)[::2]
+    averages = run_sums / (ends - starts + 1)
+    keep = averages >= noise_min
+    starts, ends, averages = starts[keep], ends[keep], averages[keep]
+    if not len(starts):
+        return starts, ends, averages
+
+    times = np.asarray(times).astype('datetime64[ns]').view(np.int64)
+    gaps = times[starts[1:]] - times[ends[:-1]]
+    opens = np.flatnonzero(np.concatenate([[True], gaps > pd.Timedelta(merge_gap).value]))
+    closes = np.append(opens[1:] - 1, len(starts) - 1)
+    return starts[opens], ends[closes], np.maximum.reduceat(averages, opens)
+
+
+def extract_events(data_window, threshold):
+    """Threshold, denoise and merge high-score runs into (start, end, score, first, last) events.
+
+    ``first`` and ``last`` are the event's inclusive row positions in ``data_window``.
+    """
+    times = data_window['Time'].to_numpy()
+    first, last, score = event_ranges(times, data_window['Composite_Score'].to_numpy(), threshold)
+    return [(pd.Timestamp(times[i]), pd.Timestamp(times[j]), float(s), int(i), int(j))
+            for i, j, s in zip(first, last, score)]
+
+
+def event_strength(score):
+    return "Strong" if score > 100 else "Moderate" if score > 30 else "Weak"
+
+
+def event_type(scores, threshold):
+    """'Clustered' when the event's composite score has several distinct peaks above threshold."""
+    peaks, _ = find_peaks(scores, height=threshold, distance=5)
+    return 'Clustered' if len(peaks) >= MIN_PEAKS_FOR_CLUSTER else 'Single'
+
+
+def classify_events(data_window, merged_events, threshold):
+    """Detected-event records (strength and single/clustered type) for merged events of a window."""
+    events = []
+    scores = data_window['Composite_Score'].to_numpy()
+    for start_time, end_time, score, first, last in merged_events:
+        events.append({
+            'Detected_Start': start_time,
+            'Detected_End': end_time,
+            'Avg_Score': round(score, 2),
+            'Strength': event_strength(score),
+            'Event_Type': event_type(scores[first:last + 1], threshold)
+        })
+    return events
+
+
+class WindowScorer:
+    """Composite score of a CME window from the in-memory timeline, or straight from the column store.
+
+    With ``swis_data`` a window is sliced by ``TimeIndex`` and scored from the
+    global ``timeline`` when one is given, else from scratch; without it
+    (out-of-core runs) the window is read from ``dataset``. Each window's
+    z-scores go to the ``scores`` store writer when one is given.
+    """
+
+    def __init__(self, global_baseline, swis_data=None, timeline=None, dataset=None, columns=None, scores=None):
+        self.global_baseline = global_baseline
+        self.swis_data = swis_data
+        self.timeline = timeline
+        self.dataset = dataset
+        self.columns = columns
+        self.scores = scores
+        self.time_index = TimeIndex.of(swis_data) if swis_data is not None else None
+
+    def score(self, window_start, window_end):
+        """(window rows, ``scores_from_z`` triple) of [window_start, window_end]; rows are empty when there is no data."""
+        if self.swis_data is None:
+            window_data = self.dataset.to_frame(self.columns, window_start, window_end)
+            return window_data, (score_window(window_data, self.global_baseline) if len(window_data) else None)
+        start, stop = self.time_index.locate(window_start, window_end)
+        window_data = self.swis_data.iloc[start:stop]
+        if window_data.empty:
+            return window_data, None
+        if self.timeline is not None:
+            return window_data, self.timeline.scores(start, stop)
+        return window_data, score_window(window_data, self.global_baseline)
+
+    def detect(self, cme_number, window_start, window_end, write_scores=True):
+        """Score, threshold and classify one CME window; None when the window has no SWIS data."""
+        window_data, scores = self.score(window_start, window_end)
+        if window_data.empty:
+            return None
+        combined_z, thresholds, composite_score = scores
+        if write_scores and self.scores is not None:
+            self.scores.write_window(cme_number, combined_z)
+
+        # Only the scores travel on from here, so the parameter columns are never copied
+        data_window = pd.DataFrame({'Time': window_data['Time'].to_numpy(), 'Composite_Score': composite_score})
+        threshold = np.percentile(composite_score[~np.isnan(composite_score)], PERCENTILE_THRESHOLD)
+        merged_events = extract_events(data_window, threshold)
+        events = classify_events(data_window, merged_events, threshold)
+        if self.timeline is not None and self.timeline.scales:
+            # Per-scale part of each event's composite score, averaged over its rows
+            parts = scale_composites(combined_z, len(data_window), thresholds, self.timeline.scales,
+                                     self.timeline.param_weights)
+            for event, (_, _, _, first, last) in zip(events, merged_events):
+                for scale, part in parts.items():
+                    event[f'Scale_{scale}_Score'] = round(float(part[first:last + 1].mean()), 2)
+        return {
+            'rows': len(data_window),
+            'summary': data_window['Composite_Score'].describe(),
+            'threshold': threshold,
+            'thresholds': thresholds,
+            'events': events,
+        }
+
+
+def write_results(detected_events, false_negatives):
+    """Rewrite both result CSVs, header-only when a list is empty, so no rows of an earlier run survive."""
+    for records, columns, path in ((detected_events, DETECTED_COLUMNS, DETECTED_PATH),
+                                   (false_negatives, FALSE_NEGATIVE_COLUMNS, FALSE_NEGATIVES_PATH)):
+        (pd.DataFrame(records) if records else pd.DataFrame(columns=columns)).to_csv(path, index=False)
+
+
+def affected_span(times, start, end):
+    """Time range [lo, hi] (int ns) whose scores can change when rows in [start, end] were rewritten.
+
+    Baseline buckets are refreshed a whole day at a time and the rolling
+    statistics reach ROLLING_WINDOW - 1 rows past the span; ``None`` ends are
+    open and ``times`` is the updated int64-ns timeline.
+    """
+    if not len(times):
+        return None, None
+    day = DAY.value
+    lo = times[0] if start is None else start - start % day
+    if end is None:
+        return int(lo), int(times[-1])
+    tail = min(int(np.searchsorted(times, end, side='right')) + ROLLING_WINDOW - 2, len(times) - 1)
+    return int(lo), int(max(end - end % day + day - 1, times[tail]))
+
+
+def update_detections(dataset, start=None, end=None, resolution='daily'):
+    """Re-score only the CME windows overlapping rows rewritten in [start, end] (int ns, None for open ends).
+
+    The baseline is refreshed over the span's days only. Other windows keep
+    their rows in the detected and false-negative CSVs and their z-scores are
+    copied from the existing score store, so the outputs equal a full run's.
+    Without a score store (or when its parameters or threshold percentile
+    differ) every window is re-scored. Returns the CME numbers that were re-scored.
+    """
+    columns = [param for param in params if param in dataset.columns]
+    catalog = pd.read_csv(CATALOG_PATH, parse_dates=['Launch_Time', 'Expected_Start', 'Expected_End'])
+    windows = [(row['CME_Number'], row['Expected_Start'] - WINDOW_PADDING, row['Expected_End'] + WINDOW_PADDING)
+               for _, row in catalog.iterrows()]
+    time_index = dataset.index
+    lo, hi = affected_span(time_index.values, start, end)
+    if lo is not None:
+        day = DAY.value
+        global_baseline = load_global_baseline([dataset.to_frame(columns, pd.Timestamp(lo - lo % day, unit='ns'),
+                                                                 pd.Timestamp(hi - hi % day + day - 1, unit='ns'))],
+                                               resolution, dataset=dataset)
+    else:
+        global_baseline = BaselineStore(resolution=resolution)
+
+    old = ScoreStore() if os.path.exists(os.path.join(score_store_path, 'index.json')) else None
+    if old is not None and (old.params != columns or old.index.get('percentile') != PERCENTILE_THRESHOLD):
+        old = None
+    old_detected = pd.DataFrame(columns=['CME_Number'])
+    old_false_negatives = pd.DataFrame(columns=['CME_Number'])
+    if old is not None and os.path.exists(DETECTED_PATH):
+        old_detected = pd.read_csv(DETECTED_PATH, parse_dates=['Detected_Start', 'Detected_End'],
+                                   float_precision='round_trip')
+    if old is not None and os.path.exists(FALSE_NEGATIVES_PATH):
+        old_false_negatives = pd.read_csv(FALSE_NEGATIVES_PATH, float_precision='round_trip',
+                                          parse_dates=['Expected_Start', 'Expected_End', 'Window_Start', 'Window_End'])
+
+    ranges = {cme_number: time_index.locate(window_start, window_end) for cme_number, window_start, window_end in windows}
+    scores = ScoreStoreWriter(score_store_path, time_index.values, ranges, columns, weights, ROLLING_WINDOW - 1)
+    scorer = WindowScorer(global_baseline, dataset=dataset, columns=columns, scores=scores)
+    detected_events = []
+    false_negatives = []
+    window_thresholds = {}
+    composite_thresholds = {}
+    rescored = []
+    try:
+        for (_, row), (cme_number, window_start, window_end) in zip(catalog.iterrows(), windows):
+            rows = ranges[cme_number][1] - ranges[cme_number][0]
+            kept = (old is not None and lo is not None
+                    and (window_end.value < lo or window_start.value > hi)
+                    and (cme_number in old if rows else cme_number not in old))
+            if kept and rows and len(old.times(cme_number)) != rows:
+                kept = False
+            if kept:
+                if rows:
+                    scores.write_window(cme_number, old.z_scores(cme_number))
+                    window_thresholds[cme_number] = old.index['windows'][str(int(cme_number))]['thresholds']
+                    composite_thresholds[cme_number] = old.threshold(cme_number)
+                detected_events += old_detected[old_detected['CME_Number'] == cme_number].to_dict('records')
+                false_negatives += old_false_negatives[old_false_negatives['CME_Number'] == cme_number].to_dict('records')
+                continue
+            rescored.append(cme_number)
+            result = scorer.detect(cme_number, window_start, window_end)
+            if result is None:
+                continue
+            window_thresholds[cme_number] = result['thresholds']
+            composite_thresholds[cme_number] = result['threshold']
+            if result['events']:
+                detected_events += [{'CME_Number': cme_number, **event} for event in result['events']]
+            else:
+                false_negatives.append({
+                    'CME_Number': cme_number,
+                    'Expected_Start': row['Expected_Start'],
+                    'Expected_End': row['Expected_End'],
+                    'Window_Start': window_start,
+                    'Window_End': window_end
+                })
+    except Exception:
+        scores.abort()
+        raise
+    scores.close(window_thresholds, composite_thresholds, PERCENTILE_THRESHOLD)
+
+    write_results(detected_events, false_negatives)
+    print(f"🔍 Re-scored {len(rescored)} of {len(windows)} CME window(s); {len(detected_events)} detected event(s), "
+          f"{len(false_negatives)} false negative(s).")
+    return rescored
+
+
+def window_lengths(text):
+    scales = sorted({int(scale) for scale in text.split(',')})
+    if scales[0] < 2:
+        raise argparse.ArgumentTypeError(f"rolling windows need at least 2 samples, got {scales[0]}")
+    return scales
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Detect halo CME signatures in SWIS data around CACTus catalog windows.')
+    parser.add_argument('--scoring', choices=['global', 'window'], default='global',
+                        help="'global' scores the full timeline once and slices it per CME; "
+                             "'window' re-scores every CME window from scratch.")
+    parser.add_argument('--baseline-resolution', choices=['daily', 'hourly'], default='daily',
+                        help='Bucket size of the quiet-time global baseline.')
+    parser.add_argument('--exclude-detected', action='store_true',
+                        help=f'Leave intervals already listed in {DETECTED_PATH} out of the quiet-time baseline.')
+    parser.add_argument('--rebuild-baseline', action='store_true',
+                        help='Recompute every baseline bucket instead of only days whose SWIS files changed.')
+    parser.add_argument('--chunk-days', type=int, default=0,
+                        help='Out-of-core mode: refresh the baseline this many days at a time and read each CME '
+                             'window straight from the column store instead of loading the whole timeline '
+                             '(implies --scoring window; results are identical).')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Score parameters and CME windows in this many processes, with the SWIS arrays in '
+                             'shared memory (1 runs everything in this process; results are identical).')
+    parser.add_argument('--scales', type=window_lengths, default=None,
+                        help=f'Comma-separated rolling-window lengths in samples (e.g. 15,60,240): build the composite '
+                             f'score from the local z-scores of every scale, each parameter\'s weight split evenly '
+                             f'over them (default: one {ROLLING_WINDOW}-sample window). Needs global scoring in one '
+                             f'process.')
+    parser.add_argument('--verbose', action='store_true',
+                        help='Print the composite score summary, threshold and outcome of every CME window.')
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    if args.scales and (args.scoring == 'window' or args.chunk_days or args.workers > 1):
+        parser.error('--scales works with global scoring in one process (no --scoring window, --chunk-days or --workers)')
+    return args
+
+
+def main():
+    args = parse_args()
+    profile = RunProfile('halo_cme_detection', PROFILE_PATH, args.profile)
+
+    # Load dataset
+    with profile.stage('load') as record:
+        dataset = open_dataset()
+        columns = [param for param in params if param in dataset.columns]
+        catalog = pd.read_csv(CATALOG_PATH, parse_dates=['Launch_Time', 'Expected_Start', 'Expected_End'])
+
+        if args.chunk_days:
+            # Out-of-core: only one chunk or CME window is ever in memory
+            swis_data = None
         else:
-            last = merged_events[-1]
-            if event[0] - last[1] <= MERGE_GAP:
-                last[1] = event[1]
-                last[2] = max(last[2], event[2])
+            swis_data = dataset.to_frame(columns)
+            if not swis_data['Time'].is_monotonic_increasing:
+                print("⚠️ SWIS timeline is not sorted; sorting it by time.")
+                swis_data = swis_data.sort_values('Time', kind='stable').reset_index(drop=True)
+        record['rows'] = len(dataset)
+
+    # --- Quiet-Time Global Baseline ---
+    with profile.stage('baseline', rows=len(dataset)):
+        if swis_data is None:
+            global_baseline = load_global_baseline(dataset.chunks(columns, args.chunk_days), args.baseline_resolution,
+                                                   args.exclude_detected, args.rebuild_baseline, dataset)
+        else:
+            global_baseline = load_global_baseline(swis_data, args.baseline_resolution, args.exclude_detected,
+                                                   args.rebuild_baseline, dataset)
+    scoring = args.scoring if swis_data is not None else 'window'
+
+    windows = [(row['CME_Number'], row['Expected_Start'] - WINDOW_PADDING, row['Expected_End'] + WINDOW_PADDING)
+               for _, row in catalog.iterrows()]
+
+    print("\n🚀 Starting Halo CME Detection...\n")
+    detected_events = []
+    false_negatives = []
+
+    with profile.stage('timeline', scoring=scoring, workers=args.workers, scales=args.scales,
+                       rows=len(swis_data) if scoring == 'global' else 0):
+        time_index = TimeIndex.of(swis_data) if swis_data is not None else dataset.index
+        present = [param for param in params if param in (swis_data.columns if swis_data is not None else columns)]
+        if args.scales:
+            print(f"📐 Multi-scale composite over rolling windows of {', '.join(map(str, args.scales))} samples.")
+            present = [scale_key(param, scale) for param in present for scale in args.scales]
+        scores = ScoreStoreWriter(score_store_path, time_index.values,
+                                  {cme_number: time_index.locate(start, end) for cme_number, start, end in windows},
+                                  present, scale_weights(args.scales) if args.scales else weights,
+                                  (max(args.scales) if args.scales else ROLLING_WINDOW) - 1)
+        if args.workers > 1:
+            from parallel_scoring import ParallelScoring
+            pool = ParallelScoring(global_baseline, args.workers, swis_data, scoring, dataset.path, columns, scores)
+        else:
+            pool = None
+            timeline = TimelineScores(swis_data, global_baseline, scales=args.scales) if scoring == 'global' else None
+            scorer = WindowScorer(global_baseline, swis_data, timeline, dataset, columns, scores)
+    if pool is not None:
+        results = pool.detect(windows, timed=True)
+    else:
+        results = (measure(scorer.detect, *window, cme_number=window[0]) for window in windows)
+
+    no_data = 0
+    window_thresholds = {}
+    composite_thresholds = {}
+    with profile.stage('windows', windows=len(windows)) as stage:
+        for (_, row), (cme_number, window_start, window_end), (result, record) in zip(catalog.iterrows(), windows, results):
+            record.update(rows=result['rows'] if result else 0, events=len(result['events']) if result else 0)
+            profile.add_window(record)
+            if args.verbose:
+                print(f"🔍 Processing CME {cme_number}...")
+            if result is None:
+                no_data += 1
+                if args.verbose:
+                    print("⚠️ No SWIS data found in this window.")
+                continue
+            window_thresholds[cme_number] = result['thresholds']
+            composite_thresholds[cme_number] = result['threshold']
+
+            if args.verbose:
+                print(f"\n📊 Composite Score Summary for CME {cme_number}")
+                print(result['summary'])
+                print(f"🎯 {PERCENTILE_THRESHOLD}th Percentile Threshold: {result['threshold']:.2f}")
+
+            if result['events']:
+                if args.verbose:
+                    print(f"✅ Detected {len(result['events'])} merged event(s) in this window.")
+                for event in result['events']:
+                    detected_events.append({'CME_Number': cme_number, **event})
             else:
-                merged_events.append(list(event))
-
-    if merged_events:
-        print(f"✅ Detected {len(merged_events)} merged event(s) in this window.")
-        for start, end, score in merged_events:
-            strength = "Strong" if score > 100 else "Moderate" if score > 30 else "Weak"
-
-            event_df = data_window[(data_window['Time'] >= start) & (data_window['Time'] <= end)]
-            peaks, _ = find_peaks(event_df['Composite_Score'], height=threshold, distance=5)
-            event_type = 'Clustered' if len(peaks) >= MIN_PEAKS_FOR_CLUSTER else 'Single'
-
-            detected_events.append({
-                'CME_Number': row['CME_Number'],
-                'Detected_Start': start,
-                'Detected_End': end,
-                'Avg_Score': round(score, 2),
-                'Strength': strength,
-                'Event_Type': event_type
-            })
+                if args.verbose:
+                    print("⚠️ No Halo CME detected in this window.")
+                false_negatives.append({
+                    'CME_Number': cme_number,
+                    'Expected_Start': row['Expected_Start'],
+                    'Expected_End': row['Expected_End'],
+                    'Window_Start': window_start,
+                    'Window_End': window_end
+                })
+        stage['rows'] = sum(record['rows'] for record in profile.data['windows'])
+    if pool is not None:
+        pool.close()
+    scores.close(window_thresholds, composite_thresholds, PERCENTILE_THRESHOLD)
+    print(f"🔍 Scored {len(windows)} CME window(s): {len(windows) - no_data - len(false_negatives)} with events, "
+          f"{len(false_negatives)} without, {no_data} without SWIS data.")
+
+    with profile.stage('write', rows=len(detected_events) + len(false_negatives)):
+        write_results(detected_events, false_negatives)
+    if detected_events:
+        print(f"\n🎯 Detection completed. Results saved to '{DETECTED_PATH}'.")
     else:
-        print("⚠️ No Halo CME detected in this window.")
-        false_negatives.append({
-            'CME_Number': row['CME_Number'],
-            'Expected_Start': row['Expected_Start'],
-            'Expected_End': row['Expected_End'],
-            'Window_Start': window_start,
-            'Window_End': window_end
-        })
+        print(f"\n⚠️ No Halo CME detected in the dataset ('{DETECTED_PATH}' holds no events).")
+    if false_negatives:
+        print(f"⚠️ Logged {len(false_negatives)} false negatives to '{FALSE_NEGATIVES_PATH}'")
+
+    # --- Plot Time vs Composite Score for each CME window (unchanged figures are kept) ---
+    with profile.stage('plots', rows=len(catalog)):
+        from render_plots import render
+        render(['plot_scores'], workers=args.workers)
+
+    print(f"🧾 Run profile saved to {profile.save()}")
+    print("\n✅ Detection completed.")
+
 
-if detected_events:
-    detected_df = pd.DataFrame(detected_events)
-    detected_df.to_csv('../data/detected_halo_cmes.csv', index=False)
-    print("\n🎯 Detection completed. Results saved to '../data/detected_halo_cmes.csv'.")
-
-    # --- Plot Time vs Composite Score for each CME window ---
-    import matplotlib.pyplot as plt
-    os.makedirs('../plots', exist_ok=True)
-    for _, row in catalog.iterrows():
-        cme_num = row['CME_Number']
-        window_start = row['Expected_Start'] - timedelta(hours=48)
-        window_end = row['Expected_End'] + timedelta(hours=48)
-        data_window = swis_data[(swis_data['Time'] >= window_start) & (swis_data['Time'] <= window_end)].copy()
-        # Try to load the debug composite score if available
-        debug_path = os.path.join(debug_dir, f"CME_{cme_num}_scores.csv")
-        if os.path.exists(debug_path):
-            score_df = pd.read_csv(debug_path, parse_dates=['Time'])
-            plt.figure(figsize=(12, 5))
-            plt.plot(score_df['Time'], score_df['Composite_Score'], label='Composite Score', color='royalblue')
-            plt.title(f'CME {cme_num}: Time vs Composite Score')
-            plt.xlabel('Time')
-            plt.ylabel('Composite Score')
-            plt.tight_layout()
-            plt.legend()
-            plt.savefig(f"../plots/CME_{cme_num}_composite_score.png")
-            plt.close()
-    print("\n📊 Plots of Time vs Composite Score saved in the 'plots' directory.")
-else:
-    print("\n⚠️ No Halo CME detected in the dataset.")
-
-if false_negatives:
-    fn_df = pd.DataFrame(false_negatives)
-    fn_df.to_csv('../data/false_negatives.csv', index=False)
-    print(f"⚠️ Logged {len(false_negatives)} false negatives to '../data/false_negatives.csv'")
-
-print("\n✅ Detection completed.")
+if __name__ == '__main__':
+    main()
@@ -2,7 +2,8 @@ import os
 import shutil
 import re
 
-PLOTS_DIR = '../plots'
+project_root = os.path.dirname(os.path.dirname(__file__))
+PLOTS_DIR = os.path.join(project_root, 'plots')
 PARAMS_OVERLAY_DIR = os.path.join(PLOTS_DIR, 'params_overlay')
 HEATMAPS_DIR = os.path.join(PLOTS_DIR, 'heatmaps')
 BEFORE_AFTER_DIR = os.path.join(PLOTS_DIR, 'before_after')
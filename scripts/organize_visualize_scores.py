@@ -2,7 +2,8 @@ import os
 import shutil
 import re
 
-PLOTS_DIR = '../plots'
+project_root = os.path.dirname(os.path.dirname(__file__))
+PLOTS_DIR = os.path.join(project_root, 'plots')
 VISUALIZE_SCORES_DIR = os.path.join(PLOTS_DIR, 'visualize_scores')
 os.makedirs(VISUALIZE_SCORES_DIR, exist_ok=True)
 
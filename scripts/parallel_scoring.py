@@ -0,0 +1,147 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+
+from halo_cme_detection import params, timeline_z_scores, TimelineScores, WindowScorer
+from run_profile import measure
+from dataset_service import open_dataset
+
+# Per-process state of a scoring worker, set up once by _init_worker
+_worker = {}
+
+
+def share_arrays(arrays):
+    """Copy named arrays into shared memory blocks; returns (blocks, specs to attach them by)."""
+    blocks = []
+    specs = {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+        blocks.append(block)
+        specs[name] = (block.name, array.shape, array.dtype.str)
+    return blocks, specs
+
+
+def empty_arrays(names, length, dtype=float):
+    """Uninitialised shared arrays that worker processes fill in."""
+    return share_arrays({name: np.empty(length, dtype=dtype) for name in names})
+
+
+def attach_arrays(specs):
+    """Views onto shared memory blocks described by ``share_arrays``; returns (blocks, arrays)."""
+    blocks = []
+    arrays = {}
+    for name, (block_name, shape, dtype) in specs.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    return blocks, arrays
+
+
+def _init_worker(global_baseline, specs, dataset_path, columns, scores):
+    blocks, arrays = attach_arrays(specs)
+    _worker.update(blocks=blocks, arrays=arrays, global_baseline=global_baseline,
+                   dataset_path=dataset_path, columns=columns, scores=scores, scorer=None)
+
+
+def _score_param(param):
+    """Fill one parameter's global and combined z-scores over the shared timeline."""
+    arrays = _worker['arrays']
+    global_z, combined_z = timeline_z_scores(arrays['Time'].view('datetime64[ns]'), arrays[param], param,
+                                             _worker['global_baseline'])
+    arrays[f'{param}/global_z'][:] = global_z
+    arrays[f'{param}/combined_z'][:] = combined_z
+    return param
+
+
+def _scorer(scoring):
+    """The worker's WindowScorer, built on first use from the shared arrays (or the column store)."""
+    if _worker['scorer'] is None:
+        arrays = _worker['arrays']
+        global_baseline = _worker['global_baseline']
+        if 'Time' not in arrays:
+            _worker['scorer'] = WindowScorer(global_baseline, dataset=open_dataset(_worker['dataset_path']),
+                                             columns=_worker['columns'], scores=_worker['scores'])
+        else:
+            present = [param for param in params if param in arrays]
+            # copy=False keeps every column a view of its shared block
+            swis_data = pd.DataFrame({'Time': arrays['Time'].view('datetime64[ns]'),
+                                      **{param: arrays[param] for param in present}}, copy=False)
+            timeline = None
+            if scoring == 'global':
+                timeline = TimelineScores.from_arrays(
+                    {param: arrays[param] for param in present},
+                    {param: arrays[f'{param}/global_z'] for param in present},
+                    {param: arrays[f'{param}/combined_z'] for param in present})
+            _worker['scorer'] = WindowScorer(global_baseline, swis_data, timeline, scores=_worker['scores'])
+    return _worker['scorer']
+
+
+def _detect_window(scoring, window, write_scores, timed):
+    if timed:
+        return measure(_scorer(scoring).detect, *window, write_scores, cme_number=window[0], pid=os.getpid())
+    return _scorer(scoring).detect(*window, write_scores=write_scores)
+
+
+class ParallelScoring:
+    """Process pool that scores parameters and CME windows with the SWIS arrays in shared memory.
+
+    The Time and parameter columns are copied once into shared memory blocks
+    that every worker maps, so tasks only carry a parameter name or a window.
+    In global scoring each worker fills in one parameter's z-scores over the
+    full timeline; windows are then detected in parallel and returned in
+    catalog order. Composites are summed in ``params`` order exactly as in the
+    serial path, so results do not depend on the number of workers.
+    Without ``swis_data`` (out-of-core runs) workers read their windows from
+    the column store at ``dataset_path`` instead. Workers write each
+    window's z-scores straight into the ``scores`` store when one is given.
+    """
+
+    def __init__(self, global_baseline, workers, swis_data=None, scoring='global', dataset_path=None, columns=None,
+                 scores=None):
+        self.scoring = scoring if swis_data is not None else 'window'
+        self.blocks = []
+        specs = {}
+        present = []
+        if swis_data is not None:
+            present = [param for param in params if param in swis_data.columns]
+            for param in params:
+                if param not in present:
+                    print(f"⚠️ Parameter {param} not found in data.")
+            arrays = {'Time': swis_data['Time'].to_numpy().view(np.int64)}
+            arrays.update({param: swis_data[param].to_numpy(dtype=float) for param in present})
+            self.blocks, specs = share_arrays(arrays)
+            if self.scoring == 'global':
+                blocks, output_specs = empty_arrays([f'{param}/{kind}' for param in present
+                                                     for kind in ('global_z', 'combined_z')], len(swis_data))
+                self.blocks += blocks
+                specs.update(output_specs)
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                        initargs=(global_baseline, specs, dataset_path, columns, scores))
+        if self.scoring == 'global':
+            list(self.pool.map(_score_param, present))
+
+    def detect(self, windows, write_scores=True, timed=False):
+        """Results of ``WindowScorer.detect`` for each (cme_number, start, end), in input order.
+
+        With ``timed`` each result comes paired with the worker's measured
+        record of the window (see ``run_profile.measure``).
+        """
+        count = len(windows)
+        return self.pool.map(_detect_window, [self.scoring] * count, windows, [write_scores] * count, [timed] * count)
+
+    def close(self):
+        self.pool.shutdown()
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
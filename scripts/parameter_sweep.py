@@ -0,0 +1,264 @@
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+import halo_cme_detection as detection
+from halo_cme_detection import params, weights, WINDOW_PADDING, load_global_baseline, global_z_scores, TimelineScores
+from evaluation import evaluate
+from parallel_scoring import share_arrays, attach_arrays
+from swis_store import SwisDataset, TimeIndex
+
+project_root = os.path.dirname(os.path.dirname(__file__))
+catalog_path = os.path.join(project_root, 'data', 'cactus', 'halo_cmes.csv')
+results_csv_path = os.path.join(project_root, 'data', 'sweep_results.csv')
+results_txt_path = os.path.join(project_root, 'data', 'sweep_results.txt')
+
+# Swept settings and their current values in halo_cme_detection.py (MERGE_GAP in minutes).
+# PEAK_PROMINENCE and MIN_PEAKS_FOR_CLUSTER only change Event_Type, never which intervals are detected.
+DEFAULTS = {
+    'ROLLING_WINDOW': detection.ROLLING_WINDOW,
+    'PERCENTILE_THRESHOLD': detection.PERCENTILE_THRESHOLD,
+    'COMPOSITE_THRESHOLD_MIN': detection.COMPOSITE_THRESHOLD_MIN,
+    'NOISE_SCORE_MIN': detection.NOISE_SCORE_MIN,
+    'MERGE_GAP': detection.MERGE_GAP.total_seconds() / 60,
+    **{f'weights.{param}': weight for param, weight in weights.items()},
+}
+
+DEFAULT_SPACE = {
+    'ROLLING_WINDOW': [10, 15, 20],
+    'PERCENTILE_THRESHOLD': [85, 90, 95],
+    'NOISE_SCORE_MIN': [1.0, 3.0, 10.0],
+    'MERGE_GAP': [5, 10, 20],
+}
+
+# Per-process evaluator, set up once by _init_worker
+_worker = {}
+
+
+def parse_value(name, text):
+    return int(text) if name == 'ROLLING_WINDOW' else float(text)
+
+
+def parse_space(specs):
+    """``NAME=a,b,c`` (explicit values) or ``NAME=lo:hi`` (uniform range, random search only)."""
+    space = {}
+    for spec in specs:
+        name, _, values = spec.partition('=')
+        if name not in DEFAULTS:
+            raise ValueError(f"Unknown sweep parameter {name!r}; choose from {', '.join(DEFAULTS)}")
+        if ':' in values:
+            lo, hi = values.split(':')
+            space[name] = (parse_value(name, lo), parse_value(name, hi))
+        else:
+            space[name] = [parse_value(name, value) for value in values.split(',')]
+    return space
+
+
+def grid_configs(space):
+    for name, values in space.items():
+        if isinstance(values, tuple):
+            raise ValueError(f"{name} is a range; ranges need --random")
+    names = list(space)
+    return [{**DEFAULTS, **dict(zip(names, combo))} for combo in itertools.product(*space.values())]
+
+
+def random_configs(space, count, seed=0):
+    rng = np.random.default_rng(seed)
+    configs = []
+    for _ in range(count):
+        config = dict(DEFAULTS)
+        for name, values in space.items():
+            if isinstance(values, tuple):
+                if name == 'ROLLING_WINDOW':
+                    config[name] = int(rng.integers(values[0], values[1] + 1))
+                else:
+                    config[name] = float(rng.uniform(*values))
+            else:
+                config[name] = values[int(rng.integers(len(values)))]
+        configs.append(config)
+    return configs
+
+
+class SweepEvaluator:
+    """Scores detector configurations over the catalog windows, reusing whatever they share.
+
+    Global z-scores depend on none of the swept settings and are computed once
+    by the caller. Combined z-scores are cached per rolling window, adaptive
+    thresholds per (rolling window, percentile, floor) and composite scores
+    per weight vector on top of that, so a configuration only pays for the
+    stages its values actually change.
+    """
+
+    def __init__(self, times, values, global_z, windows, expected_start, expected_end):
+        self.times = times
+        self.values = values
+        self.global_z = global_z
+        time_index = TimeIndex(times.view(np.int64), check_sorted=False)
+        self.windows = [span for span in (time_index.locate(start, end) for start, end in windows) if span[1] > span[0]]
+        self.expected_start = expected_start
+        self.expected_end = expected_end
+        self._timelines = {}
+        self._window_z = {}
+        self._thresholds = {}
+        self._composites = {}
+
+    def timeline(self, rolling_window):
+        if rolling_window not in self._timelines:
+            combined_z = {param: 0.5 * detection.local_z_scores(self.values[param], rolling_window)
+                          + 0.5 * self.global_z[param] for param in self.values}
+            self._timelines[rolling_window] = TimelineScores.from_arrays(self.values, self.global_z, combined_z,
+                                                                         rolling_window)
+        return self._timelines[rolling_window]
+
+    def window_z(self, rolling_window, i):
+        key = (rolling_window, i)
+        if key not in self._window_z:
+            timeline = self.timeline(rolling_window)
+            start, stop = self.windows[i]
+            self._window_z[key] = {param: timeline.window_z(param, start, stop) for param in timeline.combined_z}
+        return self._window_z[key]
+
+    def thresholds(self, config, i):
+        key = (config['ROLLING_WINDOW'], config['PERCENTILE_THRESHOLD'], config['COMPOSITE_THRESHOLD_MIN'], i)
+        if key not in self._thresholds:
+            self._thresholds[key] = detection.adaptive_thresholds(
+                self.window_z(config['ROLLING_WINDOW'], i), config['PERCENTILE_THRESHOLD'],
+                config['COMPOSITE_THRESHOLD_MIN'])
+        return self._thresholds[key]
+
+    def composite(self, config, i):
+        param_weights = {param: config[f'weights.{param}'] for param in params}
+        key = (config['ROLLING_WINDOW'], config['PERCENTILE_THRESHOLD'], config['COMPOSITE_THRESHOLD_MIN'],
+               tuple(param_weights.values()), i)
+        if key not in self._composites:
+            start, stop = self.windows[i]
+            self._composites[key] = detection.composite_from_z(
+                self.window_z(config['ROLLING_WINDOW'], i), stop - start, self.thresholds(config, i), param_weights)
+        return self._composites[key]
+
+    def evaluate(self, config):
+        """Metrics and runtime (including any cache misses it caused) of one configuration."""
+        started = time.perf_counter()
+        detected_start = []
+        detected_end = []
+        for i, (start, stop) in enumerate(self.windows):
+            composite_score = self.composite(config, i)
+            threshold = np.percentile(composite_score[~np.isnan(composite_score)], config['PERCENTILE_THRESHOLD'])
+            first, last, _ = detection.event_ranges(self.times[start:stop], composite_score, threshold,
+                                                    config['NOISE_SCORE_MIN'], pd.Timedelta(minutes=config['MERGE_GAP']))
+            detected_start.append(self.times[start:stop][first])
+            detected_end.append(self.times[start:stop][last])
+        detected_start = np.concatenate(detected_start) if detected_start else np.empty(0, 'datetime64[ns]')
+        detected_end = np.concatenate(detected_end) if detected_end else np.empty(0, 'datetime64[ns]')
+        metrics, _ = evaluate(detected_start, detected_end, self.expected_start, self.expected_end)
+        metrics['Runtime_s'] = time.perf_counter() - started
+        return metrics
+
+
+def _init_worker(specs, windows, expected_start, expected_end):
+    blocks, arrays = attach_arrays(specs)
+    present = [param for param in params if param in arrays]
+    _worker['blocks'] = blocks
+    _worker['evaluator'] = SweepEvaluator(arrays['Time'].view('datetime64[ns]'),
+                                          {param: arrays[param] for param in present},
+                                          {param: arrays[f'{param}/global_z'] for param in present},
+                                          windows, expected_start, expected_end)
+
+
+def _evaluate_chunk(configs):
+    return [_worker['evaluator'].evaluate(config) for config in configs]
+
+
+def config_chunks(configs, workers):
+    """Configurations grouped by rolling window, the costliest shared stage, in chunks for the workers."""
+    order = sorted(range(len(configs)), key=lambda i: configs[i]['ROLLING_WINDOW'])
+    size = max(1, len(configs) // (workers * 4))
+    return [order[i:i + size] for i in range(0, len(order), size)]
+
+
+def run_sweep(configs, times, values, global_z, windows, expected_start, expected_end, workers=1):
+    """Metrics for every configuration, in input order."""
+    if workers <= 1:
+        evaluator = SweepEvaluator(times, values, global_z, windows, expected_start, expected_end)
+        return [evaluator.evaluate(config) for config in configs]
+
+    arrays = {'Time': times.view(np.int64), **values, **{f'{param}/global_z': z for param, z in global_z.items()}}
+    blocks, specs = share_arrays(arrays)
+    try:
+        chunks = config_chunks(configs, workers)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(specs, windows, expected_start, expected_end)) as pool:
+            chunk_results = pool.map(_evaluate_chunk, [[configs[i] for i in chunk] for chunk in chunks])
+            results = [None] * len(configs)
+            for chunk, metrics in zip(chunks, chunk_results):
+                for i, result in zip(chunk, metrics):
+                    results[i] = result
+        return results
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def write_results(table, csv_path=results_csv_path, txt_path=results_txt_path):
+    table.to_csv(csv_path, index=False)
+    swept = [name for name in DEFAULTS if table[name].nunique() > 1]
+    with open(txt_path, 'w') as f:
+        f.write(f"{'Rank':>4}  {'F1':>5}  {'Precision':>9}  {'Recall':>6}  {'TP':>3}  {'FP':>4}  {'FN':>3}  "
+                f"{'Runtime_s':>9}  Configuration\n")
+        for row in table.to_dict('records'):
+            settings = ', '.join(f"{name}={row[name]:g}" for name in swept)
+            f.write(f"{row['Rank']:>4}  {row['F1']:>5.2f}  {row['Precision']:>9.2f}  {row['Recall']:>6.2f}  "
+                    f"{row['TP']:>3}  {row['FP']:>4}  {row['FN']:>3}  {row['Runtime_s']:>9.4f}  {settings}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sweep detector settings and rank them against the CACTus catalog.')
+    parser.add_argument('--param', action='append', default=[], metavar='NAME=VALUES',
+                        help=f"Swept setting as NAME=a,b,c or NAME=lo:hi (random search only); NAME is one of "
+                             f"{', '.join(DEFAULTS)} (MERGE_GAP in minutes). Defaults to a small grid over "
+                             f"{', '.join(DEFAULT_SPACE)}.")
+    parser.add_argument('--random', type=int, metavar='N', help='Sample N random configurations instead of the full grid.')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Evaluation processes (1 runs in this process).')
+    parser.add_argument('--top', type=int, default=10, help='Configurations to print.')
+    args = parser.parse_args()
+
+    space = parse_space(args.param) if args.param else DEFAULT_SPACE
+    configs = random_configs(space, args.random, args.seed) if args.random else grid_configs(space)
+
+    dataset = SwisDataset()
+    swis_data = dataset.to_frame([param for param in params if param in dataset.columns])
+    global_baseline = load_global_baseline(swis_data, dataset=dataset)
+    catalog = pd.read_csv(catalog_path, parse_dates=['Expected_Start', 'Expected_End'])
+    windows = [(start - WINDOW_PADDING, end + WINDOW_PADDING)
+               for start, end in zip(catalog['Expected_Start'], catalog['Expected_End'])]
+
+    times = swis_data['Time'].to_numpy()
+    values = {param: swis_data[param].to_numpy(dtype=float) for param in params if param in swis_data.columns}
+    global_z = {param: global_z_scores(times, value, param, global_baseline) for param, value in values.items()}
+
+    print(f"\n🔧 Evaluating {len(configs)} configuration(s) on {len(catalog)} catalog CME(s) "
+          f"with {args.workers} worker(s)...")
+    started = time.perf_counter()
+    results = run_sweep(configs, times, values, global_z, windows, catalog['Expected_Start'].to_numpy(),
+                        catalog['Expected_End'].to_numpy(), args.workers)
+    elapsed = time.perf_counter() - started
+
+    table = pd.concat([pd.DataFrame(configs), pd.DataFrame(results)], axis=1)
+    table = table.sort_values(['F1', 'Precision', 'Recall'], ascending=False, kind='stable').reset_index(drop=True)
+    table.insert(0, 'Rank', range(1, len(table) + 1))
+    write_results(table)
+
+    print(f"⏱️ Swept {len(configs)} configuration(s) in {elapsed:.2f}s.\n")
+    with open(results_txt_path) as f:
+        print(''.join(f.readlines()[:args.top + 1]))
+    print(f"✅ Ranked results saved to {results_txt_path} and {results_csv_path}")
+
+
+if __name__ == '__main__':
+    main()
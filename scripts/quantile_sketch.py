@@ -0,0 +1,164 @@
+import math
+from collections import deque
+import numpy as np
+
+# Default relative accuracy: quantiles come back within 0.5% of the exact order statistic
+DEFAULT_ALPHA = 0.005
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch of non-negative values with a guaranteed relative error.
+
+    Values are counted in logarithmic buckets ``(gamma**(k-1), gamma**k]``
+    with ``gamma = (1 + alpha) / (1 - alpha)`` (the DDSketch layout), and
+    values at or below ``min_value`` (the clipped-to-zero z-scores) in a
+    zero bucket. For n values sorted as v[0] <= ... <= v[n-1],
+    ``quantile(q)`` returns an estimate of v[k], k = floor(q * (n - 1)),
+    with ``|estimate - v[k]| <= alpha * v[k]`` (0 when v[k] <= min_value).
+    ``np.percentile``'s linear interpolation lies between v[k] and v[k+1],
+    so the estimate is within [(1 - alpha) v[k], (1 + alpha) v[k+1]].
+
+    Counts only ever add up, so sketches of chunks or overlapping windows
+    ``merge`` into the sketch of their union, and ``remove`` undoes an
+    ``add`` exactly, which is what sliding windows need. NaNs are skipped.
+    Memory is one count per occupied bucket: about ``log(max/min_value) /
+    log(gamma)``, a few thousand for alpha = 0.005 over z-scores.
+    """
+
+    def __init__(self, alpha=DEFAULT_ALPHA, min_value=1e-9):
+        if not 0 < alpha < 1:
+            raise ValueError(f"alpha must be in (0, 1), got {alpha}")
+        self.alpha = alpha
+        self.min_value = min_value
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self.gamma)
+        self.zeros = 0
+        self.offset = 0
+        self.counts = np.zeros(0, dtype=np.int64)
+
+    @classmethod
+    def of(cls, values, alpha=DEFAULT_ALPHA, min_value=1e-9):
+        sketch = cls(alpha, min_value)
+        sketch.add(values)
+        return sketch
+
+    def __len__(self):
+        return int(self.zeros + self.counts.sum())
+
+    def _keys(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if np.any(values < 0):
+            raise ValueError("QuantileSketch only holds non-negative values")
+        positive = values > self.min_value
+        keys = np.ceil(np.log(values[positive]) / self._log_gamma).astype(np.int64)
+        return keys, int(len(values) - positive.sum())
+
+    def _counts_for(self, keys):
+        """Bucket counts of ``keys``, with the sketch's array grown to cover them."""
+        lo = min(self.offset, int(keys.min())) if len(self.counts) else int(keys.min())
+        hi = max(self.offset + len(self.counts), int(keys.max()) + 1) if len(self.counts) else int(keys.max()) + 1
+        if len(self.counts) == 0:
+            self.counts = np.zeros(hi - lo, dtype=np.int64)
+        elif lo < self.offset or hi > self.offset + len(self.counts):
+            grown = np.zeros(hi - lo, dtype=np.int64)
+            grown[self.offset - lo:self.offset - lo + len(self.counts)] = self.counts
+            self.counts = grown
+        self.offset = lo
+        return np.bincount(keys - lo, minlength=len(self.counts))
+
+    def add(self, values):
+        keys, zeros = self._keys(values)
+        self.zeros += zeros
+        if len(keys):
+            counts = self._counts_for(keys)
+            self.counts += counts
+        return self
+
+    def remove(self, values):
+        """Take back values added earlier (e.g. samples leaving a sliding window)."""
+        keys, zeros = self._keys(values)
+        self.zeros -= zeros
+        if len(keys):
+            counts = self._counts_for(keys)
+            self.counts -= counts
+        if self.zeros < 0 or np.any(self.counts < 0):
+            raise ValueError("Removed values that were never added")
+        return self
+
+    def update(self, value, weight=1):
+        """Scalar ``add`` (``weight=-1``: ``remove``) of one value, for per-sample streams."""
+        if math.isnan(value):
+            return
+        if value <= self.min_value:
+            if value < 0:
+                raise ValueError("QuantileSketch only holds non-negative values")
+            self.zeros += weight
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        if not self.offset <= key < self.offset + len(self.counts):
+            self._counts_for(np.array([key]))
+        self.counts[key - self.offset] += weight
+
+    def merge(self, other):
+        """Add the counts of another sketch with the same accuracy settings."""
+        if (other.alpha, other.min_value) != (self.alpha, self.min_value):
+            raise ValueError("Only sketches with the same alpha and min_value can be merged")
+        self.zeros += other.zeros
+        occupied = np.flatnonzero(other.counts)
+        if len(occupied):
+            keys = other.offset + occupied
+            self._counts_for(keys[[0, -1]])
+            self.counts[keys - self.offset] += other.counts[occupied]
+        return self
+
+    def copy(self):
+        sketch = QuantileSketch(self.alpha, self.min_value)
+        sketch.zeros = self.zeros
+        sketch.offset = self.offset
+        sketch.counts = self.counts.copy()
+        return sketch
+
+    def quantile(self, q):
+        """Estimate of the value of rank floor(q * (n - 1)); NaN for an empty sketch."""
+        n = len(self)
+        if n == 0:
+            return math.nan
+        rank = math.floor(q * (n - 1))
+        if rank < self.zeros:
+            return 0.0
+        bucket = int(np.searchsorted(np.cumsum(self.counts), rank - self.zeros, side='right'))
+        # Midpoint (in relative terms) of the bucket, so either edge is within alpha
+        return 2 * self.gamma ** (self.offset + bucket) / (self.gamma + 1)
+
+    def percentile(self, percentile):
+        return self.quantile(percentile / 100)
+
+
+class SlidingQuantile:
+    """Quantile of the last ``size`` values of a stream, within the ``QuantileSketch`` error bound.
+
+    Each ``push`` adds the new value and removes the one leaving the window,
+    O(1) per value; ``quantile`` costs one pass over the occupied buckets,
+    so streams query it every so many values rather than on every sample.
+    """
+
+    def __init__(self, size, alpha=DEFAULT_ALPHA, min_value=1e-9):
+        self.size = size
+        self.sketch = QuantileSketch(alpha, min_value)
+        self.values = deque()
+
+    def __len__(self):
+        return len(self.sketch)
+
+    def push(self, value):
+        self.values.append(value)
+        self.sketch.update(value)
+        if len(self.values) > self.size:
+            self.sketch.update(self.values.popleft(), -1)
+
+    def quantile(self, q):
+        return self.sketch.quantile(q)
+
+    def percentile(self, percentile):
+        return self.sketch.percentile(percentile)
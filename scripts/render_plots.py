@@ -0,0 +1,563 @@
+import argparse
+import hashlib
+from abc import ABC, abstractmethod
+import inspect
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
+import numpy as np
+import pandas as pd
+
+from decimate import decimate
+from score_store import ScoreStore, score_store_path
+from dataset_service import open_dataset
+from swis_store import dataset_path
+
+# Paths
+project_root = os.path.dirname(os.path.dirname(__file__))
+CATALOG_PATH = os.path.join(project_root, 'data', 'cactus', 'halo_cmes.csv')
+DETECTED_PATH = os.path.join(project_root, 'data', 'detected_halo_cmes.csv')
+PLOTS_DIR = os.path.join(project_root, 'plots')
+MANIFEST_NAME = 'render_manifest.json'
+
+# Per-process renderers (with their figure templates), set up once by _init_worker
+_worker = {}
+
+
+class PlotData:
+    """Catalog, detections, composite scores and SWIS parameters, opened once per process.
+
+    The score store and the SWIS column store are memory-mapped, so opening
+    them costs nothing until a figure slices its window out of them.
+    """
+
+    def __init__(self):
+        self.catalog = pd.read_csv(CATALOG_PATH, parse_dates=['Launch_Time', 'Expected_Start', 'Expected_End'])
+        if os.path.exists(DETECTED_PATH):
+            self.detected = pd.read_csv(DETECTED_PATH, parse_dates=['Detected_Start', 'Detected_End'])
+        else:
+            self.detected = pd.DataFrame({'CME_Number': pd.Series(dtype=int), 'Detected_Start': pd.to_datetime([]),
+                                          'Detected_End': pd.to_datetime([])})
+        self.scores = ScoreStore() if os.path.exists(os.path.join(score_store_path, 'index.json')) else None
+        self.dataset = open_dataset() if os.path.exists(os.path.join(dataset_path, 'meta.json')) else None
+
+    def detections(self, cme_number):
+        return self.detected[self.detected['CME_Number'] == cme_number]
+
+    def catalog_row(self, cme_number):
+        return self.catalog[self.catalog['CME_Number'] == cme_number].iloc[0]
+
+
+def digest(*parts):
+    """SHA-256 over arrays (their raw bytes) and anything else (its repr)."""
+    hasher = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            hasher.update(np.ascontiguousarray(part).tobytes())
+        elif isinstance(part, pd.DataFrame):
+            hasher.update(pd.util.hash_pandas_object(part, index=False).to_numpy().tobytes())
+        else:
+            hasher.update(repr(part).encode())
+    return hasher.hexdigest()
+
+
+class Renderer(ABC):
+    """One kind of figure, written to ``plots/<kind>/``.
+
+    ``jobs`` lists the figures to draw as (file name, arguments), ``inputs``
+    digests the data a figure is drawn from and ``draw`` renders it. A
+    renderer keeps its figure and persistent artists between figures and
+    only swaps the data and the per-figure artists (``transient``), which
+    are removed again after each save. Long series are drawn through
+    ``reduce``, which keeps at most 4 samples per pixel column of a figure
+    ``width`` inches wide saved at ``dpi``. Subclasses must implement all
+    three of ``jobs``, ``inputs`` and ``draw`` to be instantiated.
+    """
+
+    kind = None
+    width = None
+    dpi = 100
+
+    def __init__(self):
+        self.figure = None
+        self.transient = []
+
+    @classmethod
+    def style(cls):
+        """Digest of everything that decides how the figures look: the drawing and decimation code and matplotlib."""
+        sources = [inspect.getsource(klass) for klass in cls.__mro__ if klass not in (object, ABC)]
+        return digest(*sources, inspect.getsource(rescale), inspect.getsource(sys.modules[decimate.__module__]),
+                      matplotlib.__version__)
+
+    @abstractmethod
+    def jobs(self, data):
+        """[(file name, job arguments)] of the figures to draw."""
+
+    @abstractmethod
+    def inputs(self, data, **job):
+        """Digest of the data one figure is drawn from."""
+
+    @abstractmethod
+    def draw(self, data, path, **job):
+        """Render one figure to ``path``."""
+
+    def reduce(self, times, values):
+        return decimate(times, values, int(self.width * self.dpi))
+
+    def add(self, artist):
+        self.transient.append(artist)
+        return artist
+
+    def save(self, path, **kwargs):
+        self.figure.savefig(path, dpi=self.dpi, **kwargs)
+        for artist in self.transient:
+            artist.remove()
+        self.transient = []
+
+
+def rescale(ax, **kwargs):
+    """Fit the axis limits to the current data, as a freshly drawn axes would."""
+    ax.relim()
+    ax.autoscale_view(**kwargs)
+
+
+class ScorePlot(Renderer):
+    """Time vs composite score of each CME window (formerly ``plot_scores.py``)."""
+
+    kind = 'plot_scores'
+    width = 12
+
+    def jobs(self, data):
+        if data.scores is None:
+            return
+        for cme_number in data.catalog['CME_Number']:
+            if cme_number in data.scores:
+                yield f"CME_{cme_number}_composite_score.png", {'cme_number': int(cme_number)}
+
+    def inputs(self, data, cme_number):
+        return digest(data.scores.times(cme_number), data.scores.composite(cme_number))
+
+    def draw(self, data, path, cme_number):
+        times, scores = self.reduce(data.scores.times(cme_number), data.scores.composite(cme_number))
+        if self.figure is None:
+            self.figure, self.ax = plt.subplots(figsize=(self.width, 5))
+            self.line, = self.ax.plot(times, scores, label='Composite Score', color='royalblue')
+            self.ax.set_xlabel('Time')
+            self.ax.set_ylabel('Composite Score')
+            self.ax.legend()
+        self.line.set_data(times, scores)
+        rescale(self.ax)
+        self.ax.set_title(f'CME {cme_number}: Time vs Composite Score')
+        self.figure.tight_layout()
+        self.save(path)
+
+
+class ThresholdScorePlot(ScorePlot):
+    """Composite score with its 90th percentile (formerly ``visualize_scores.py``)."""
+
+    kind = 'visualize_scores'
+
+    def jobs(self, data):
+        if data.scores is None:
+            return
+        for cme_number in data.scores.cme_numbers:
+            yield f"cme_{cme_number}_composite_score.png", {'cme_number': cme_number}
+
+    def draw(self, data, path, cme_number):
+        scores = data.scores.composite(cme_number)
+        threshold = data.scores.threshold(cme_number)
+        times, scores = self.reduce(data.scores.times(cme_number), scores)
+        if self.figure is None:
+            self.figure, self.ax = plt.subplots(figsize=(self.width, 5))
+            self.line, = self.ax.plot(times, scores, label='Composite Score', color='navy')
+            self.threshold = self.ax.axhline(threshold, color='red', linestyle='--', label='90th Percentile Threshold')
+            self.ax.set_xlabel('Time')
+            self.ax.set_ylabel('Composite Score')
+            self.ax.legend()
+            self.ax.grid(True)
+        self.line.set_data(times, scores)
+        self.threshold.set_ydata([threshold, threshold])
+        rescale(self.ax)
+        self.ax.set_title(f'Composite Score Over Time – CME {cme_number}')
+        self.figure.tight_layout()
+        self.save(path)
+
+
+class OverlayPlot(ScorePlot):
+    """Composite score, its 90th percentile, the CACTus expected interval and the detected events
+    (formerly ``generate_cme_event_plots.py``)."""
+
+    kind = 'event_overlay'
+    width = 13
+    file_name = 'cme_{}_overlay.png'
+    title = 'CME {}: Composite Score with Expected & Detected Intervals'
+
+    def jobs(self, data):
+        if data.scores is None:
+            return
+        for cme_number in data.catalog['CME_Number']:
+            if cme_number in data.scores:
+                yield self.file_name.format(cme_number), {'cme_number': int(cme_number)}
+
+    def inputs(self, data, cme_number):
+        row = data.catalog_row(cme_number)
+        return digest(data.scores.times(cme_number), data.scores.composite(cme_number), row['Expected_Start'],
+                      row['Expected_End'], data.detections(cme_number)[['Detected_Start', 'Detected_End']])
+
+    def draw(self, data, path, cme_number):
+        scores = data.scores.composite(cme_number)
+        row = data.catalog_row(cme_number)
+        threshold = data.scores.threshold(cme_number)
+        times, scores = self.reduce(data.scores.times(cme_number), scores)
+        if self.figure is None:
+            self.figure, self.ax = plt.subplots(figsize=(self.width, 6))
+            self.line, = self.ax.plot(times, scores, label='Composite Score', color='darkblue')
+            self.threshold = self.ax.axhline(threshold, color='red', linestyle='--')
+            self.ax.set_xlabel('Time')
+            self.ax.set_ylabel('Composite Score')
+            self.ax.grid(True)
+        self.line.set_data(times, scores)
+        self.threshold.set_ydata([threshold, threshold])
+        self.threshold.set_label(f'90th Percentile = {threshold:.2f}')
+
+        # CACTus expected interval and detected intervals
+        self.add(self.ax.axvspan(row['Expected_Start'], row['Expected_End'], color='orange', alpha=0.3,
+                                 label='CACTus Expected Interval'))
+        self.add(self.ax.axvline(row['Expected_Start'], color='orange', linestyle='--', linewidth=1))
+        self.add(self.ax.axvline(row['Expected_End'], color='orange', linestyle='--', linewidth=1))
+        detections = data.detections(cme_number)
+        for start, end in zip(detections['Detected_Start'], detections['Detected_End']):
+            self.add(self.ax.axvspan(start, end, color='green', alpha=0.3))
+        if not detections.empty:
+            self.add(self.ax.plot([], [], color='green', alpha=0.5, linewidth=6, label='Detected Event(s)')[0])
+
+        rescale(self.ax)
+        self.ax.set_title(self.title.format(cme_number))
+        self.ax.legend()
+        self.figure.tight_layout()
+        self.save(path)
+
+
+class CatalogOverlayPlot(OverlayPlot):
+    """The overlay layout titled against the CACTus interval (formerly ``visualize_with_catalog_overlay.py``)."""
+
+    kind = 'catalog_overlay'
+    file_name = 'cme_{}_overlay_with_detected.png'
+    title = 'CME {}: Composite Score vs CACTus Interval & Detected Events'
+
+
+class TimelinePlot(Renderer):
+    """Bars for the detected events of each CME (formerly ``timeline_plot.py``)."""
+
+    kind = 'timeline'
+    dpi = 180
+
+    def jobs(self, data):
+        for cme_number in data.detected['CME_Number'].unique():
+            yield f"cme_{cme_number}_timeline.png", {'cme_number': int(cme_number)}
+
+    def inputs(self, data, cme_number):
+        return digest(data.detections(cme_number)[['Detected_Start', 'Detected_End']])
+
+    def draw(self, data, path, cme_number):
+        events = data.detections(cme_number)
+        if self.figure is None:
+            self.figure, self.ax = plt.subplots(figsize=(13, 1.8 + 0.7 * len(events)))
+            ax = self.ax
+            ax.set_xlabel('Time', fontsize=13, fontweight='bold')
+            ax.tick_params(axis='x', labelsize=11, rotation=25)
+            ax.tick_params(axis='y', labelsize=12)
+            ax.spines['top'].set_visible(False)
+            ax.spines['right'].set_visible(False)
+            ax.spines['left'].set_linewidth(1.2)
+            ax.spines['bottom'].set_linewidth(1.2)
+            ax.grid(axis='x', linestyle='--', alpha=0.4)
+            ax.set_axisbelow(True)
+        ax = self.ax
+        self.figure.set_size_inches(13, 1.8 + 0.7 * len(events))
+        for i, (start, end) in enumerate(zip(events['Detected_Start'], events['Detected_End'])):
+            # Event bar with start/end markers, duration and times
+            self.add(ax.plot([start, end], [i, i], linewidth=14, color='#009999', solid_capstyle='round', alpha=0.85,
+                             label='Detected Event' if i == 0 else "")[0])
+            self.add(ax.scatter(start, i, color='#1a9850', s=70, zorder=3, marker='o', edgecolor='white', linewidth=1.5,
+                                label='Start' if i == 0 else ""))
+            self.add(ax.scatter(end, i, color='#d73027', s=70, zorder=3, marker='o', edgecolor='white', linewidth=1.5,
+                                label='End' if i == 0 else ""))
+            self.add(ax.text(end + pd.Timedelta(minutes=10), i, f"Duration: {end - start}", va='center', fontsize=10,
+                             color='#444444', fontweight='bold'))
+            self.add(ax.text(start - pd.Timedelta(minutes=15), i + 0.22, start.strftime('%Y-%m-%d\n%H:%M'), ha='right',
+                             va='bottom', fontsize=9, color='#1a9850', fontweight='bold'))
+            self.add(ax.text(end + pd.Timedelta(minutes=15), i + 0.22, end.strftime('%Y-%m-%d\n%H:%M'), ha='left',
+                             va='bottom', fontsize=9, color='#d73027', fontweight='bold'))
+
+        rescale(ax, scalex=False)
+        ax.set_yticks(range(len(events)))
+        ax.set_yticklabels([f'Event {i + 1}' for i in range(len(events))], fontsize=12, fontweight='bold')
+        ax.set_title(f'Detected Events Timeline – CME {cme_number}', fontsize=16, fontweight='bold', pad=18)
+        ax.set_xlim([events['Detected_Start'].min() - pd.Timedelta(hours=1),
+                     events['Detected_End'].max() + pd.Timedelta(hours=1)])
+        ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d\n%H:%M'))
+        handles, labels = ax.get_legend_handles_labels()
+        by_label = dict(zip(labels, handles))
+        ax.legend(by_label.values(), by_label.keys(), loc='upper left', fontsize=10, frameon=True)
+        self.figure.tight_layout()
+        self.save(path)
+
+
+class BeforeAfterPlot(Renderer):
+    """composite_flux 3 hours either side of each detected event (formerly ``composite_score_before_after.py``)."""
+
+    kind = 'before_after'
+    width = 12
+    dpi = 200
+    padding = pd.Timedelta(hours=3)
+
+    def jobs(self, data):
+        if data.dataset is None:
+            return
+        # Events are numbered by their row in the detections file, as they always have been
+        for idx, row in data.detected.iterrows():
+            yield (f"cme_{row['CME_Number']}_event_{idx + 1}_composite_before_after.png",
+                   {'cme_number': int(row['CME_Number']), 'event': int(idx)})
+
+    def window(self, data, event):
+        row = data.detected.loc[event]
+        start, end = row['Detected_Start'] - self.padding, row['Detected_End'] + self.padding
+        return row, data.dataset.times(start, end), data.dataset.column('composite_flux', start, end)
+
+    def inputs(self, data, cme_number, event):
+        row, times, values = self.window(data, event)
+        return digest(cme_number, row['Detected_Start'], row['Detected_End'], times, values)
+
+    def draw(self, data, path, cme_number, event):
+        row, times, values = self.window(data, event)
+        start, end = row['Detected_Start'], row['Detected_End']
+        samples = len(values)
+        times, values = self.reduce(times, values)
+        if self.figure is None:
+            self.figure, self.ax = plt.subplots(figsize=(self.width, 4))
+            ax = self.ax
+            self.line, = ax.plot(times, values, color='#0077b6', lw=2.2, marker='o', markersize=2.5, alpha=0.92,
+                                 label='Composite Score')
+            ax.set_ylabel('Composite Score', fontsize=13, fontweight='bold')
+            ax.set_xlabel('Time', fontsize=13, fontweight='bold')
+            ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d\n%H:%M'))
+            plt.setp(ax.get_xticklabels(), rotation=25, ha='right', fontsize=10)
+            ax.grid(True, alpha=0.3, linestyle='--')
+        ax = self.ax
+        self.line.set_data(times, values)
+        # Per-sample markers only while every sample is drawn
+        self.line.set_marker('o' if len(values) == samples else 'None')
+        # Highlight the event interval and mark its start and end
+        self.add(ax.axvspan(start, end, color='#00bfae', alpha=0.22, lw=0, label='Detected Event'))
+        self.add(ax.axvline(start, color='#1a9850', linestyle='--', lw=2, label='Start'))
+        self.add(ax.axvline(end, color='#d73027', linestyle='--', lw=2, label='End'))
+        rescale(ax)
+        top = ax.get_ylim()[1] * 0.95
+        self.add(ax.text(start - pd.Timedelta(hours=1.5), top, 'Before', color='#444', fontsize=11, ha='center',
+                         fontweight='bold'))
+        self.add(ax.text(start + (end - start) / 2, top, 'During', color='#0077b6', fontsize=11, ha='center',
+                         fontweight='bold'))
+        self.add(ax.text(end + pd.Timedelta(hours=1.5), top, 'After', color='#444', fontsize=11, ha='center',
+                         fontweight='bold'))
+        plt.setp(ax.get_xticklabels(), rotation=25, ha='right', fontsize=10)
+        ax.set_title(f'CME {cme_number} Event {event + 1}: Composite Score Before, During, and After', fontsize=15,
+                     fontweight='bold', pad=14)
+        ax.legend(loc='upper right', fontsize=10, frameon=True)
+        self.figure.tight_layout()
+        self.save(path)
+
+
+class ParamsOverlayPlot(Renderer):
+    """Every SWIS parameter around each CME's detected events (formerly ``plot_params_overlay.py``)."""
+
+    kind = 'params_overlay'
+    width = 14
+    dpi = 220
+    padding = pd.Timedelta(hours=2)
+
+    def jobs(self, data):
+        if data.dataset is None:
+            return
+        for cme_number in data.detected['CME_Number'].unique():
+            yield f'cme_{cme_number}_params_overlay.png', {'cme_number': int(cme_number)}
+
+    def window(self, data, cme_number):
+        events = data.detections(cme_number)
+        start = events['Detected_Start'].min() - self.padding
+        end = events['Detected_End'].max() + self.padding
+        return events, data.dataset.to_frame(start=start, end=end)
+
+    def inputs(self, data, cme_number):
+        events, plot_df = self.window(data, cme_number)
+        return digest(events[['Detected_Start', 'Detected_End']], plot_df)
+
+    def annotate(self, ax, times, values, idx):
+        """Start/end values and the max/min points of one parameter."""
+        valid = np.flatnonzero(~np.isnan(values))
+        if not len(valid):
+            return
+        first, last = valid[0], valid[-1]
+        self.add(ax.text(times[first], values[first], f"Start: {values[first]:.2f}", color='#0077b6', fontsize=9,
+                         fontweight='bold', va='bottom', ha='left', alpha=0.85,
+                         bbox=dict(facecolor='white', edgecolor='#0077b6', boxstyle='round,pad=0.2', alpha=0.7)))
+        if last != first:
+            self.add(ax.text(times[last], values[last], f"End: {values[last]:.2f}", color='#0077b6', fontsize=9,
+                             fontweight='bold', va='top', ha='right', alpha=0.85,
+                             bbox=dict(facecolor='white', edgecolor='#0077b6', boxstyle='round,pad=0.2', alpha=0.7)))
+        for i, name, color, va in ((np.nanargmax(values), 'Max', '#d73027', 'bottom'),
+                                   (np.nanargmin(values), 'Min', '#4575b4', 'top')):
+            self.add(ax.scatter(times[i], values[i], color=color, s=45, zorder=4, label=name if idx == 0 else None))
+            self.add(ax.text(times[i], values[i], f"{name}: {values[i]:.2f}", color=color, fontsize=9,
+                             fontweight='bold', va=va, ha='center', alpha=0.9,
+                             bbox=dict(facecolor='white', edgecolor=color, boxstyle='round,pad=0.2', alpha=0.7)))
+
+    def draw(self, data, path, cme_number):
+        events, plot_df = self.window(data, cme_number)
+        params = list(plot_df.columns[1:])
+        times = plot_df['Time'].to_numpy()
+        if self.figure is None:
+            self.figure, axes = plt.subplots(len(params), 1, figsize=(self.width, 2.5 * len(params)), sharex=True)
+            self.axes = list(np.atleast_1d(axes))
+            self.lines = []
+            for ax, param in zip(self.axes, params):
+                self.lines.append(ax.plot(*self.reduce(times, plot_df[param].to_numpy()), color='#0077b6', lw=2.2, marker='o',
+                                          markersize=2.5, alpha=0.92, label=param)[0])
+                ax.set_ylabel(param.replace('_', ' ').title(), fontsize=13, fontweight='bold', color='#222222')
+                ax.grid(True, alpha=0.35, linestyle='--')
+                ax.set_facecolor('#f7fafd')
+                ax.spines['top'].set_visible(False)
+                ax.spines['right'].set_visible(False)
+                ax.spines['left'].set_linewidth(1.1)
+                ax.spines['bottom'].set_linewidth(1.1)
+            self.axes[-1].set_xlabel('Time', fontsize=13, fontweight='bold')
+            self.axes[-1].xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d\n%H:%M'))
+
+        for idx, (ax, line, param) in enumerate(zip(self.axes, self.lines, params)):
+            values = plot_df[param].to_numpy()
+            line.set_data(*self.reduce(times, values))
+            # Per-sample markers only while every sample is drawn
+            line.set_marker('o' if len(line.get_xdata()) == len(values) else 'None')
+            self.annotate(ax, times, values, idx)
+            # Shade the detected events
+            for start, end in zip(events['Detected_Start'], events['Detected_End']):
+                self.add(ax.axvspan(start, end, color='#00bfae', alpha=0.22, lw=0))
+            rescale(ax)
+        self.axes[0].legend(loc='upper right', fontsize=10, frameon=True, facecolor='white', edgecolor='#cccccc')
+        self.figure.suptitle(f'CME {cme_number}: Parameter Time Series with Detected Event Overlay', fontsize=17,
+                             fontweight='bold', color='#222222', y=1.02)
+        self.figure.tight_layout(rect=[0, 0, 1, 0.97])
+        self.save(path, bbox_inches='tight')
+
+
+RENDERERS = {renderer.kind: renderer for renderer in (ScorePlot, OverlayPlot, CatalogOverlayPlot, ThresholdScorePlot,
+                                                       TimelinePlot, BeforeAfterPlot, ParamsOverlayPlot)}
+
+
+def _init_worker():
+    _worker.update(data=PlotData(), renderers={})
+
+
+def _draw(kind, path, job):
+    """Draw one figure with this process's renderer of that kind, reusing its figure."""
+    renderers = _worker['renderers']
+    if kind not in renderers:
+        renderers[kind] = RENDERERS[kind]()
+    renderers[kind].draw(_worker['data'], path, **job)
+    return path
+
+
+def load_manifest(kind_dir):
+    manifest_path = os.path.join(kind_dir, MANIFEST_NAME)
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            return json.load(f)
+    return {}
+
+
+def save_manifest(kind_dir, manifest):
+    tmp_path = os.path.join(kind_dir, MANIFEST_NAME + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, os.path.join(kind_dir, MANIFEST_NAME))
+
+
+def render(kinds=tuple(RENDERERS), workers=1, force=False):
+    """Render every figure of ``kinds`` into ``plots/<kind>/``, skipping those whose inputs and style are unchanged.
+
+    Each kind's ``render_manifest.json`` records the key (style plus input
+    digest) every figure was drawn from; figures whose key matches and whose
+    file exists are kept, and figures no longer produced are removed.
+    Returns {kind: (rendered, unchanged, removed)}.
+    """
+    data = PlotData()
+    _worker.update(data=data, renderers={})
+    tasks = []
+    manifests = {}
+    counts = {}
+    for kind in kinds:
+        renderer = RENDERERS[kind]()
+        kind_dir = os.path.join(PLOTS_DIR, kind)
+        os.makedirs(kind_dir, exist_ok=True)
+        previous = load_manifest(kind_dir)
+        style = renderer.style()
+        manifest = {}
+        unchanged = 0
+        for file_name, job in renderer.jobs(data):
+            path = os.path.join(kind_dir, file_name)
+            manifest[file_name] = digest(style, renderer.inputs(data, **job))
+            if not force and previous.get(file_name) == manifest[file_name] and os.path.exists(path):
+                unchanged += 1
+            else:
+                tasks.append((kind, path, job))
+        removed = [file_name for file_name in previous if file_name not in manifest]
+        for file_name in removed:
+            if os.path.exists(os.path.join(kind_dir, file_name)):
+                os.remove(os.path.join(kind_dir, file_name))
+        manifests[kind_dir] = manifest
+        counts[kind] = [0, unchanged, len(removed)]
+
+    if workers > 1 and len(tasks) > 1:
+        # Tasks are grouped by kind, so each chunk mostly reuses one figure template
+        chunksize = max(1, len(tasks) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            list(pool.map(_draw, *zip(*tasks), chunksize=chunksize))
+    else:
+        for task in tasks:
+            _draw(*task)
+    for kind, _, _ in tasks:
+        counts[kind][0] += 1
+
+    for kind_dir, manifest in manifests.items():
+        save_manifest(kind_dir, manifest)
+    for renderer in _worker['renderers'].values():
+        if renderer.figure is not None:
+            plt.close(renderer.figure)
+    for kind, (rendered, unchanged, removed) in counts.items():
+        print(f"🖼️ {kind}: {rendered} rendered, {unchanged} unchanged, {removed} removed → "
+              f"{os.path.join(PLOTS_DIR, kind)}")
+    return counts
+
+
+def main(kinds=None):
+    parser = argparse.ArgumentParser(description='Render the per-CME figures into plots/<kind>/, redrawing only '
+                                                 'figures whose data or style changed.')
+    parser.add_argument('kinds', nargs='*', metavar='KIND', default=kinds or list(RENDERERS),
+                        help=f"Figure kinds to render (default: all): {', '.join(RENDERERS)}.")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Render in this many processes (default: all cores).')
+    parser.add_argument('--force', action='store_true', help='Redraw every figure even when it is up to date.')
+    args = parser.parse_args()
+    unknown = [kind for kind in args.kinds if kind not in RENDERERS]
+    if unknown:
+        parser.error(f"unknown figure kind(s): {', '.join(unknown)}")
+    render(args.kinds, args.workers, args.force)
+
+
+if __name__ == '__main__':
+    main()
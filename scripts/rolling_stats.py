@@ -0,0 +1,106 @@
+import numpy as np
+
+
+def _blocks(values, window, fill):
+    """``values`` left-padded by ``window - 1`` (so every row has a full trailing window), cut into rows of ``window``."""
+    padded = np.concatenate([np.full(window - 1, fill), values])
+    blocks = -(-len(padded) // window)
+    return np.concatenate([padded, np.full(blocks * window - len(padded), fill)]).reshape(blocks, window)
+
+
+def running_moments(blocks):
+    """Running (count, mean, m2) along each row of a 2-D array, NaNs skipped: Welford's update, vectorized.
+
+    Means come from sums taken around each row's own mean, and m2 adds up
+    Welford's increments (x - previous mean) * (x - mean), which are never
+    negative, so it does not cancel however far the values sit from zero.
+    """
+    valid = ~np.isnan(blocks)
+    filled = np.where(valid, blocks, 0.0)
+    valid_count = valid.sum(axis=1, keepdims=True)
+    shift = filled.sum(axis=1, keepdims=True) / np.maximum(valid_count, 1)
+    filled = np.where(valid, blocks - shift, 0.0)
+    count = np.cumsum(valid, axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.cumsum(filled, axis=1) / count
+    previous = np.concatenate([np.full((len(blocks), 1), np.nan), mean[:, :-1]], axis=1)
+    increment = np.where(valid & (count > 1), (filled - previous) * (filled - mean), 0.0)
+    return count, shift + mean, np.cumsum(increment, axis=1)
+
+
+def sliding_extreme(values, window, ufunc):
+    """Trailing-window ``np.maximum``/``np.minimum`` over rows [i - window + 1, i], NaNs skipped.
+
+    Van Herk / Gil-Werman: per-block prefix and suffix extremes, so every
+    window is one comparison of two precomputed values, O(n) for any window.
+    Rows whose window holds no valid value get the ufunc's identity fill
+    (-inf for the maximum, +inf for the minimum).
+    """
+    fill = -np.inf if ufunc is np.maximum else np.inf
+    n = len(values)
+    padded = _blocks(np.where(np.isnan(values), fill, values), window, fill)
+    prefix = ufunc.accumulate(padded, axis=1).ravel()
+    suffix = ufunc.accumulate(padded[:, ::-1], axis=1)[:, ::-1].ravel()
+    starts = np.arange(n)
+    return ufunc(suffix[starts], prefix[starts + window - 1])
+
+
+class RollingEngine:
+    """Trailing rolling mean/std (ddof=1) and min/max of one series for any number of window lengths.
+
+    Each window length costs O(n) whatever its size. The series is cut into
+    blocks of ``window`` rows, so every trailing window is the suffix of one
+    block plus the prefix of the next (van Herk / Gil-Werman). Running
+    moments of those prefixes and suffixes (``running_moments``) are
+    combined with Chan et al.'s pairwise update, whose terms are all
+    non-negative, so a window's std stays accurate however small its spread
+    is next to the level of the rest of the series. Semantics match
+    ``rolling(window, min_periods=1)``: NaNs are skipped, the std needs two
+    valid samples, and windows holding a single repeated value get exactly
+    that mean and a std of 0.
+    """
+
+    def __init__(self, values):
+        self.values = np.asarray(values, dtype=float)
+
+    def _moments(self, window):
+        """(count, mean, m2) of the trailing window of every row."""
+        blocks = _blocks(self.values, window, np.nan)
+        prefix = [part.ravel() for part in running_moments(blocks)]
+        suffix = [part[:, ::-1].ravel() for part in running_moments(blocks[:, ::-1])]
+        starts = np.arange(len(self.values))
+        ends = starts + window - 1
+        # A window starting on a block boundary is that whole block: its suffix alone
+        whole = starts % window == 0
+        count_a, mean_a, m2_a = (part[starts] for part in suffix)
+        count_b = np.where(whole, 0, prefix[0][ends])
+        mean_b, m2_b = prefix[1][ends], np.where(whole, 0.0, prefix[2][ends])
+        count = count_a + count_b
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta = mean_b - mean_a
+            mean = np.where(count_b == 0, mean_a, np.where(count_a == 0, mean_b, mean_a + delta * count_b / count))
+            m2 = np.where(count_b == 0, m2_a,
+                          np.where(count_a == 0, m2_b, m2_a + m2_b + delta * delta * count_a * count_b / count))
+        return count.astype(float), mean, m2
+
+    def stats(self, window, minmax=False):
+        """{'mean', 'std'} (plus 'min', 'max' with ``minmax``) arrays for one window length."""
+        count, mean, m2 = self._moments(window)
+        high = sliding_extreme(self.values, window, np.maximum)
+        low = sliding_extreme(self.values, window, np.minimum)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            variance = np.maximum(m2, 0.0) / (count - 1)
+        constant = (count > 0) & (high == low)
+        mean = np.where(constant, high, mean)
+        std = np.where(count > 1, np.where(constant, 0.0, np.sqrt(variance)), np.nan)
+        stats = {'mean': np.where(count > 0, mean, np.nan), 'std': std}
+        if minmax:
+            stats['min'] = np.where(count > 0, low, np.nan)
+            stats['max'] = np.where(count > 0, high, np.nan)
+        return stats
+
+
+def rolling_stats(values, windows, minmax=False):
+    """Rolling statistics of ``values`` for each window length in ``windows``."""
+    engine = RollingEngine(values)
+    return {window: engine.stats(window, minmax) for window in windows}
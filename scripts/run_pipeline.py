@@ -0,0 +1,371 @@
+import argparse
+import ast
+import glob
+import hashlib
+import json
+import os
+import shlex
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+
+# Define base paths relative to the script location
+scripts_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(scripts_dir)
+state_path = os.path.join(project_root, 'data', 'pipeline_state.json')
+log_dir = os.path.join(project_root, 'data', 'pipeline_logs')
+
+CATALOG = 'data/cactus/halo_cmes.csv'
+SWIS_CSV = 'data/swis_csv/*/*.csv'
+DATASET = 'data/final_dataset'
+DETECTED = 'data/detected_halo_cmes.csv'
+SCORES = 'data/score_store'
+
+
+class Stage:
+    """One pipeline step: a script run with ``args``, the files it reads and the files it writes.
+
+    Inputs and outputs are project-relative paths, directories or glob
+    patterns. An input written by an upstream stage is keyed on the hash
+    that stage recorded for it, so stages that rewrite a file in place
+    (catalog_preparation) do not invalidate the stage that first wrote it.
+    """
+
+    def __init__(self, name, script, inputs=(), outputs=(), deps=(), args=()):
+        self.name = name
+        self.script = script
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.deps = list(deps)
+        self.args = list(args)
+
+
+STAGES = [
+    Stage('extract_halo_cme', 'extract_halo_cme.py', inputs=['data/cactus/cactus_catalog.txt'], outputs=[CATALOG]),
+    Stage('catalog_preparation', 'catalog_preparation.py', inputs=[CATALOG], outputs=[CATALOG],
+          deps=['extract_halo_cme']),
+    Stage('cdf_to_csv', 'cdf_to_csv.py', inputs=['data/swis_raw'], outputs=[SWIS_CSV]),
+    Stage('data_preparation', 'data_preparation.py', inputs=[SWIS_CSV], outputs=[DATASET], deps=['cdf_to_csv']),
+    Stage('aggregates', 'aggregate_store.py', inputs=[DATASET], outputs=['data/aggregates'], deps=['data_preparation']),
+    Stage('halo_cme_detection', 'halo_cme_detection.py', inputs=[CATALOG, DATASET],
+          outputs=[DETECTED, 'data/false_negatives.csv', SCORES],
+          deps=['catalog_preparation', 'data_preparation']),
+    Stage('evaluation', 'evaluation.py', inputs=[CATALOG, DETECTED],
+          outputs=['data/evaluation_metrics.txt', 'data/evaluation_matches.csv'],
+          deps=['catalog_preparation', 'halo_cme_detection']),
+    Stage('plots', 'render_plots.py', inputs=[CATALOG, DETECTED, SCORES, DATASET],
+          outputs=[f'plots/{kind}' for kind in ('plot_scores', 'event_overlay', 'catalog_overlay', 'visualize_scores',
+                                                'timeline', 'before_after', 'params_overlay')],
+          deps=['catalog_preparation', 'data_preparation', 'halo_cme_detection']),
+    Stage('plot_strength', 'strength_distribution.py', inputs=[DETECTED],
+          outputs=['plots/cme_strength_distribution.png'], deps=['halo_cme_detection']),
+    Stage('plot_heatmap', 'composite_score_heatmap.py', inputs=[DETECTED, DATASET], outputs=['plots/heatmaps'],
+          deps=['data_preparation', 'halo_cme_detection']),
+]
+
+
+class ContentHasher:
+    """SHA-256 of files, directories and glob patterns, reusing a file's hash while its size and mtime are unchanged."""
+
+    def __init__(self, cache=None):
+        self.cache = cache or {}
+
+    def file(self, path):
+        relpath = os.path.relpath(path, project_root)
+        stat = os.stat(path)
+        cached = self.cache.get(relpath)
+        if cached and cached[:2] == [stat.st_size, stat.st_mtime_ns]:
+            return cached[2]
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        self.cache[relpath] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+        return digest.hexdigest()
+
+    def files(self, pattern):
+        """Every file a path, directory or glob pattern currently names, sorted."""
+        found = []
+        for path in glob.glob(os.path.join(project_root, pattern)):
+            if os.path.isdir(path):
+                for root, _, names in os.walk(path):
+                    found += [os.path.join(root, name) for name in names]
+            elif os.path.isfile(path):
+                found.append(path)
+        return sorted(found)
+
+    def pattern(self, pattern):
+        """One hash over the names and contents of the files ``pattern`` names, or None when there are none."""
+        files = self.files(pattern)
+        if not files:
+            return None
+        digest = hashlib.sha256()
+        for path in files:
+            digest.update(f"{os.path.relpath(path, project_root)}\0{self.file(path)}\n".encode())
+        return digest.hexdigest()
+
+    def prune(self):
+        self.cache = {path: entry for path, entry in self.cache.items()
+                      if os.path.exists(os.path.join(project_root, path))}
+
+
+def local_modules(script):
+    """The script plus every module of scripts/ it imports, directly or through another one."""
+    found = []
+    queue = [script]
+    while queue:
+        name = queue.pop()
+        if name in found:
+            continue
+        found.append(name)
+        with open(os.path.join(scripts_dir, name)) as f:
+            tree = ast.parse(f.read(), filename=name)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                modules = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                modules = [node.module]
+            else:
+                continue
+            queue += [f'{module}.py' for module in modules if os.path.exists(os.path.join(scripts_dir, f'{module}.py'))]
+    return sorted(found)
+
+
+class Pipeline:
+    """Runs the stage DAG, skipping stages whose code, arguments, inputs and outputs are unchanged.
+
+    A stage is current when the hashes of its code (the script and the
+    scripts/ modules it imports), its arguments and its inputs match those
+    recorded when it last ran, and its outputs still hash to what was
+    recorded then. Stages whose dependencies are finished run concurrently
+    in up to ``jobs`` subprocesses; if a rebuilt stage writes byte-identical
+    outputs, its dependents stay current.
+    """
+
+    def __init__(self, stages, jobs=1, force=(), extra_args=None, path=state_path):
+        self.stages = {stage.name: stage for stage in stages}
+        self.order = [stage.name for stage in stages]
+        self.jobs = jobs
+        self.force = set(force)
+        self.extra_args = extra_args or {}
+        self.path = path
+        self.state = {'stages': {}, 'hashes': {}}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.state = json.load(f)
+        self.hasher = ContentHasher(self.state.get('hashes'))
+        self.results = {}
+        self._started = {}
+
+    def ancestors(self, name):
+        found = set()
+        queue = list(self.stages[name].deps)
+        while queue:
+            dep = queue.pop()
+            if dep not in found:
+                found.add(dep)
+                queue += self.stages[dep].deps
+        return found
+
+    def select(self, targets):
+        """The targets and everything they depend on, in pipeline order."""
+        if not targets:
+            return list(self.order)
+        wanted = set(targets)
+        for target in targets:
+            wanted |= self.ancestors(target)
+        return [name for name in self.order if name in wanted]
+
+    def producer(self, name, pattern):
+        """The last upstream stage that writes ``pattern``, or None for a source file."""
+        ancestors = self.ancestors(name)
+        writers = [other for other in self.order if other in ancestors and pattern in self.stages[other].outputs]
+        return writers[-1] if writers else None
+
+    def final_writer(self, name, pattern):
+        """The last stage from ``name`` onwards that writes ``pattern``; its record is what the file should hash to."""
+        writers = [other for other in self.order[self.order.index(name):]
+                   if other == name or (name in self.ancestors(other) and pattern in self.stages[other].outputs)]
+        return writers[-1]
+
+    def components(self, name):
+        stage = self.stages[name]
+        inputs = {}
+        for pattern in stage.inputs:
+            producer = self.producer(name, pattern)
+            if producer is None:
+                inputs[pattern] = self.hasher.pattern(pattern)
+            else:
+                inputs[pattern] = self.state['stages'].get(producer, {}).get('outputs', {}).get(pattern)
+        return {
+            'code': {module: self.hasher.file(os.path.join(scripts_dir, module))
+                     for module in local_modules(stage.script)},
+            'args': stage.args + self.extra_args.get(name, []),
+            'inputs': inputs,
+        }
+
+    def stale_reasons(self, name, components):
+        """Why the stage has to run again; empty when it is current."""
+        if name in self.force:
+            return ['forced']
+        previous = self.state['stages'].get(name)
+        if previous is None:
+            return ['never run']
+        reasons = []
+        old = previous['components']
+        changed = sorted(module for module in set(components['code']) | set(old['code'])
+                         if components['code'].get(module) != old['code'].get(module))
+        if changed:
+            reasons.append(f"code changed: {', '.join(changed)}")
+        if components['args'] != old['args']:
+            reasons.append(f"arguments changed: {shlex.join(old['args']) or '(none)'} → "
+                           f"{shlex.join(components['args']) or '(none)'}")
+        for pattern, digest in components['inputs'].items():
+            if digest != old['inputs'].get(pattern):
+                producer = self.producer(name, pattern)
+                reasons.append(f"input changed: {pattern}" + (f" (from {producer})" if producer else ''))
+        for pattern in self.stages[name].outputs:
+            writer = self.final_writer(name, pattern)
+            recorded = self.state['stages'].get(writer, {}).get('outputs', {}).get(pattern)
+            if self.hasher.pattern(pattern) != recorded:
+                reasons.append(f"output {'missing' if not self.hasher.files(pattern) else 'modified'}: {pattern}")
+        return reasons
+
+    def command(self, name):
+        stage = self.stages[name]
+        return [sys.executable, os.path.join(scripts_dir, stage.script)] + stage.args + self.extra_args.get(name, [])
+
+    def execute(self, name):
+        """Run one stage's script to completion from the project root, logging its output."""
+        os.makedirs(log_dir, exist_ok=True)
+        log_path = os.path.join(log_dir, f'{name}.log')
+        env = dict(os.environ, MPLBACKEND='Agg')
+        started = time.perf_counter()
+        with open(log_path, 'w') as log:
+            returncode = subprocess.run(self.command(name), cwd=project_root, stdout=log, stderr=subprocess.STDOUT,
+                                        env=env).returncode
+        return returncode, time.perf_counter() - started, log_path
+
+    def record(self, name, components, wall):
+        self.state['stages'][name] = {
+            'components': components,
+            'outputs': {pattern: self.hasher.pattern(pattern) for pattern in self.stages[name].outputs},
+            'finished': datetime.now().isoformat(timespec='seconds'),
+            'wall_s': round(wall, 3),
+        }
+        self.save()
+
+    def save(self):
+        self.hasher.prune()
+        self.state['hashes'] = self.hasher.cache
+        # Forget stages that are no longer part of the pipeline
+        self.state['stages'] = {name: record for name, record in self.state['stages'].items() if name in self.stages}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def run(self, targets=(), dry_run=False):
+        """Run (or with ``dry_run`` only report) the selected stages; returns {stage: result}."""
+        pending = self.select(targets)
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            while pending or running:
+                for name in list(pending):
+                    deps = self.stages[name].deps
+                    if any(dep not in self.results for dep in deps):
+                        continue
+                    pending.remove(name)
+                    blocked = [dep for dep in deps if self.results[dep]['status'] in ('failed', 'blocked')]
+                    if blocked:
+                        self.results[name] = {'status': 'blocked', 'reasons': [f"{', '.join(blocked)} did not finish"]}
+                        continue
+                    components = self.components(name)
+                    reasons = self.stale_reasons(name, components)
+                    waiting = [dep for dep in deps if self.results[dep]['status'] in ('would rebuild', 'may rebuild')]
+                    if dry_run and waiting and not reasons:
+                        self.results[name] = {'status': 'may rebuild',
+                                              'reasons': [f"if the outputs of {', '.join(waiting)} change"]}
+                    elif not reasons:
+                        self.results[name] = {'status': 'current', 'reasons': []}
+                        print(f"✅ {name} is up to date")
+                    elif dry_run:
+                        self.results[name] = {'status': 'would rebuild', 'reasons': reasons}
+                    else:
+                        print(f"🔁 Running {name} ({'; '.join(reasons)})")
+                        running[pool.submit(self.execute, name)] = name
+                        self._started[name] = (components, reasons)
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    returncode, wall, log_path = future.result()
+                    components, reasons = self._started.pop(name)
+                    if returncode == 0:
+                        self.record(name, components, wall)
+                        self.results[name] = {'status': 'rebuilt', 'reasons': reasons, 'wall_s': wall}
+                        print(f"✅ {name} finished in {wall:.1f}s")
+                    else:
+                        self.results[name] = {'status': 'failed', 'reasons': reasons, 'wall_s': wall,
+                                              'log': log_path, 'returncode': returncode}
+                        print(f"❌ {name} failed (exit {returncode}); see {log_path}")
+        return self.results
+
+    def summary(self):
+        icons = {'rebuilt': '🔁', 'current': '✅', 'failed': '❌', 'blocked': '⏭️', 'would rebuild': '🔁', 'may rebuild': '❔'}
+        lines = ["\n📋 Pipeline summary:"]
+        for name in self.order:
+            if name not in self.results:
+                continue
+            result = self.results[name]
+            wall = f"{result['wall_s']:.1f}s" if 'wall_s' in result else ''
+            why = '; '.join(result['reasons']) if result['status'] != 'current' else 'inputs, code and outputs unchanged'
+            lines.append(f"   {icons[result['status']]} {name:<22} {result['status']:<14} {wall:>8}  {why}")
+        counts = {}
+        for result in self.results.values():
+            counts[result['status']] = counts.get(result['status'], 0) + 1
+        lines.append("   " + ', '.join(f"{count} {status}" for status, count in counts.items()))
+        return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the halo CME pipeline, rebuilding only the stages whose '
+                                                 'code, arguments or input contents changed.')
+    parser.add_argument('targets', nargs='*', metavar='STAGE',
+                        help=f"Stages to bring up to date, with everything they depend on (default: all). "
+                             f"Stages: {', '.join(stage.name for stage in STAGES)}.")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                        help='Independent stages to run at the same time (default: all cores).')
+    parser.add_argument('--force', nargs='*', metavar='STAGE',
+                        help='Rerun these stages (all selected stages if none are named) even when current.')
+    parser.add_argument('--args', action='append', default=[], metavar='STAGE=ARGS',
+                        help="Extra arguments for a stage's script, e.g. --args halo_cme_detection='--workers 4'. "
+                             "They are part of the stage's key, so changing them reruns it.")
+    parser.add_argument('--dry-run', action='store_true', help='Only report which stages would run and why.')
+    args = parser.parse_args()
+
+    names = [stage.name for stage in STAGES]
+    extra_args = {}
+    for item in args.args:
+        name, _, value = item.partition('=')
+        if name not in names:
+            parser.error(f"unknown stage in --args: {name}")
+        extra_args[name] = shlex.split(value)
+    for name in args.targets + (args.force or []):
+        if name not in names:
+            parser.error(f"unknown stage: {name}")
+    force = args.force if args.force else (names if args.force is not None else [])
+
+    pipeline = Pipeline(STAGES, jobs=max(args.jobs, 1), force=force, extra_args=extra_args)
+    results = pipeline.run(args.targets, dry_run=args.dry_run)
+    print(pipeline.summary())
+    if any(result['status'] in ('failed', 'blocked') for result in results.values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
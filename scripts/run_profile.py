@@ -0,0 +1,137 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import resource
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+MB = 1 << 20
+
+# Records of the measured blocks currently open, innermost last, with the largest traced peak seen in their children
+_open = []
+
+
+def peak_rss_mb():
+    """High-water resident set size of this process so far."""
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def add_profile_argument(parser):
+    parser.add_argument('--profile', choices=['cprofile', 'tracemalloc'],
+                        help='Also profile the run: cProfile hot spots, or tracemalloc per-stage peaks and top '
+                             'allocation sites (slower), saved with the JSON run profile.')
+
+
+@contextmanager
+def measured(record):
+    """Fill ``record`` with the wall/CPU time and peak memory of the enclosed block.
+
+    ``peak_rss_mb`` is the process high-water mark at the end of the block;
+    while tracemalloc is on, ``peak_traced_mb`` is the block's own peak of
+    traced allocations (nested blocks included).
+    """
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        if _open:
+            _open[-1][1] = max(_open[-1][1], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+    _open.append([record, 0])
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    try:
+        yield record
+    finally:
+        record['wall_s'] = round(time.perf_counter() - wall, 6)
+        record['cpu_s'] = round(time.process_time() - cpu, 6)
+        record['peak_rss_mb'] = peak_rss_mb()
+        _, child_peak = _open.pop()
+        if tracing:
+            peak = max(child_peak, tracemalloc.get_traced_memory()[1])
+            record['peak_traced_mb'] = round(peak / MB, 3)
+            if _open:
+                _open[-1][1] = max(_open[-1][1], peak)
+
+
+def measure(function, *args, **fields):
+    """Call ``function(*args)``; returns its value and a measured record holding ``fields``."""
+    record = dict(fields)
+    with measured(record):
+        value = function(*args)
+    return value, record
+
+
+class RunProfile:
+    """Per-stage (and per-CME-window) wall/CPU time, rows and peak memory of one script run.
+
+    Stages are measured with ``with profile.stage(name) as record:``, setting
+    ``record['rows']`` inside the block; window records measured elsewhere
+    (e.g. in worker processes) are added with ``add_window``. ``mode`` turns
+    on cProfile or tracemalloc for the whole run; ``save`` writes everything
+    as JSON (plus the raw cProfile stats next to it).
+    """
+
+    def __init__(self, script, path, mode=None):
+        self.path = path
+        self.mode = mode
+        self.data = {
+            'script': script,
+            'started': datetime.now().isoformat(timespec='seconds'),
+            'argv': sys.argv[1:],
+            'cpus': os.cpu_count(),
+            'profile': mode,
+            'stages': [],
+            'windows': [],
+        }
+        self._profiler = None
+        if mode == 'cprofile':
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        elif mode == 'tracemalloc':
+            tracemalloc.start()
+        self._run = {}
+        self._context = measured(self._run)
+        self._context.__enter__()
+
+    def stage(self, name, **fields):
+        record = {'stage': name, **fields}
+        self.data['stages'].append(record)
+        return measured(record)
+
+    def window(self, **fields):
+        record = dict(fields)
+        self.data['windows'].append(record)
+        return measured(record)
+
+    def add_window(self, record):
+        self.data['windows'].append(record)
+
+    def save(self):
+        self._context.__exit__(None, None, None)
+        self.data['total'] = self._run
+        if self._profiler is not None:
+            self._profiler.disable()
+            stats_path = os.path.splitext(self.path)[0] + '.prof'
+            self._profiler.dump_stats(stats_path)
+            stats = pstats.Stats(self._profiler, stream=io.StringIO()).stats
+            self.data['cprofile'] = {
+                'stats_path': stats_path,
+                'top': [{'function': f"{os.path.basename(file)}:{line}({name})", 'calls': calls,
+                         'tottime_s': round(tottime, 6), 'cumtime_s': round(cumtime, 6)}
+                        for (file, line, name), (_, calls, tottime, cumtime, _)
+                        in sorted(stats.items(), key=lambda item: -item[1][3])[:25]],
+            }
+        if self.mode == 'tracemalloc':
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            self.data['tracemalloc'] = [{'site': str(stat.traceback), 'size_mb': round(stat.size / MB, 3),
+                                         'count': stat.count}
+                                        for stat in snapshot.statistics('lineno')[:15]]
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, 'w') as f:
+            json.dump(self.data, f, indent=2, default=str)
+        return self.path
@@ -0,0 +1,207 @@
+import os
+import json
+import shutil
+import numpy as np
+import pandas as pd
+
+# Base paths
+project_root = os.path.dirname(os.path.dirname(__file__))
+score_store_path = os.path.join(project_root, 'data', 'score_store')
+
+FORMAT_VERSION = 1
+
+
+class ScoreStoreWriter:
+    """Lays out the composite-score store of a detection run and fills it in window by window.
+
+    The store is one binary file, ``scores.bin``, holding column blocks over
+    the timeline rows covered by at least one CME window: ``Time`` (int64
+    ns) and each parameter's combined z-score, which is the same for every
+    window past its first ``head`` rows (see ``rolling_mean_std``). Those
+    leading rows are re-scored per window and kept in per-parameter ``head``
+    blocks. ``index.json`` records the byte offsets of the blocks and, per
+    CME window, its rows in the store, its head and its adaptive
+    thresholds, from which readers rebuild the composite score exactly.
+    Overlapping windows therefore share their rows instead of each writing
+    its own copy.
+
+    ``ranges`` maps CME numbers to [i0, i1) row ranges of ``times`` (the
+    int64-ns timeline). The layout is fixed when the writer is created, so
+    windows can be written from worker processes in any order; ``close``
+    adds the thresholds and swaps the store in atomically.
+    """
+
+    def __init__(self, path, times, ranges, params, param_weights, head):
+        self.path = path
+        self.tmp_path = path + '.tmp'
+        self.file_path = os.path.join(self.tmp_path, 'scores.bin')
+        ranges = {int(cme_number): (int(i0), int(i1)) for cme_number, (i0, i1) in ranges.items() if i1 > i0}
+
+        # Union of the window ranges: windows that overlap share one segment of store rows
+        segments = []
+        for i0, i1 in sorted(ranges.values()):
+            if segments and i0 <= segments[-1][1]:
+                segments[-1][1] = max(segments[-1][1], i1)
+            else:
+                segments.append([i0, i1])
+        segment_starts = np.array([i0 for i0, _ in segments], dtype=np.int64)
+        store_starts = np.concatenate([[0], np.cumsum([i1 - i0 for i0, i1 in segments])]).astype(np.int64)
+        rows = int(store_starts[-1])
+
+        windows = {}
+        head_rows = 0
+        for cme_number, (i0, i1) in ranges.items():
+            segment = int(np.searchsorted(segment_starts, i0, side='right')) - 1
+            length = min(head, i1 - i0)
+            windows[str(cme_number)] = {'start': int(store_starts[segment] + i0 - segment_starts[segment]),
+                                        'rows': i1 - i0, 'head_offset': head_rows, 'head_rows': length}
+            head_rows += length
+
+        columns = {}
+        offset = 0
+        for name, dtype, length in ([('Time', '<i8', rows)] + [(f'z/{param}', '<f8', rows) for param in params]
+                                    + [(f'head/{param}', '<f8', head_rows) for param in params]):
+            columns[name] = {'offset': offset, 'dtype': dtype, 'rows': length}
+            offset += 8 * length
+
+        self.index = {
+            'version': FORMAT_VERSION,
+            'rows': rows,
+            'head_rows': head_rows,
+            'time_unit': 'ns',
+            'params': list(params),
+            'weights': {param: float(param_weights[param]) for param in params},
+            'columns': columns,
+            'windows': windows,
+        }
+
+        shutil.rmtree(self.tmp_path, ignore_errors=True)
+        os.makedirs(self.tmp_path)
+        with open(self.file_path, 'wb') as f:
+            f.truncate(offset)
+            for (i0, i1), start in zip(segments, store_starts):
+                f.seek(columns['Time']['offset'] + 8 * int(start))
+                np.asarray(times[i0:i1], dtype=np.int64).tofile(f)
+        self._save_index(self.tmp_path)
+
+    def _save_index(self, path):
+        with open(os.path.join(path, 'index.json'), 'w') as f:
+            json.dump(self.index, f, indent=2)
+
+    def write_window(self, cme_number, combined_z):
+        """Write one window's per-parameter combined z-scores (aligned with its rows) into the store."""
+        window = self.index['windows'][str(int(cme_number))]
+        columns = self.index['columns']
+        head = window['head_rows']
+        fd = os.open(self.file_path, os.O_WRONLY)
+        try:
+            for param in self.index['params']:
+                z = np.ascontiguousarray(combined_z[param], dtype='<f8')
+                if len(z) != window['rows']:
+                    raise ValueError(f"CME {cme_number}: {len(z)} scores for a window of {window['rows']} rows")
+                os.pwrite(fd, z[:head].tobytes(), columns[f'head/{param}']['offset'] + 8 * window['head_offset'])
+                os.pwrite(fd, z[head:].tobytes(), columns[f'z/{param}']['offset'] + 8 * (window['start'] + head))
+        finally:
+            os.close(fd)
+
+    def close(self, thresholds, composite_thresholds=None, percentile=None):
+        """Record each window's adaptive thresholds (and composite-score threshold) and move the store into place.
+
+        ``percentile`` is the composite-score percentile the thresholds were taken at.
+        """
+        if percentile is not None:
+            self.index['percentile'] = float(percentile)
+        for cme_number, window_thresholds in thresholds.items():
+            self.index['windows'][str(int(cme_number))]['thresholds'] = {
+                param: float(value) for param, value in window_thresholds.items()}
+        for cme_number, threshold in (composite_thresholds or {}).items():
+            self.index['windows'][str(int(cme_number))]['threshold'] = float(threshold)
+        self._save_index(self.tmp_path)
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.rename(self.tmp_path, self.path)
+        return self.path
+
+    def abort(self):
+        shutil.rmtree(self.tmp_path, ignore_errors=True)
+
+
+class ScoreStore:
+    """Memory-mapped reader for the composite-score store written by ``ScoreStoreWriter``.
+
+    Per-CME times and z-scores are views into the mapped file; composite
+    scores (and optionally the per-parameter contributions they sum) are
+    rebuilt with the detector's own arithmetic, so they are bit-identical to
+    the scores the detection run thresholded.
+    """
+
+    def __init__(self, path=score_store_path):
+        index_path = os.path.join(path, 'index.json')
+        if not os.path.exists(index_path):
+            raise FileNotFoundError(f"No composite-score store at '{path}'. Run halo_cme_detection.py first.")
+        with open(index_path) as f:
+            self.index = json.load(f)
+        self.path = path
+        self.params = self.index['params']
+        self.weights = self.index['weights']
+        self._buffer = None
+
+    def _column(self, name):
+        if self._buffer is None:
+            file_path = os.path.join(self.path, 'scores.bin')
+            # numpy cannot map an empty file (a run whose windows held no SWIS data)
+            self._buffer = (np.memmap(file_path, dtype=np.uint8, mode='r') if os.path.getsize(file_path)
+                            else np.empty(0, dtype=np.uint8))
+        column = self.index['columns'][name]
+        return self._buffer[column['offset']:column['offset'] + 8 * column['rows']].view(column['dtype'])
+
+    @property
+    def cme_numbers(self):
+        return [int(cme_number) for cme_number in self.index['windows']]
+
+    def __contains__(self, cme_number):
+        return str(int(cme_number)) in self.index['windows']
+
+    def _window(self, cme_number):
+        return self.index['windows'][str(int(cme_number))]
+
+    def times(self, cme_number):
+        window = self._window(cme_number)
+        return self._column('Time')[window['start']:window['start'] + window['rows']].view('datetime64[ns]')
+
+    def z_scores(self, cme_number):
+        """Per-parameter combined z-scores of one window: its own head rows, then the shared rows."""
+        window = self._window(cme_number)
+        head = window['head_rows']
+        start = window['start'] + head
+        stop = window['start'] + window['rows']
+        return {param: np.concatenate([self._column(f'head/{param}')[window['head_offset']:window['head_offset'] + head],
+                                       self._column(f'z/{param}')[start:stop]])
+                for param in self.params}
+
+    def threshold(self, cme_number):
+        """The detector's composite-score threshold of one window (its ``percentile``), as cached at detection time."""
+        window = self._window(cme_number)
+        if 'threshold' not in window:
+            raise ValueError(f"The score store at '{self.path}' has no cached threshold for CME {cme_number} (written "
+                             f"before thresholds were recorded). Re-run halo_cme_detection.py.")
+        return window['threshold']
+
+    def contributions(self, cme_number):
+        """Weighted, thresholded score contribution of each parameter (NaN where its z-score is missing)."""
+        thresholds = self._window(cme_number)['thresholds']
+        return {param: self.weights[param] * (z > thresholds[param]) * z
+                for param, z in self.z_scores(cme_number).items()}
+
+    def composite(self, cme_number):
+        """Composite score of one window, summed in parameter order exactly as ``composite_from_z`` does."""
+        composite_score = np.zeros(self._window(cme_number)['rows'])
+        for score_contrib in self.contributions(cme_number).values():
+            composite_score += np.where(np.isnan(score_contrib), 0.0, score_contrib)
+        return composite_score
+
+    def frame(self, cme_number, contributions=False):
+        """``Time`` and ``Composite_Score`` of one window (plus one column per parameter contribution)."""
+        data = {'Time': self.times(cme_number), 'Composite_Score': self.composite(cme_number)}
+        if contributions:
+            data.update(self.contributions(cme_number))
+        return pd.DataFrame(data)
@@ -0,0 +1,358 @@
+import argparse
+import math
+from collections import deque
+import pandas as pd
+import numpy as np
+
+from halo_cme_detection import (
+    ROLLING_WINDOW, PERCENTILE_THRESHOLD, COMPOSITE_THRESHOLD_MIN, NOISE_SCORE_MIN, MERGE_GAP,
+    weights, params, load_global_baseline, window_combined_z, adaptive_thresholds,
+    composite_from_z, extract_events, classify_events, event_strength, event_type,
+)
+from quantile_sketch import SlidingQuantile
+from swis_store import SwisDataset
+
+# Nominal SWIS L2 cadence (5 s)
+SAMPLES_PER_HOUR = 720
+
+RECORD_ICONS = {'event_start': '🟡', 'event_confirmed': '🟢', 'event_retracted': '⚪', 'event_end': '🔴'}
+
+
+EMPTY_MOMENTS = (0, 0.0, 0.0)
+
+
+def add_moment(moments, value):
+    """Welford update of (count, mean, m2) with one sample; NaNs are skipped."""
+    count, mean, m2 = moments
+    if math.isnan(value):
+        return moments
+    count += 1
+    delta = value - mean
+    mean += delta / count
+    return count, mean, m2 + delta * (value - mean)
+
+
+def merge_moments(a, b):
+    """(count, mean, m2) of two disjoint sample sets, by Chan et al.'s pairwise update."""
+    if a[0] == 0:
+        return b
+    if b[0] == 0:
+        return a
+    count = a[0] + b[0]
+    delta = b[1] - a[1]
+    return count, a[1] + delta * b[0] / count, a[2] + b[2] + delta * delta * a[0] * b[0] / count
+
+
+class RollingStats:
+    """Trailing mean/std (ddof=1) over the last ``size`` samples of a stream, skipping NaNs.
+
+    Welford moments kept as a two-stack queue: new samples update the moments
+    of the newer stack, and the older stack holds the moments of each of its
+    suffixes, so evicting the oldest sample is a pop. When the older stack
+    runs dry the newer one is folded into it from newest to oldest. Each
+    push is amortized O(1), and a sample leaving the window is never
+    subtracted from a running sum, so a -1e+31 fill value passing through
+    does not wipe out the remaining samples' precision. Results agree with
+    ``halo_cme_detection.rolling_mean_std`` to rounding.
+    """
+
+    def __init__(self, size=ROLLING_WINDOW):
+        self.size = size
+        self.newer = []
+        self.newer_moments = EMPTY_MOMENTS
+        self.older = []
+
+    def push(self, value):
+        if len(self.newer) + len(self.older) == self.size:
+            if not self.older:
+                moments = EMPTY_MOMENTS
+                for x in reversed(self.newer):
+                    moments = add_moment(moments, x)
+                    self.older.append(moments)
+                self.newer, self.newer_moments = [], EMPTY_MOMENTS
+            self.older.pop()
+        self.newer.append(value)
+        self.newer_moments = add_moment(self.newer_moments, value)
+        count, mean, m2 = merge_moments(self.older[-1] if self.older else EMPTY_MOMENTS, self.newer_moments)
+        if count == 0:
+            return math.nan, math.nan
+        std = math.sqrt(max(m2, 0.0) / (count - 1)) if count > 1 else math.nan
+        return mean, std
+
+
+class StreamingDetector:
+    """Online halo CME detector: one SWIS sample in, zero or more event records out.
+
+    Per-sample work and memory are (amortized) constant apart from the composite scores of
+    the currently open event, which ``find_peaks`` needs to classify it. The
+    per-parameter and composite thresholds are fixed inputs, typically
+    calibrated by the batch path on the preceding day (see ``calibrate``) and
+    swapped with ``set_thresholds`` as the detector runs.
+
+    Records are emitted as dicts with ``Record`` set to:
+
+    - ``'event_start'``, provisionally, on the first sample at which an open
+      high-score run's running mean reaches NOISE_SCORE_MIN (and the event
+      already spans ``min_duration``), so the start is announced while the
+      run is still going;
+    - ``'event_confirmed'`` or ``'event_retracted'`` on the sample that
+      closes that run (one sample after its last high score), depending on
+      whether the whole run still averages NOISE_SCORE_MIN, which is the
+      batch path's test; a start is therefore settled at most one sample
+      after its run ends;
+    - ``'event_end'`` once MERGE_GAP has elapsed without a mergeable run, so
+      end latency is bounded by MERGE_GAP plus one sample.
+
+    Runs that merge into an event already announced add no records.
+    The batch path does not enforce MIN_DURATION; pass ``min_duration`` to
+    suppress shorter events.
+
+    With ``sliding`` (a number of samples) the thresholds instead follow the
+    stream: every ``refresh`` samples they are re-estimated, as the batch
+    path computes them, from quantile sketches of the last ``sliding``
+    combined z-scores and composite scores (``quantile_sketch.SlidingQuantile``,
+    within its relative error bound), in constant memory per bucket.
+    """
+
+    def __init__(self, global_baseline, thresholds, composite_threshold, min_duration=None, sliding=None,
+                 refresh=SAMPLES_PER_HOUR):
+        self.global_baseline = global_baseline
+        self.params = [param for param in params if param in thresholds]
+        self.rolling = {param: RollingStats() for param in self.params}
+        self.set_thresholds(thresholds, composite_threshold)
+        self.min_duration = min_duration
+        self.refresh = refresh
+        self.refreshed = 0
+        self.z_windows = {param: SlidingQuantile(sliding) for param in self.params} if sliding else None
+        self.composite_window = SlidingQuantile(sliding) if sliding else None
+        self.index = -1
+        self.last_time = None
+        self._bucket = None
+        self._baseline = {}
+        self.run = None
+        self.event = None
+        self.scores = []
+        self.scores_origin = 0
+
+    def set_thresholds(self, thresholds, composite_threshold):
+        self.thresholds = dict(thresholds)
+        self.composite_threshold = composite_threshold
+
+    def _baseline_for(self, time):
+        bucket = np.datetime64(time, 'ns').astype(f'datetime64[{self.global_baseline.unit}]')
+        if bucket != self._bucket:
+            times = np.array([bucket]).astype('datetime64[ns]')
+            self._baseline = {}
+            for param in self.params:
+                mean, std = self.global_baseline.lookup(times, param)
+                self._baseline[param] = (mean[0], 1e-6 if std[0] == 0 else std[0])
+            self._bucket = bucket
+        return self._baseline
+
+    def score(self, time, sample):
+        """Composite score of one sample; advances the rolling windows."""
+        baseline = self._baseline_for(time)
+        composite = 0.0
+        for param in self.params:
+            value = float(sample[param])
+            mean, std = self.rolling[param].push(value)
+            if std == 0:
+                std = 1e-6
+            local_z = (value - mean) / std
+            local_z = 0.0 if local_z < 0 else local_z
+            daily_mean, daily_std = baseline[param]
+            global_z = (value - daily_mean) / daily_std
+            global_z = 0.0 if global_z < 0 else global_z
+            z = 0.5 * local_z + 0.5 * global_z
+            if self.z_windows is not None:
+                self.z_windows[param].push(z)
+            contrib = weights[param] * float(z > self.thresholds[param]) * z
+            composite += 0.0 if math.isnan(contrib) else contrib
+        return composite
+
+    def update(self, time, sample):
+        """Feed one sample (mapping of parameter values); returns the records it triggers."""
+        time = pd.Timestamp(time)
+        self.index += 1
+        composite = self.score(time, sample)
+        if self.composite_window is not None:
+            self._slide(composite)
+        records = []
+
+        if composite > self.composite_threshold:
+            if self.run is None:
+                self.run = {'start': time, 'start_index': self.index, 'total': 0.0, 'count': 0, 'provisional': None}
+                if self.event is None:
+                    self.scores, self.scores_origin = [], self.index
+            self.run['end'], self.run['end_index'] = time, self.index
+            self.run['total'] += composite
+            self.run['count'] += 1
+            records += self._provisional_start(time)
+        elif self.run is not None:
+            records += self._close_run(time)
+
+        if self.event is not None or self.run is not None:
+            self.scores.append(composite)
+        if self.event is not None:
+            next_start = self.run['start'] if self.run is not None else None
+            if next_start is None and time - self.event['end'] > MERGE_GAP:
+                records += self._close_event(time)
+            elif next_start is not None and next_start - self.event['end'] > MERGE_GAP:
+                records += self._close_event(time)
+        self.last_time = time
+        return records
+
+    def _slide(self, composite):
+        self.composite_window.push(composite)
+        if (self.index + 1) % self.refresh or len(self.composite_window) < self.refresh:
+            return
+        thresholds = {param: max(COMPOSITE_THRESHOLD_MIN, window.percentile(PERCENTILE_THRESHOLD))
+                      for param, window in self.z_windows.items() if len(window)}
+        self.set_thresholds({**self.thresholds, **thresholds}, self.composite_window.percentile(PERCENTILE_THRESHOLD))
+        self.refreshed += 1
+
+    def flush(self):
+        """Close any open run and event at the end of the stream."""
+        records = []
+        if self.run is not None:
+            records += self._close_run(self.last_time)
+        if self.event is not None:
+            records += self._close_event(self.last_time)
+        return records
+
+    def _merges(self, run):
+        return self.event is not None and run['start'] - self.event['end'] <= MERGE_GAP
+
+    def _provisional_start(self, time):
+        run = self.run
+        if run['provisional'] is not None or run['total'] / run['count'] < NOISE_SCORE_MIN:
+            return []
+        merges = self._merges(run)
+        if merges and self.event['announced']:
+            return []
+        start = self.event['start'] if merges else run['start']
+        if self.min_duration is not None and run['end'] - start < self.min_duration:
+            return []
+        run['provisional'] = start
+        return [{'Record': 'event_start', 'Emitted_At': time, 'Detected_Start': start}]
+
+    def _close_run(self, time):
+        run, self.run = self.run, None
+        avg_score = run['total'] / run['count']
+        if avg_score < NOISE_SCORE_MIN:
+            if self.event is None:
+                self.scores = []
+            if run['provisional'] is None:
+                return []
+            return [{'Record': 'event_retracted', 'Emitted_At': time, 'Detected_Start': run['provisional']}]
+        if self._merges(run):
+            self.event.update(end=run['end'], end_index=run['end_index'], score=max(self.event['score'], avg_score))
+        else:
+            self.event = {'start': run['start'], 'start_index': run['start_index'], 'end': run['end'],
+                          'end_index': run['end_index'], 'score': avg_score, 'announced': False}
+        # A run averaging NOISE_SCORE_MIN reached it at its last sample at the latest, so any
+        # event it makes announceable already got its provisional start
+        if run['provisional'] is None:
+            return []
+        self.event['announced'] = True
+        return [{'Record': 'event_confirmed', 'Emitted_At': time, 'Detected_Start': self.event['start']}]
+
+    def _close_event(self, time):
+        event, self.event = self.event, None
+        first = event['start_index'] - self.scores_origin
+        last = event['end_index'] - self.scores_origin
+        event_scores = np.asarray(self.scores[first:last + 1])
+        if self.run is not None:
+            self.scores = self.scores[self.run['start_index'] - self.scores_origin:]
+            self.scores_origin = self.run['start_index']
+        else:
+            self.scores = []
+        if not event['announced']:
+            return []
+        return [{
+            'Record': 'event_end',
+            'Emitted_At': time,
+            'Detected_Start': event['start'],
+            'Detected_End': event['end'],
+            'Avg_Score': round(event['score'], 2),
+            'Strength': event_strength(event['score']),
+            'Event_Type': event_type(event_scores, self.composite_threshold),
+        }]
+
+
+def calibrate(data_window, global_baseline):
+    """Batch-path thresholds and events for a window, used to seed and check the stream."""
+    combined_z = window_combined_z(data_window, global_baseline)
+    thresholds = adaptive_thresholds(combined_z)
+    composite_score = composite_from_z(combined_z, len(data_window), thresholds)
+    composite_threshold = np.percentile(composite_score[~np.isnan(composite_score)], PERCENTILE_THRESHOLD)
+    data_window = data_window.copy()
+    data_window['Composite_Score'] = composite_score
+    events = classify_events(data_window, extract_events(data_window, composite_threshold), composite_threshold)
+    return thresholds, composite_threshold, events
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Replay SWIS samples through the streaming halo CME detector.')
+    parser.add_argument('--day', help='Day to replay (YYYY-MM-DD); defaults to the first day in the dataset.')
+    parser.add_argument('--calibration-day',
+                        help='Day whose batch thresholds seed the stream; defaults to the replayed day, '
+                             'which makes the stream reproduce the batch events exactly.')
+    parser.add_argument('--sliding-hours', type=float, default=0,
+                        help='Re-estimate the thresholds hourly from sketches of this many trailing hours of scores '
+                             'instead of keeping the calibrated ones (0 keeps them fixed).')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    dataset = SwisDataset()
+    swis_data = dataset.to_frame([param for param in params if param in dataset.columns])
+    global_baseline = load_global_baseline(swis_data, dataset=dataset)
+
+    days = swis_data['Time'].dt.strftime('%Y-%m-%d')
+    day = args.day or days.iloc[0]
+    calibration_day = args.calibration_day or day
+    day_data = swis_data[days == day].reset_index(drop=True)
+    if day_data.empty:
+        print(f"⚠️ No SWIS data found for {day}.")
+        return
+
+    thresholds, composite_threshold, calibration_events = calibrate(
+        swis_data[days == calibration_day].reset_index(drop=True), global_baseline)
+    print(f"🎯 Thresholds calibrated on {calibration_day}: composite > {composite_threshold:.2f}")
+
+    sliding = int(args.sliding_hours * SAMPLES_PER_HOUR)
+    detector = StreamingDetector(global_baseline, thresholds, composite_threshold, sliding=sliding or None)
+    columns = detector.params
+    records = []
+    print(f"\n📡 Streaming {len(day_data)} samples from {day}...\n")
+    for time, *values in day_data[['Time'] + columns].itertuples(index=False):
+        for record in detector.update(time, dict(zip(columns, values))):
+            records.append(record)
+            print(f"{RECORD_ICONS[record['Record']]} {record}")
+    records += detector.flush()
+
+    streamed = [{key: value for key, value in record.items() if key not in ('Record', 'Emitted_At')}
+                for record in records if record['Record'] == 'event_end']
+    latencies = [record['Emitted_At'] - record['Detected_End'] for record in records if record['Record'] == 'event_end']
+    print(f"\n✅ Streamed {len(streamed)} event(s).")
+    starts = [record['Emitted_At'] - record['Detected_Start'] for record in records if record['Record'] == 'event_start']
+    if starts:
+        retracted = sum(record['Record'] == 'event_retracted' for record in records)
+        print(f"⏱️ event_start latency after Detected_Start: max {max(starts)}, mean {sum(starts, pd.Timedelta(0)) / len(starts)}"
+              f" ({retracted} provisional start(s) retracted)")
+    if latencies:
+        print(f"⏱️ event_end latency after Detected_End: max {max(latencies)}, mean {sum(latencies, pd.Timedelta(0)) / len(latencies)}")
+    if sliding:
+        print(f"📈 Thresholds re-estimated {detector.refreshed} time(s) over the trailing {args.sliding_hours:g} h: "
+              f"composite > {detector.composite_threshold:.2f} at the end of the day.")
+    elif calibration_day == day:
+        if streamed == calibration_events:
+            print("✅ Streaming replay matches the batch events for this day.")
+        else:
+            print(f"⚠️ Streaming replay differs from the batch path ({len(calibration_events)} batch event(s)).")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,7 +2,8 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import os
 
-df = pd.read_csv('../data/detected_halo_cmes.csv')
+project_root = os.path.dirname(os.path.dirname(__file__))
+df = pd.read_csv(os.path.join(project_root, 'data', 'detected_halo_cmes.csv'))
 strength_counts = df['Strength'].value_counts()
 
 colors = ['#ade8f4', '#00b4d8', '#03045e']
@@ -12,7 +13,7 @@ plt.title('Detected CME Strength Distribution')
 plt.ylabel('')
 plt.tight_layout()
 
-output_path = '../plots/cme_strength_distribution.png'
+output_path = os.path.join(project_root, 'plots', 'cme_strength_distribution.png')
 plt.savefig(output_path)
 plt.show()
 
@@ -0,0 +1,414 @@
+import os
+import json
+import shutil
+import hashlib
+import pandas as pd
+import numpy as np
+
+# Base paths
+project_root = os.path.dirname(os.path.dirname(__file__))
+dataset_path = os.path.join(project_root, 'data', 'final_dataset')
+
+FORMAT_VERSION = 1
+FILL_VALUE = -1e+31
+# Derived columns (e.g. velocity_magnitude of fill-valued components) land near
+# +/-1e+31 rather than exactly on the CDF fill value, so match on magnitude.
+FILL_THRESHOLD = 1e+30
+DAY_NS = 86_400_000_000_000
+
+
+class DayDigests:
+    """Per-day, per-column blake2b digests of time-ordered rows, fed one block at a time.
+
+    Each (UTC day, column) is a single hash over the column's stored bytes
+    for that day, so the digests do not depend on how the rows were split
+    into blocks. ``known`` digests of whole days are taken as they are
+    instead of rehashing those rows.
+    """
+
+    def __init__(self):
+        self.days = {}
+        self._day = None
+        self._hashers = {}
+
+    def _finish_day(self):
+        if self._day is not None:
+            self.days[self._day] = {name: hasher.hexdigest() for name, hasher in self._hashers.items()}
+        self._day = None
+        self._hashers = {}
+
+    def update(self, times, columns, known=None):
+        """Add rows: sorted int64-ns ``times`` and {name: stored array} (``Time`` included)."""
+        if not len(times):
+            return
+        days = times - times % DAY_NS
+        starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+        for s, e in zip(starts, np.r_[starts[1:], len(days)]):
+            day = int(days[s])
+            if known and day in known:
+                self.days[day] = known[day]
+                continue
+            if day != self._day:
+                self._finish_day()
+                self._day = day
+                self._hashers = {name: hashlib.blake2b(digest_size=16) for name in columns}
+            for name, values in columns.items():
+                self._hashers[name].update(np.ascontiguousarray(values[s:e]).tobytes())
+
+    def finish(self):
+        self._finish_day()
+        return self.days
+
+
+def combine_digests(digests, columns):
+    """One digest of a day's ``Time`` and ``columns`` from its per-column digests."""
+    hasher = hashlib.blake2b(digest_size=16)
+    for name in ['Time'] + [name for name in columns if name != 'Time']:
+        hasher.update(digests[name].encode())
+    return hasher.hexdigest()
+
+
+def frame_day_digests(df, columns):
+    """{day start (int ns): digest} of a time-sorted frame, equal to ``SwisDataset.day_digests`` of the same rows."""
+    times = df['Time'].to_numpy().astype('datetime64[ns]').view(np.int64)
+    digests = DayDigests()
+    digests.update(times, {'Time': times, **{name: df[name].to_numpy() for name in columns}})
+    return {day: combine_digests(day_digests, columns) for day, day_digests in digests.finish().items()}
+
+
+class ColumnStoreWriter:
+    """Builds a column store from time-ordered blocks of rows appended one at a time.
+
+    Each column is streamed into its .npy file as blocks arrive and the
+    headers are rewritten with the final row count on ``close`` (numpy pads
+    .npy headers so the shape can grow in place), so only one block is ever
+    held in memory and the files are byte-for-byte what ``np.save`` writes.
+    Columns are stored as float64 (or the dtype given in ``dtypes``, e.g.
+    float32) with fill values replaced by NaN unless ``mask_fills`` is off.
+    Per-day digests of the stored rows (see ``DayDigests``) go to
+    ``digests.json``, so readers can tell which days changed without
+    rehashing the store. The store is built next to ``path`` and swapped in
+    atomically on ``close`` so readers never see a half-written dataset.
+    """
+
+    def __init__(self, path, dtypes=None, mask_fills=True):
+        self.path = path
+        self.tmp_path = path + '.tmp'
+        self.dtypes = dtypes or {}
+        self.mask_fills = mask_fills
+        self.files = None
+        self.stored = {}
+        self.rows = 0
+        self.time_min = None
+        self.time_max = None
+        self.digests = DayDigests()
+        shutil.rmtree(self.tmp_path, ignore_errors=True)
+        os.makedirs(self.tmp_path)
+
+    def _open(self, name, dtype):
+        f = open(os.path.join(self.tmp_path, f'{name}.npy'), 'wb')
+        np.lib.format.write_array_header_1_0(f, {'descr': np.lib.format.dtype_to_descr(dtype),
+                                                  'fortran_order': False, 'shape': (0,)})
+        return f, dtype
+
+    def append(self, times, columns, known=None):
+        """Append rows: sorted int64-nanosecond ``times`` and a mapping of aligned value arrays.
+
+        ``known`` maps whole days among these rows to digests already taken
+        of exactly those rows (e.g. copied unchanged from another store).
+        """
+        times = np.asarray(times, dtype=np.int64)
+        if self.files is None:
+            self.files = {'Time': self._open('Time', np.dtype(np.int64))}
+            for name in columns:
+                self.files[name] = self._open(name, np.dtype(self.dtypes.get(name, np.float64)))
+                self.stored[name] = self.files[name][1].name
+        elif list(columns) != list(self.stored):
+            raise ValueError(f"Columns {list(columns)} do not match the store's columns {list(self.stored)}")
+        if not len(times):
+            return
+        if np.any(times[1:] < times[:-1]) or (self.time_max is not None and times[0] < self.time_max):
+            raise ValueError("Rows must be appended in time order")
+
+        times.tofile(self.files['Time'][0])
+        stored = {'Time': times}
+        for name, values in columns.items():
+            f, dtype = self.files[name]
+            values = np.asarray(values, dtype=np.float64)
+            if self.mask_fills:
+                values = np.where(np.abs(values) >= FILL_THRESHOLD, np.nan, values)
+            stored[name] = values.astype(dtype, copy=False)
+            stored[name].tofile(f)
+        self.digests.update(times, stored, known)
+        self.rows += len(times)
+        self.time_min = int(times[0]) if self.time_min is None else self.time_min
+        self.time_max = int(times[-1])
+
+    def append_frame(self, df):
+        """Append the rows of a time-sorted DataFrame with a ``Time`` column."""
+        times = df['Time'].to_numpy().astype('datetime64[ns]').astype(np.int64)
+        self.append(times, {name: pd.to_numeric(df[name], errors='coerce').to_numpy(dtype=np.float64)
+                            for name in df.columns if name != 'Time'})
+
+    def close(self):
+        if self.files is None:
+            self.files = {'Time': self._open('Time', np.dtype(np.int64))}
+        for f, dtype in self.files.values():
+            f.seek(0)
+            np.lib.format.write_array_header_1_0(f, {'descr': np.lib.format.dtype_to_descr(dtype),
+                                                      'fortran_order': False, 'shape': (self.rows,)})
+            f.close()
+
+        meta = {
+            'version': FORMAT_VERSION,
+            'rows': self.rows,
+            'time_unit': 'ns',
+            'time_min': self.time_min,
+            'time_max': self.time_max,
+            'fill_value': FILL_VALUE,
+            'fills_masked': self.mask_fills,
+            'columns': self.stored,
+        }
+        with open(os.path.join(self.tmp_path, 'meta.json'), 'w') as f:
+            json.dump(meta, f, indent=2)
+        with open(os.path.join(self.tmp_path, 'digests.json'), 'w') as f:
+            json.dump({'version': FORMAT_VERSION,
+                       'days': {str(day): digests for day, digests in sorted(self.digests.finish().items())}}, f)
+
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.rename(self.tmp_path, self.path)
+        return self.path
+
+    def abort(self):
+        for f, _ in (self.files or {}).values():
+            f.close()
+        shutil.rmtree(self.tmp_path, ignore_errors=True)
+
+
+def write_columns(path, times, columns, dtypes=None, mask_fills=True):
+    """Write int64-nanosecond ``times`` and a mapping of 1-D value arrays as a column store.
+
+    Rows are stably sorted by time only when they are not already in order,
+    so sorted float64 input is written straight from the passed buffers.
+    """
+    times = np.asarray(times, dtype=np.int64)
+    if len(times) > 1 and np.any(times[1:] < times[:-1]):
+        order = np.argsort(times, kind='stable')
+        times = times[order]
+        columns = {name: np.asarray(values)[order] for name, values in columns.items()}
+    writer = ColumnStoreWriter(path, dtypes, mask_fills)
+    writer.append(times, columns)
+    return writer.close()
+
+
+def write_dataset(df, path=dataset_path, dtypes=None):
+    """Write a SWIS DataFrame as a column store: one .npy per column plus meta.json."""
+    times = df['Time'].to_numpy().astype('datetime64[ns]').astype(np.int64)
+    columns = {name: pd.to_numeric(df[name], errors='coerce').to_numpy(dtype=np.float64)
+               for name in df.columns if name != 'Time'}
+    return write_columns(path, times, columns, dtypes)
+
+
+def to_ns(time):
+    """Nanoseconds since the Unix epoch of a timestamp-like value."""
+    return pd.Timestamp(time).as_unit('ns').value
+
+
+def replace_rows(path, rows, start=None, end=None):
+    """Replace the rows of the store at ``path`` with start <= Time <= end.
+
+    ``rows`` is a DataFrame, or an iterable of time-ordered DataFrames (e.g.
+    one per chunk), holding the store's columns in order and only times
+    inside [start, end]; ``None`` leaves that side of the range open. The
+    rows outside the range are copied over block by block as stored, so the
+    result is the same store ``write_dataset`` would write for the spliced
+    DataFrame and memory stays bounded by the block size.
+    """
+    dataset = SwisDataset(path)
+    i0, i1 = dataset.locate(start, end)
+    lo = None if start is None else to_ns(start)
+    hi = None if end is None else to_ns(end)
+    writer = ColumnStoreWriter(path, dataset.meta['columns'])
+    try:
+        # Fix the column set even if no rows end up being written
+        writer.append(np.empty(0, dtype=np.int64), {name: np.empty(0) for name in dataset.meta['columns']})
+        dataset.copy_rows(writer, 0, i0)
+        for df in ([rows] if isinstance(rows, pd.DataFrame) else rows):
+            if not len(df):
+                continue
+            if list(df.columns) != dataset.columns:
+                raise ValueError(f"Columns {list(df.columns)} do not match the stored columns {dataset.columns}")
+            times = df['Time'].to_numpy().astype('datetime64[ns]').astype(np.int64)
+            if (lo is not None and times.min() < lo) or (hi is not None and times.max() > hi):
+                raise ValueError("Replacement rows fall outside the replaced time range")
+            writer.append_frame(df)
+        dataset.copy_rows(writer, i1, len(dataset))
+    except Exception:
+        writer.abort()
+        raise
+    return writer.close()
+
+
+class TimeIndex:
+    """Sorted timestamps with O(log n) lookup of the rows inside a time window.
+
+    ``locate`` binary-searches the sorted int64-nanosecond times and ``slice``
+    cuts the matching rows out of any array or DataFrame aligned with them as
+    a view (``iloc``/basic slicing), so selecting a window never scans or
+    copies the whole timeline the way a ``(Time >= a) & (Time <= b)`` mask does.
+    """
+
+    def __init__(self, times, check_sorted=True):
+        times = np.asarray(times)
+        if times.dtype.kind == 'M':
+            times = times.astype('datetime64[ns]', copy=False).view(np.int64)
+        if check_sorted and len(times) > 1 and np.any(times[1:] < times[:-1]):
+            raise ValueError("TimeIndex needs timestamps sorted in ascending order")
+        self.values = times
+
+    @classmethod
+    def of(cls, frame, column='Time'):
+        return cls(frame[column].to_numpy())
+
+    def __len__(self):
+        return len(self.values)
+
+    def locate(self, start=None, end=None):
+        """Row range [i0, i1) of samples with start <= Time <= end."""
+        i0 = 0 if start is None else int(np.searchsorted(self.values, to_ns(start), side='left'))
+        i1 = len(self.values) if end is None else int(np.searchsorted(self.values, to_ns(end), side='right'))
+        return i0, max(i0, i1)
+
+    def slice(self, data, start=None, end=None):
+        """Rows of ``data`` (aligned with this index) inside [start, end]."""
+        i0, i1 = self.locate(start, end)
+        return data.iloc[i0:i1] if isinstance(data, (pd.DataFrame, pd.Series)) else data[i0:i1]
+
+
+class SwisDataset:
+    """Memory-mapped reader for a column store written by ``write_dataset``.
+
+    Nothing is loaded up front: the time index and each column are mapped on
+    first use, a time range is located by binary search on the sorted index,
+    and column slices are views into the mapped files.
+    """
+
+    _digests = None
+
+    def __init__(self, path=dataset_path):
+        meta_path = os.path.join(path, 'meta.json')
+        if not os.path.exists(meta_path):
+            raise FileNotFoundError(f"No SWIS column store at '{path}'. Run data_preparation.py first.")
+        with open(meta_path) as f:
+            self.meta = json.load(f)
+        self.path = path
+        self._arrays = {}
+        self._index = None
+
+    @property
+    def columns(self):
+        return ['Time'] + list(self.meta['columns'])
+
+    def __len__(self):
+        return self.meta['rows']
+
+    def _array(self, name):
+        if name not in self._arrays:
+            if name != 'Time' and name not in self.meta['columns']:
+                raise KeyError(f"Column '{name}' not in SWIS dataset")
+            self._arrays[name] = np.load(os.path.join(self.path, f'{name}.npy'), mmap_mode='r')
+        return self._arrays[name]
+
+    @property
+    def time_span(self):
+        """First and last timestamp, straight from the metadata."""
+        return (pd.Timestamp(self.meta['time_min'], unit='ns'), pd.Timestamp(self.meta['time_max'], unit='ns'))
+
+    @property
+    def index(self):
+        """``TimeIndex`` over the mapped time column."""
+        if self._index is None:
+            # write_columns always stores rows sorted by time
+            self._index = TimeIndex(self._array('Time'), check_sorted=False)
+        return self._index
+
+    def locate(self, start=None, end=None):
+        """Row range [i0, i1) of samples with start <= Time <= end."""
+        return self.index.locate(start, end)
+
+    def times(self, start=None, end=None):
+        i0, i1 = self.locate(start, end)
+        return self._array('Time')[i0:i1].view('datetime64[ns]')
+
+    def column(self, name, start=None, end=None):
+        """Zero-copy view of one column over a time range."""
+        i0, i1 = self.locate(start, end)
+        if name == 'Time':
+            return self._array('Time')[i0:i1].view('datetime64[ns]')
+        return self._array(name)[i0:i1]
+
+    def stored_digests(self):
+        """{day start (int ns): {column: digest}} of the stored rows, as recorded by the writer.
+
+        Stores written before the digests were recorded are hashed here
+        (once per reader).
+        """
+        if self._digests is None:
+            digests_path = os.path.join(self.path, 'digests.json')
+            if os.path.exists(digests_path):
+                with open(digests_path) as f:
+                    self._digests = {int(day): digests for day, digests in json.load(f)['days'].items()}
+            else:
+                digests = DayDigests()
+                times = self._array('Time')
+                for b0 in range(0, len(self), 1 << 20):
+                    b1 = min(b0 + (1 << 20), len(self))
+                    digests.update(times[b0:b1], {name: self._array(name)[b0:b1] for name in self.columns})
+                self._digests = digests.finish()
+        return self._digests
+
+    def day_digests(self, columns=None):
+        """{day start (int ns): digest of that day's ``Time`` and ``columns`` rows} (all columns by default)."""
+        columns = list(self.meta['columns']) if columns is None else columns
+        return {day: combine_digests(digests, columns) for day, digests in self.stored_digests().items()}
+
+    def copy_rows(self, writer, i0, i1, block_rows=1 << 20):
+        """Append stored rows [i0, i1) to a ``ColumnStoreWriter`` one block at a time.
+
+        Days lying wholly inside the range keep their stored digests; only
+        the days at its ends, which may gain rows from elsewhere, are rehashed.
+        """
+        names = list(self.meta['columns'])
+        known = None
+        if i1 > i0:
+            times = self._array('Time')
+            first, last = int(times[i0]) - int(times[i0]) % DAY_NS, int(times[i1 - 1]) - int(times[i1 - 1]) % DAY_NS
+            known = {day: digests for day, digests in self.stored_digests().items()
+                     if first < day < last and list(digests) == ['Time'] + names}
+        for b0 in range(i0, i1, block_rows):
+            b1 = min(b0 + block_rows, i1)
+            writer.append(self._array('Time')[b0:b1], {name: self._array(name)[b0:b1] for name in names}, known)
+
+    def chunks(self, columns=None, days=7):
+        """Yield ``to_frame`` slices of ``days`` whole days each, from midnight of the first day."""
+        if not len(self):
+            return
+        first, last = self.time_span
+        edge = first.floor('D')
+        while edge <= last:
+            next_edge = edge + pd.Timedelta(days=days)
+            yield self.to_frame(columns, edge, next_edge - pd.Timedelta(1, 'ns'))
+            edge = next_edge
+
+    def to_frame(self, columns=None, start=None, end=None):
+        """Materialize ``Time`` plus the requested columns over a time range as a DataFrame."""
+        i0, i1 = self.locate(start, end)
+        columns = [name for name in (columns or self.columns) if name != 'Time']
+        data = {'Time': self._array('Time')[i0:i1].view('datetime64[ns]')}
+        for name in columns:
+            data[name] = self._array(name)[i0:i1]
+        return pd.DataFrame(data)
+
+
+def read_dataset(columns=None, start=None, end=None, path=dataset_path):
+    return SwisDataset(path).to_frame(columns, start, end)
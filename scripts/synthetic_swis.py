@@ -0,0 +1,246 @@
+import argparse
+import json
+import os
+import numpy as np
+import pandas as pd
+from cdf_to_csv import CDF_EPOCH_UNIX_MS
+
+# Define base paths relative to the script location
+project_root = os.path.dirname(os.path.dirname(__file__))
+
+CADENCE_NS = 5_000_000_000
+DAY_NS = 86_400_000_000_000
+HOUR_NS = 3_600_000_000_000
+FILL_VALUE = -1e+31
+SUN_TO_L1_DISTANCE_KM = 1500000  # same estimate as catalog_preparation.py
+SHOCK_RISE_NS = 60_000_000_000  # e-folding time of the CME onset
+
+# Sample offsets within the day, as in the AL1 L2 files
+FOLDER_OFFSET_NS = {'blk': 25_832_000_000, 'th1': 29_272_000_000, 'th2': 29_272_000_000}
+
+BLK_MOMENTS = ['proton_density', 'proton_bulk_speed', 'proton_xvelocity', 'proton_thermal',
+               'alpha_density', 'alpha_bulk_speed', 'alpha_thermal']
+BLK_UNCERTAINTIES = ['numden_p_uncer', 'bulk_p_uncer', 'thermal_p_uncer', 'numden_a_uncer',
+                     'bulk_a_uncer', 'thermal_a_uncer']
+FLUX_COLUMNS = {
+    'th1': ['integrated_flux_mod', 'integrated_flux_s9_mod', 'integrated_flux_s10_mod', 'integrated_flux_s11_mod'],
+    'th2': ['integrated_flux_mod', 'integrated_flux_s15_mod', 'integrated_flux_s16_mod', 'integrated_flux_s17_mod',
+            'integrated_flux_s18_mod', 'integrated_flux_s19_mod'],
+}
+
+
+def random_cmes(rng, start_ns, end_ns, per_week=2.0):
+    """Halo CMEs arriving uniformly over [start_ns, end_ns), plus three narrow (non-halo) CMEs per halo."""
+    weeks = (end_ns - start_ns) / (7 * DAY_NS)
+    cmes = []
+    for halo in [True] * rng.poisson(per_week * weeks) + [False] * rng.poisson(3 * per_week * weeks):
+        speed = int(rng.uniform(250, 1200))
+        arrival = int(rng.integers(start_ns, end_ns))
+        launch = pd.Timestamp(arrival - int(SUN_TO_L1_DISTANCE_KM / speed * 1e9)).floor('min')
+        cmes.append({
+            'launch': launch,
+            'arrival': launch.value + int(SUN_TO_L1_DISTANCE_KM / speed * 1e9),
+            'speed': speed,
+            'width': int(rng.uniform(95, 360)) if halo else int(rng.uniform(5, 90)),
+            'halo': halo,
+            'density_gain': rng.uniform(2, 6),
+            'decay_ns': int(rng.uniform(1, 4) * HOUR_NS),
+        })
+    return sorted(cmes, key=lambda cme: cme['launch'])
+
+
+def cme_profiles(times, cmes):
+    """Halo CME enhancement at each time (a shock-like rise, then exponential decay), summed over CMEs.
+
+    Returns the unit profile plus its speed (km/s) and density gains, which
+    scale with each CME's speed and ``density_gain``.
+    """
+    profile = np.zeros(len(times))
+    speed_gain = np.zeros(len(times))
+    density_gain = np.zeros(len(times))
+    for cme in cmes:
+        if not cme['halo']:
+            continue
+        i0, i1 = np.searchsorted(times, [cme['arrival'], cme['arrival'] + 6 * cme['decay_ns']])
+        since = (times[i0:i1] - cme['arrival']).astype(float)
+        shape = (1 - np.exp(-since / SHOCK_RISE_NS)) * np.exp(-since / cme['decay_ns'])
+        profile[i0:i1] += shape
+        speed_gain[i0:i1] += 0.5 * cme['speed'] * shape
+        density_gain[i0:i1] += cme['density_gain'] * shape
+    return profile, speed_gain, density_gain
+
+
+def fill_mask(rng, n, fill_fraction, mean_fill_run=6.5):
+    """Alternating valid/fill runs with geometric lengths, ``fill_fraction`` of the samples filled."""
+    if fill_fraction <= 0:
+        return np.zeros(n, dtype=bool)
+    if fill_fraction >= 1:
+        return np.ones(n, dtype=bool)
+    mean_valid_run = mean_fill_run * (1 - fill_fraction) / fill_fraction
+    lengths = np.empty(0, dtype=np.int64)
+    while lengths.sum() < n:
+        runs = int(n / (mean_fill_run + mean_valid_run)) + 16
+        more = np.column_stack([rng.geometric(1 / max(mean_valid_run, 1.0), runs),
+                                rng.geometric(1 / mean_fill_run, runs)]).ravel()
+        lengths = np.concatenate([lengths, more])
+    return np.repeat(np.tile([False, True], len(lengths) // 2), lengths)[:n]
+
+
+def quiet_wind(times, seed):
+    """Slowly varying background speed from fixed-phase oscillations, continuous across day files."""
+    phases = np.random.default_rng(seed).uniform(0, 2 * np.pi, 3)
+    days = times / DAY_NS
+    return (400 + 60 * np.sin(2 * np.pi * days / 27 + phases[0]) + 25 * np.sin(2 * np.pi * days / 3.1 + phases[1])
+            + 10 * np.sin(2 * np.pi * days / 0.4 + phases[2]))
+
+
+def positions(times):
+    days = times / DAY_NS
+    return {
+        'spacecraft_xpos': 1275900 + 30 * np.sin(days),
+        'spacecraft_ypos': 220000 + 7000 * np.sin(2 * np.pi * days / 178),
+        'spacecraft_zpos': -98000 + 500 * np.cos(2 * np.pi * days / 178),
+    }
+
+
+def blk_day(times, rng, cmes, seed, fill_fraction):
+    n = len(times)
+    profile, speed_gain, density_gain = cme_profiles(times, cmes)
+    speed = quiet_wind(times, seed) + speed_gain + rng.normal(0, 15, n)
+    density = 6.5 * np.exp(rng.normal(0, 0.3, n)) * (1 + density_gain)
+    thermal = 35 * np.exp(rng.normal(0, 0.2, n)) * (1 + 2 * profile)
+    columns = {
+        'proton_density': density,
+        'proton_bulk_speed': speed,
+        'proton_xvelocity': -speed,
+        'proton_yvelocity': rng.normal(-7, 10, n),
+        'proton_zvelocity': rng.normal(4, 20, n),
+        'proton_thermal': thermal,
+        'alpha_density': 0.04 * density * np.exp(rng.normal(0, 0.5, n)),
+        'alpha_bulk_speed': speed + rng.normal(0, 5, n),
+        'alpha_thermal': 0.7 * thermal * np.exp(rng.normal(0, 0.3, n)),
+        **positions(times),
+    }
+    filled = fill_mask(rng, n, fill_fraction)
+    for name in BLK_MOMENTS:
+        columns[name][filled] = FILL_VALUE
+    for name in BLK_UNCERTAINTIES:
+        columns[name] = np.full(n, FILL_VALUE)
+    return columns
+
+
+def th_day(times, rng, cmes, folder, nan_fraction):
+    n = len(times)
+    boost = 1 + 8 * cme_profiles(times, cmes)[0]
+    columns = {}
+    for name in FLUX_COLUMNS[folder]:
+        flux = rng.uniform(2e6, 2e7) * np.exp(rng.normal(0, 0.6, n)) * boost
+        flux[rng.random(n) < nan_fraction] = np.nan
+        columns[name] = flux
+    columns.update(positions(times))
+    return columns
+
+
+def write_cdf(path, times, columns):
+    from cdflib.cdfwrite import CDF
+    if os.path.exists(path):
+        os.remove(path)
+    epoch = CDF_EPOCH_UNIX_MS + times / 1e6
+    cdf = CDF(path, cdf_spec={'Majority': 'Column_major', 'Compressed': False})
+    variables = {'epoch_for_cdf_mod': (31, epoch), **{name: (45, values) for name, values in columns.items()}}
+    for name, (data_type, values) in variables.items():
+        cdf.write_var({'Variable': name, 'Data_Type': data_type, 'Num_Elements': 1, 'Rec_Vary': True,
+                       'Dim_Sizes': []}, var_data=values)
+    cdf.close()
+
+
+def write_csv(path, times, columns):
+    pd.DataFrame({'Time': times.view('datetime64[ns]'), **columns}).to_csv(path, index=False)
+
+
+def write_cactus_catalog(path, cmes, start):
+    """CACTus-style text catalog of the generated CMEs, newest first, as extract_halo_cme.py parses it."""
+    lines = ['CACTUS2.5.0', 'Synthetic CMEs for pipeline benchmarks',
+             f':Issued: {start:%a %b %d %H:%M:%S %Y}',
+             '#----------------------------------------------------------------------',
+             '# CME |          t0    | dt0| pa | da |  v  |  dv | minv| maxv| halo?']
+    for number, cme in reversed(list(enumerate(cmes, start=1))):
+        width = cme['width']
+        halo = 'IV' if width > 270 else 'III' if width > 180 else 'II' if width > 90 else ''
+        lines.append(f"  {number:04d}|{cme['launch']:%Y/%m/%d %H:%M}| {2:02d} | {(37 * number) % 360:03d}| "
+                     f"{width:03d}| {cme['speed']:04d}| {cme['speed'] // 4:04d}| {cme['speed'] // 2:04d}| "
+                     f"{cme['speed'] * 3 // 2:04d}|  {halo:<3}")
+    lines.append('#EOF')
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def generate(root=project_root, days=4, start='2025-07-02', seed=0, cmes_per_week=2.0, fmt='cdf',
+             fill_fraction=0.6, nan_fraction=0.35):
+    """Write ``days`` synthetic BLK/TH1/TH2 day files and a matching CACTus catalog under ``root``/data.
+
+    ``fmt='cdf'`` writes the raw files cdf_to_csv.py ingests; ``'csv'`` writes
+    the swis_csv files directly. Returns a summary with rows per folder and
+    the injected halo CMEs.
+    """
+    start = pd.Timestamp(start).normalize()
+    start_ns = start.value
+    rng = np.random.default_rng(seed)
+    cmes = random_cmes(rng, start_ns, start_ns + days * DAY_NS, cmes_per_week)
+    base = os.path.join(root, 'data', 'swis_raw' if fmt == 'cdf' else 'swis_csv')
+    rows = {}
+    for folder in ['blk', 'th1', 'th2']:
+        os.makedirs(os.path.join(base, folder), exist_ok=True)
+        rows[folder] = 0
+        for day in range(days):
+            day_start = start_ns + day * DAY_NS
+            times = np.arange(day_start + FOLDER_OFFSET_NS[folder], day_start + DAY_NS, CADENCE_NS, dtype=np.int64)
+            day_rng = np.random.default_rng([seed, day, ['blk', 'th1', 'th2'].index(folder)])
+            if folder == 'blk':
+                columns = blk_day(times, day_rng, cmes, seed, fill_fraction)
+            else:
+                columns = th_day(times, day_rng, cmes, folder, nan_fraction)
+            name = f"AL1_ASW91_L2_{folder.upper()}_{pd.Timestamp(day_start):%Y%m%d}_UNP_9999_999999_V02"
+            if fmt == 'cdf':
+                write_cdf(os.path.join(base, folder, name + '.cdf'), times, columns)
+            else:
+                write_csv(os.path.join(base, folder, name + '.csv'), times, columns)
+            rows[folder] += len(times)
+
+    cactus_dir = os.path.join(root, 'data', 'cactus')
+    os.makedirs(cactus_dir, exist_ok=True)
+    write_cactus_catalog(os.path.join(cactus_dir, 'cactus_catalog.txt'), cmes, start)
+    halo = [cme for cme in cmes if cme['halo']]
+    return {
+        'days': days, 'format': fmt, 'seed': seed, 'rows': rows, 'total_rows': sum(rows.values()),
+        'catalog_cmes': len(cmes), 'halo_cmes': len(halo),
+        'halo_arrivals': [str(pd.Timestamp(cme['arrival'])) for cme in halo],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic SWIS day files and a CACTus catalog with injected halo CMEs.')
+    parser.add_argument('--root', default=project_root,
+                        help='Project directory to write data/swis_raw (or swis_csv) and data/cactus under.')
+    parser.add_argument('--days', type=int, default=4)
+    parser.add_argument('--start', default='2025-07-02')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--cmes-per-week', type=float, default=2.0)
+    parser.add_argument('--format', choices=['cdf', 'csv'], default='cdf')
+    parser.add_argument('--fill-fraction', type=float, default=0.6,
+                        help='Fraction of BLK moment samples set to the -1e+31 fill value.')
+    parser.add_argument('--nan-fraction', type=float, default=0.35, help='Fraction of missing TH1/TH2 flux samples.')
+    parser.add_argument('--summary', help='Also write the generation summary as JSON to this path.')
+    args = parser.parse_args()
+
+    summary = generate(args.root, args.days, args.start, args.seed, args.cmes_per_week, args.format,
+                       args.fill_fraction, args.nan_fraction)
+    if args.summary:
+        with open(args.summary, 'w') as f:
+            json.dump(summary, f, indent=2)
+    print(f"✅ Generated {args.days} day(s) of synthetic SWIS data ({summary['total_rows']:,} rows, "
+          f"{summary['halo_cmes']} injected halo CME(s)) under {args.root}")
+
+
+if __name__ == '__main__':
+    main()
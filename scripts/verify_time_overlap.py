@@ -1,8 +1,8 @@
 import pandas as pd
+from dataset_service import open_dataset
 
 # Load SWIS dataset
-swis_data = pd.read_csv('../data/final_dataset.csv')
-swis_data['Time'] = pd.to_datetime(swis_data['Time'])
+swis_data = open_dataset()
 
 # Load CME catalog
 catalog = pd.read_csv('../data/cactus/halo_cmes_with_window.csv')
@@ -10,8 +10,7 @@ catalog['Expected_Start'] = pd.to_datetime(catalog['Expected_Start'])
 catalog['Expected_End'] = pd.to_datetime(catalog['Expected_End'])
 
 # Check the time range of the SWIS dataset
-swis_start = swis_data['Time'].min()
-swis_end = swis_data['Time'].max()
+swis_start, swis_end = swis_data.time_span
 
 print(f"📅 SWIS Dataset Time Range: {swis_start} to {swis_end}\n")
 
@@ -0,0 +1,212 @@
+import argparse
+import asyncio
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from cdf_to_csv import base_raw_path, base_csv_path, convert_job, is_current, load_manifest, save_manifest
+from data_preparation import (folders, list_sources, full_rebuild, incremental_update, load_sources_manifest,
+                              save_sources_manifest)
+from dataset_service import open_dataset
+from halo_cme_detection import DETECTED_PATH, update_detections
+
+# Base paths
+project_root = os.path.dirname(os.path.dirname(__file__))
+manifest_path = os.path.join(base_csv_path, 'conversion_manifest.json')
+ingest_log_path = os.path.join(project_root, 'data', 'ingest_log.jsonl')
+
+# Aditya-L1 SWIS L2 file names: AL1_ASW91_L2_{BLK,TH1,TH2}_YYYYMMDD_*.cdf
+FILE_PATTERN = re.compile(r'^AL1_ASW91_L2_(BLK|TH1|TH2)_\d{8}_.*\.cdf$')
+
+
+def output_for(cdf_path):
+    folder = os.path.basename(os.path.dirname(cdf_path))
+    return os.path.join(base_csv_path, folder, os.path.basename(cdf_path).replace('.cdf', '.csv'))
+
+
+class DirectoryWatcher:
+    """Polls the raw folders for L2 CDFs that are new or changed and have finished landing.
+
+    A file is handed on once its (size, mtime) has held for one whole poll, so
+    downloads still being written are never converted. Its arrival time is
+    the ctime of that final version, which (unlike mtime) a copy preserving
+    timestamps cannot backdate. Files already converted by ``cdf_to_csv.py``
+    are treated as seen.
+    """
+
+    def __init__(self, raw_path=base_raw_path):
+        self.raw_path = raw_path
+        manifest = load_manifest(manifest_path)
+        self.seen = {}
+        self.pending = {}
+        for path, stat in self._scan():
+            if is_current(manifest.get(os.path.relpath(output_for(path), base_csv_path)), path, output_for(path)):
+                self.seen[path] = (stat.st_size, stat.st_mtime_ns)
+
+    def _scan(self):
+        for folder in folders:
+            raw_dir = os.path.join(self.raw_path, folder)
+            if not os.path.isdir(raw_dir):
+                continue
+            for name in sorted(os.listdir(raw_dir)):
+                match = FILE_PATTERN.match(name)
+                if match and match.group(1).lower() == folder:
+                    path = os.path.join(raw_dir, name)
+                    try:
+                        yield path, os.stat(path)
+                    except FileNotFoundError:
+                        continue
+
+    def poll(self):
+        """[(path, arrival)] of files that stopped changing since the last poll."""
+        ready = []
+        for path, stat in self._scan():
+            signature = (stat.st_size, stat.st_mtime_ns)
+            if self.seen.get(path) == signature:
+                continue
+            if self.pending.get(path) != signature:
+                self.pending[path] = signature
+                continue
+            del self.pending[path]
+            self.seen[path] = signature
+            ready.append((path, stat.st_ctime))
+        return ready
+
+    def retry(self, paths):
+        """Forget files whose ingest failed, so the next polls hand them on again."""
+        for path in paths:
+            self.seen.pop(path, None)
+
+
+def convert_batch(pool, files):
+    """Convert a batch of CDFs concurrently and record the results in the conversion manifest."""
+    futures = [(path, pool.submit(convert_job, path, output_for(path))) for path, _ in files]
+    manifest = load_manifest(manifest_path)
+    converted = []
+    for path, future in futures:
+        key = os.path.relpath(output_for(path), base_csv_path)
+        result = future.result()
+        if result is None:
+            manifest.pop(key, None)
+            continue
+        manifest[key] = result
+        converted.append(key)
+    save_manifest(manifest, manifest_path)
+    return converted
+
+
+def merge_batch():
+    """Splice the converted files into the merged dataset; returns (rows, changed span or None)."""
+    sources = {folder: list_sources(folder, 'csv') for folder in folders}
+    manifest = load_sources_manifest()
+    result = incremental_update('csv', sources, manifest) if manifest is not None else None
+    if result is None:
+        full_df, manifest = full_rebuild('csv', sources)
+        save_sources_manifest(manifest)
+        return len(full_df), (None, None)
+    rows, _, _, manifest, span = result
+    save_sources_manifest(manifest)
+    return rows, span
+
+
+def ingest(pool, files, resolution):
+    """One ingest cycle: convert, merge and re-score; returns the batch's log record."""
+    timings = {}
+    started = time.perf_counter()
+    converted = convert_batch(pool, files)
+    timings['convert'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    rows, span = merge_batch() if converted else (0, None)
+    timings['merge'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    rescored = update_detections(open_dataset(), *span, resolution=resolution) if span is not None else []
+    timings['detect'] = time.perf_counter() - started
+    updated = time.time()
+    return {
+        'updated': updated,
+        'files': [{'file': os.path.relpath(path, base_raw_path), 'arrived': arrival, 'latency_s': updated - arrival}
+                  for path, arrival in files],
+        'converted': converted,
+        'rows': rows,
+        'rescored': [int(cme_number) for cme_number in rescored],
+        'stages_s': timings,
+    }
+
+
+def report(record):
+    latencies = [entry['latency_s'] for entry in record['files']]
+    stages = ', '.join(f"{name} {seconds:.2f}s" for name, seconds in record['stages_s'].items())
+    print(f"⏱️ {len(record['files'])} file(s) → {os.path.basename(DETECTED_PATH)} updated "
+          f"{min(latencies):.2f}–{max(latencies):.2f}s after arrival ({stages}; {record['rows']} row(s) merged, "
+          f"{len(record['rescored'])} CME window(s) re-scored)")
+    with open(ingest_log_path, 'a') as f:
+        f.write(json.dumps(record) + '\n')
+
+
+async def watch(args):
+    watcher = DirectoryWatcher()
+    queue = asyncio.Queue()
+    loop = asyncio.get_running_loop()
+
+    async def scan():
+        while True:
+            for item in watcher.poll():
+                queue.put_nowait(item)
+            if args.once and not watcher.pending:
+                queue.put_nowait(None)
+                return
+            await asyncio.sleep(args.interval)
+
+    scanner = asyncio.create_task(scan())
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        while True:
+            # Everything that landed while the previous cycle ran goes into this one
+            batch = [await queue.get()]
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+            done = None in batch
+            batch = [item for item in batch if item is not None]
+            if batch:
+                print(f"📥 {len(batch)} new or updated file(s): "
+                      f"{', '.join(os.path.basename(path) for path, _ in batch)}")
+                try:
+                    record = await loop.run_in_executor(None, ingest, pool, batch, args.baseline_resolution)
+                except Exception as e:
+                    print(f"❌ Ingest of {len(batch)} file(s) failed: {e}; retrying them on the next polls")
+                    watcher.retry(path for path, _ in batch)
+                else:
+                    report(record)
+                    if args.plots and record['rescored']:
+                        from render_plots import render
+                        await loop.run_in_executor(None, render, ['plot_scores'])
+            if done:
+                break
+    await scanner
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Watch data/swis_raw for new or updated SWIS L2 CDFs and convert, '
+                                                 'merge and re-score just what they change.')
+    parser.add_argument('--interval', type=float, default=5.0,
+                        help='Seconds between polls; a file is ingested once it is unchanged for one interval.')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Processes converting a batch of files.')
+    parser.add_argument('--baseline-resolution', choices=['daily', 'hourly'], default='daily',
+                        help='Bucket size of the quiet-time global baseline (as halo_cme_detection.py).')
+    parser.add_argument('--plots', action='store_true', help='Re-render the changed per-CME score plots after a cycle.')
+    parser.add_argument('--once', action='store_true', help='Ingest the files waiting now, then exit.')
+    args = parser.parse_args()
+
+    print(f"👀 Watching {base_raw_path} every {args.interval:g}s (log: {ingest_log_path})")
+    try:
+        asyncio.run(watch(args))
+    except KeyboardInterrupt:
+        pass
+    print("🛑 Watcher stopped.")
+
+
+if __name__ == '__main__':
+    main()